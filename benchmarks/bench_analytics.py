@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark do UsageAnalytics sobre um log sintético.
+
+Mede a agregação completa de N registros (padrão: 10 milhões, gerados em
+streaming, sem materializar o log em memória) e o custo de uma atualização
+incremental depois que chegam registros novos ao HistoryStore.
+
+Uso: python benchmarks/bench_analytics.py [--entries 10000000] [--keys 5000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.analytics import UsageAnalytics
+from core.history_store import HistoryStore, make_entry
+
+
+def gerar_log(n, keys, seed=7):
+    """Registros de histórico sintéticos, em ordem cronológica"""
+    rnd = random.Random(seed)
+    # Popularidade em cauda longa: poucas respostas concentram a maior parte do uso
+    pesos = [1.0 / (rank + 1) for rank in range(len(keys))]
+    instante = datetime(2026, 1, 1, 8).timestamp()
+    for i in range(0, n, 1000):
+        for key in rnd.choices(keys, weights=pesos, k=min(1000, n - i)):
+            instante += rnd.expovariate(1 / 3.0)
+            yield {"timestamp": "", "ts": instante, "key": key,
+                   "context": f"Resposta: {key}", "response": ""}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=10_000_000)
+    parser.add_argument("--keys", type=int, default=5000)
+    parser.add_argument("--incremental", type=int, default=1000,
+                        help="registros novos na atualização incremental")
+    args = parser.parse_args()
+
+    keys = [f"resposta_{i}" for i in range(args.keys)]
+    responses = {key: {"message": "", "category": f"cat{i % 12}"} for i, key in enumerate(keys)}
+
+    analytics = UsageAnalytics()
+    inicio = time.perf_counter()
+    analytics.observe_many(gerar_log(args.entries, keys))
+    agregacao = time.perf_counter() - inicio
+    print(f"agregação completa: {args.entries:,} registros em {agregacao:.1f}s "
+          f"({args.entries / agregacao:,.0f} registros/s)")
+
+    inicio = time.perf_counter()
+    analytics.report(responses)
+    print(f"relatório: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        store = HistoryStore(data_dir)
+        agora = datetime.now() - timedelta(days=2)
+        antigos = [make_entry("Resposta: x", "", key=keys[0], when=agora + timedelta(seconds=i))
+                   for i in range(100_000)]
+        store.append(antigos)
+        analytics.refresh(store, settle=0)
+
+        novos = [make_entry("Resposta: y", "", key=keys[1], when=agora + timedelta(seconds=100_000 + i))
+                 for i in range(args.incremental)]
+        store.append(novos)
+        inicio = time.perf_counter()
+        added = analytics.refresh(store, settle=0)
+        incremental = time.perf_counter() - inicio
+        print(f"atualização incremental: {added} registros novos (sobre 100k já contados) "
+              f"em {incremental * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
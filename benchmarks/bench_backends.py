@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos backends de respostas: JSON em memória x SQLite (FTS5).
+
+Mede tempo de carga, pico de memória Python durante a carga e latência
+de busca (top-20) para o mesmo catálogo sintético.
+
+Uso: python benchmarks/bench_backends.py [--size 100000]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_search import CONSULTAS, gerar_respostas
+from core.repository import JsonResponseRepository
+from core.response_store import ResponseStore
+from core.sqlite_repository import SqliteResponseRepository, migrate_json_to_sqlite
+
+
+def medir_backend(nome, abrir, repeat):
+    # Memória medida numa carga à parte: o tracemalloc distorce o tempo
+    gc.collect()
+    tracemalloc.start()
+    abrir().close()
+    memoria = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    gc.collect()
+    inicio = time.perf_counter()
+    repositorio = abrir()
+    carga = time.perf_counter() - inicio
+
+    print(f"\n[{nome}] carga {carga * 1000:.0f} ms, pico de memória {memoria / 1024 / 1024:.1f} MB")
+    for consulta in CONSULTAS:
+        inicio = time.perf_counter()
+        for _ in range(repeat):
+            resultado = repositorio.search(consulta, limit=20)
+        ms = (time.perf_counter() - inicio) / repeat * 1000
+        print(f"   busca {consulta!r:<20} {ms:8.2f} ms  ({len(resultado)} resultados)")
+    repositorio.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        ResponseStore(data_dir, durable=False).write_snapshot(gerar_respostas(args.size))
+        db_path = os.path.join(data_dir, "respostas.db")
+        inicio = time.perf_counter()
+        migrate_json_to_sqlite(data_dir, db_path)
+        print(f"{args.size:,} respostas; migração JSON -> SQLite em {time.perf_counter() - inicio:.1f}s")
+
+        medir_backend("json", lambda: JsonResponseRepository(data_dir), args.repeat)
+        medir_backend("sqlite", lambda: SqliteResponseRepository(db_path), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: detecção de respostas quase iguais (MinHash + LSH) x comparação
+par a par.
+
+Gera N respostas e planta cópias levemente editadas (uma palavra trocada)
+de uma parte delas. Mede o cálculo das assinaturas do zero, a reabertura
+com as assinaturas gravadas, a análise completa (`duplicate_groups`) e a
+verificação de uma inclusão (`similar`), e quantas das cópias que passam
+do limite (Jaccard exato) foram encontradas: a similaridade MinHash é uma
+estimativa, então pares perto do limite às vezes ficam de fora. A comparação par a par (Jaccard exato dos shingles) é medida
+numa amostra e extrapolada para N, já que cresce com N².
+
+Uso: python benchmarks/bench_dedup.py [--sizes 10000 100000] [--threshold 0.8]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_search import gerar_respostas
+from core.dedup_index import SHINGLE_SIZE, DedupIndex, shingle_text
+
+AMOSTRA_PAR_A_PAR = 1500
+
+
+def plantar_copias(respostas, fracao, seed=7):
+    """Acrescenta cópias com uma palavra trocada; devolve {cópia: original}"""
+    rnd = random.Random(seed)
+    originais = rnd.sample(sorted(respostas), int(len(respostas) * fracao))
+    copias = {}
+    for key in originais:
+        palavras = respostas[key]["message"].split()
+        palavras[rnd.randrange(len(palavras))] = "alterado"
+        copias[f"copia_{key}"] = key
+        respostas[f"copia_{key}"] = {"message": " ".join(palavras), "category": respostas[key]["category"]}
+    return copias
+
+
+def shingles(message):
+    text = shingle_text(message)
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a, b):
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def par_a_par(respostas, threshold):
+    """Segundos da comparação de todos os pares de uma amostra"""
+    conjuntos = [shingles(data["message"]) for data in list(respostas.values())[:AMOSTRA_PAR_A_PAR]]
+    inicio = time.perf_counter()
+    for i, a in enumerate(conjuntos):
+        for b in conjuntos[i + 1:]:
+            _ = len(a & b) / len(a | b) >= threshold
+    return time.perf_counter() - inicio
+
+
+def medir(n, threshold):
+    respostas = gerar_respostas(n)
+    copias = plantar_copias(respostas, 0.01)
+    total = len(respostas)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        path = os.path.join(data_dir, "respostas.minhash.npz")
+        index = DedupIndex(path)
+        inicio = time.perf_counter()
+        index.sync(respostas)
+        assinaturas = time.perf_counter() - inicio
+        index.save()
+
+        inicio = time.perf_counter()
+        index = DedupIndex.load(path)
+        index.sync(respostas)
+        reabertura = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    grupos = index.duplicate_groups(threshold)
+    analise = time.perf_counter() - inicio
+
+    consultas = list(respostas.values())[:200]
+    inicio = time.perf_counter()
+    for data in consultas:
+        index.similar(data["message"], threshold)
+    inclusao_ms = (time.perf_counter() - inicio) * 1000 / len(consultas)
+
+    juntos = {}
+    for grupo in grupos:
+        chaves = {key for key, _ in grupo}
+        for key in chaves:
+            juntos[key] = chaves
+    # Só contam as cópias que de fato passam do limite (Jaccard exato)
+    esperadas = [
+        (copia, original) for copia, original in copias.items()
+        if jaccard(respostas[copia]["message"], respostas[original]["message"]) >= threshold
+    ]
+    achadas = sum(1 for copia, original in esperadas if original in juntos.get(copia, ()))
+
+    amostra = min(AMOSTRA_PAR_A_PAR, total)
+    extrapolado = par_a_par(respostas, threshold) * (total / amostra) ** 2
+
+    print(f"\n{total:,} respostas ({len(copias)} cópias editadas plantadas)")
+    print(f"   assinaturas do zero:        {assinaturas:8.2f} s")
+    print(f"   reabertura (gravadas):      {reabertura:8.2f} s")
+    print(f"   análise LSH completa:       {analise:8.2f} s  ({len(grupos)} grupos)")
+    print(f"   verificação de inclusão:    {inclusao_ms:8.2f} ms")
+    print(f"   par a par (extrapolado):    {extrapolado:8.0f} s")
+    print(f"   cópias encontradas:         {achadas}/{len(esperadas)} acima do limite"
+          f" ({len(copias) - len(esperadas)} ficaram abaixo dele)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--threshold", type=float, default=0.8)
+    args = parser.parse_args()
+    for n in args.sizes:
+        medir(n, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: junção dos históricos de vários atendentes (merge-history).
+
+Gera um chat_history.json por atendente (metade com o timestamp legado
+"dd/mm/YYYY HH:MM:SS", metade no formato atual) e compara:
+- ingênuo: um arquivo depois do outro, `json.loads` + `strptime` em cada
+  linha, tudo numa lista e `sort` no fim;
+- merge_histories com 1 processo e com um por CPU (pedaços interpretados em
+  paralelo, timestamps fatiados, merge de k vias);
+- nova execução depois de acrescentar 1% de registros (só os bytes novos).
+
+Uso: python benchmarks/bench_history_merge.py [--agents 200] [--entries 5000] [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.history_merge import merge_histories
+from core.history_store import LEGACY_TIMESTAMP_FORMAT
+
+
+def gerar_arquivos(pasta, agentes, registros, seed=5):
+    rnd = random.Random(seed)
+    total = 0
+    for agente in range(agentes):
+        destino = os.path.join(pasta, f"atendente{agente:04d}")
+        os.makedirs(destino)
+        instante = datetime(2026, 3, 2, 8, 0) + timedelta(seconds=rnd.randint(0, 900))
+        with open(os.path.join(destino, "chat_history.json"), "w", encoding="utf-8") as f:
+            for _ in range(registros):
+                instante += timedelta(seconds=rnd.expovariate(1 / 30.0))
+                key = f"resposta_{int(rnd.paretovariate(1.2)) % 500}"
+                entrada = {"context": f"Resposta: {key}", "response": f"Texto da resposta {key}, já formatado."}
+                if agente % 2:
+                    entrada["timestamp"] = instante.strftime(LEGACY_TIMESTAMP_FORMAT)
+                else:
+                    entrada["timestamp"] = instante.isoformat(timespec="seconds")
+                    entrada["ts"] = round(instante.timestamp(), 3)
+                    entrada["key"] = key
+                f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+        total += registros
+    return total
+
+
+def acrescentar(pasta, fracao, seed=9):
+    rnd = random.Random(seed)
+    novos = 0
+    for nome in sorted(os.listdir(pasta)):
+        path = os.path.join(pasta, nome, "chat_history.json")
+        with open(path, "rb") as f:
+            ultima = json.loads(f.readlines()[-1])
+        quantos = max(1, int(rnd.random() * 2 * fracao * 5000))
+        with open(path, "a", encoding="utf-8") as f:
+            for i in range(quantos):
+                f.write(json.dumps(dict(ultima, context=f"novo {i}"), ensure_ascii=False) + "\n")
+        novos += quantos
+    return novos
+
+
+def ingenuo(pasta):
+    registros = []
+    for nome in sorted(os.listdir(pasta)):
+        with open(os.path.join(pasta, nome, "chat_history.json"), encoding="utf-8") as f:
+            for line in f:
+                entrada = json.loads(line)
+                valor = entrada["timestamp"]
+                try:
+                    ts = datetime.fromisoformat(valor).timestamp()
+                except ValueError:
+                    ts = datetime.strptime(valor, LEGACY_TIMESTAMP_FORMAT).timestamp()
+                registros.append((ts, nome, entrada))
+    registros.sort(key=lambda r: r[0])
+    return len(registros)
+
+
+def contar(registros):
+    return sum(1 for _ in registros)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=5000, help="registros por atendente")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pasta = os.path.join(tmp, "atendentes")
+        total = gerar_arquivos(pasta, args.agents, args.entries)
+        tamanho = sum(
+            os.path.getsize(os.path.join(pasta, nome, "chat_history.json")) for nome in os.listdir(pasta)
+        ) / 1e6
+        print(f"{args.agents} atendentes, {total:,} registros, {tamanho:.1f} MB "
+              f"({os.cpu_count()} CPUs)\n")
+
+        inicio = time.perf_counter()
+        ingenuo(pasta)
+        segundos = time.perf_counter() - inicio
+        print(f"   {'ingênuo (sequencial)':28} {segundos:7.2f} s  {tamanho / segundos:6.1f} MB/s")
+
+        for workers in sorted({1, args.workers}):
+            report = merge_histories([pasta], contar, None, workers)
+            print(f"   {f'merge_histories ({workers} proc.)':28} {report.elapsed:7.2f} s  "
+                  f"{report.megabytes_per_second:6.1f} MB/s")
+
+        estado = os.path.join(tmp, "offsets.json")
+        merge_histories([pasta], contar, estado, args.workers)
+        novos = acrescentar(pasta, 0.01)
+        report = merge_histories([pasta], contar, estado, args.workers)
+        print(f"   {'incremental (+1%)':28} {report.elapsed:7.2f} s  "
+              f"{report.records:,} de {novos:,} registros novos, {report.bytes / 1e6:.2f} MB lidos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: importação de catálogo linha a linha (add_quick_response, como
+o menu faz) x em lotes (import_catalog), em cada backend.
+
+Gera um JSONL com N respostas, importa em lotes num diretório vazio e,
+com o catálogo já carregado, inclui mais uma amostra linha a linha (cada
+uma custa uma gravação, então N inteiro levaria demais). Mede linhas por
+segundo e, no sqlite (dados em disco), o pico de memória alocada durante
+a importação (tracemalloc): deve crescer só com o conjunto de códigos
+lidos, não com o tamanho do arquivo.
+
+Uso: python benchmarks/bench_import.py [--sizes 10000 100000] [--batch-size 1000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_search import gerar_respostas
+from core.catalog_io import import_catalog
+from core.chat_assistant import ChatAssistant
+
+
+def gravar_catalogo(path, n):
+    with open(path, "w", encoding="utf-8") as f:
+        for key, data in gerar_respostas(n).items():
+            f.write(json.dumps({"key": key, **data}, ensure_ascii=False) + "\n")
+
+
+def novo_repositorio(backend, data_dir, path, batch_size):
+    """Assistente com o catálogo importado em lotes; devolve (assistente, relatório)"""
+    assistant = ChatAssistant(data_dir, backend)
+    assistant.preload()
+    with open(path, encoding="utf-8") as stream:
+        report = import_catalog(assistant, stream, "jsonl", batch_size)
+    return assistant, report
+
+
+def linha_a_linha(assistant, amostra):
+    """Linhas/s de add_quick_response com o catálogo já carregado"""
+    # Mesmo gerador do catálogo (mensagens do mesmo tamanho), com códigos novos
+    linhas = [(f"avulsa_{key}", data["message"], data["category"])
+              for key, data in gerar_respostas(amostra).items()]
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for key, message, category in linhas:
+            assistant.add_quick_response(key, message, category)
+    return len(linhas) / (time.perf_counter() - inicio)
+
+
+def pico_memoria(path, batch_size):
+    """Pico (MB) alocado durante a importação no sqlite, onde os dados ficam em disco"""
+    with tempfile.TemporaryDirectory() as data_dir:
+        assistant = ChatAssistant(data_dir, "sqlite")
+        tracemalloc.start()
+        with open(path, encoding="utf-8") as stream:
+            import_catalog(assistant, stream, "jsonl", batch_size)
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        assistant.close()
+    return pico / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--sample", type=int, default=500, help="inclusões no modo linha a linha")
+    parser.add_argument("--backends", nargs="+", default=["json", "sqlite", "shared"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            path = os.path.join(tmp, f"catalogo_{n}.jsonl")
+            gravar_catalogo(path, n)
+            tamanho = os.path.getsize(path) / 1024 / 1024
+            print(f"\n{n:,} respostas ({tamanho:.1f} MB de JSONL), lotes de {args.batch_size}")
+            for backend in args.backends:
+                with tempfile.TemporaryDirectory() as data_dir:
+                    assistant, report = novo_repositorio(backend, data_dir, path, args.batch_size)
+                    por_linha = linha_a_linha(assistant, args.sample)
+                    assistant.close()
+                print(f"   [{backend:6}] em lotes {report.rows_per_second:9,.0f} linhas/s"
+                      f"   linha a linha {por_linha:9,.0f} linhas/s"
+                      f"   ({report.rows_per_second / por_linha:.1f}x)")
+            print(f"   pico de memória da importação (sqlite): {pico_memoria(path, args.batch_size):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
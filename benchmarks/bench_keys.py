@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark do índice de chaves do prompt (KeyIndex).
+
+Gera chaves no formato usado na biblioteca (palavras unidas por '_') e
+mede a latência de completar prefixo, prefixo único, sugestões com erro
+de digitação e inclusão incremental.
+
+Uso: python benchmarks/bench_keys.py [--size 100000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.key_index import KeyIndex
+
+PALAVRAS = (
+    "problema rede senha bloqueada lentidao impressora acesso email vpn sistema "
+    "cadastro boleto fatura pagamento entrega pedido troca devolucao cancelamento "
+    "suporte chamado protocolo agendamento visita tecnico instalacao internet wifi "
+    "roteador telefone celular aplicativo login conta perfil atualizacao backup "
+    "arquivo pasta permissao servidor banco relatorio planilha reuniao agenda "
+    "saudacao agradecimento follow encerramento transferencia setor financeiro"
+).split()
+
+
+def gerar_chaves(n, seed=42):
+    rnd = random.Random(seed)
+    chaves = set()
+    while len(chaves) < n:
+        partes = rnd.sample(PALAVRAS, rnd.randint(2, 3))
+        chaves.add("_".join(partes) + f"_{rnd.randint(1, 99)}")
+    return sorted(chaves)
+
+
+def com_erro(chave, rnd):
+    """Introduz um erro de digitação (troca, omissão ou transposição)"""
+    i = rnd.randrange(len(chave) - 1)
+    tipo = rnd.choice(("troca", "omissao", "transposicao"))
+    if tipo == "troca":
+        return chave[:i] + rnd.choice("abcdefghijklmnopqrstuvwxyz") + chave[i + 1:]
+    if tipo == "omissao":
+        return chave[:i] + chave[i + 1:]
+    return chave[:i] + chave[i + 1] + chave[i] + chave[i + 2:]
+
+
+def medir(nome, funcao, entradas):
+    inicio = time.perf_counter()
+    for entrada in entradas:
+        funcao(entrada)
+    us = (time.perf_counter() - inicio) / len(entradas) * 1_000_000
+    print(f"   {nome:<28} {us:10.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    rnd = random.Random(7)
+    chaves = gerar_chaves(args.size)
+
+    inicio = time.perf_counter()
+    index = KeyIndex(chaves)
+    print(f"{args.size:,} chaves indexadas em {time.perf_counter() - inicio:.2f}s")
+    # As tabelas de deleções só são montadas na primeira sugestão
+    inicio = time.perf_counter()
+    index.suggest(chaves[0])
+    print(f"tabelas de sugestão montadas em {time.perf_counter() - inicio:.2f}s")
+
+    amostra = [rnd.choice(chaves) for _ in range(args.queries)]
+    prefixos = [chave[:rnd.randint(3, 12)] for chave in amostra]
+    erros = [com_erro(chave, rnd) for chave in amostra]
+
+    medir("chave exata", index.__contains__, amostra)
+    medir("completar prefixo (top 9)", lambda p: index.complete(p, limit=9), prefixos)
+    medir("prefixo único", index.unique_completion, amostra)
+    medir("sugestão (1 erro)", index.suggest, erros)
+
+    encontrados = sum(chave in index.suggest(erro) for chave, erro in zip(amostra, erros))
+    print(f"   sugestão correta entre as 5 primeiras: {encontrados / len(amostra):.1%}")
+
+    novas = [f"nova_resposta_{i}" for i in range(args.queries)]
+    medir("inclusão incremental", index.add, novas)
+
+
+if __name__ == "__main__":
+    main()
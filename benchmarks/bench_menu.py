@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark do tempo até o prompt na CLI (uma volta do loop principal).
+
+Compara o caminho antigo (os.system('clear') + reagrupar todas as
+respostas e imprimir o menu inteiro) com o menu paginado em cache do
+ChatCLI: primeira tela após uma alteração (reagrupa) e telas seguintes.
+A saída vai para um buffer, então o número mede só a montagem da tela.
+
+Uso: python benchmarks/bench_menu.py [--size 10000] [--repeat 20]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.response_store import ResponseStore
+from interface.cli import ChatCLI
+
+
+def gerar_respostas(n):
+    return {
+        f"resposta_{i}": {
+            "message": f"Mensagem padrão número {i} para atendimento de chamados de suporte, "
+                       f"com texto longo o bastante para ser truncado na prévia do menu.",
+            "category": f"categoria_{i % 25}",
+        }
+        for i in range(n)
+    }
+
+
+def menu_antigo(cli):
+    """Cópia do show_categories_menu anterior, para comparação"""
+    # Mesmo custo de subprocesso, sem sujar o terminal do benchmark
+    os.system('clear > ' + os.devnull)
+    cli.show_header()
+    categories = {}
+    for key, data in cli.assistant.quick_responses.items():
+        categories.setdefault(data["category"], []).append((key, data["message"]))
+    print("\n" + "📁 CATEGORIAS DE RESPOSTAS:")
+    print("-" * 50)
+    for category, responses in categories.items():
+        print(f"\n🎯 {category.upper()}:")
+        for key, message in responses:
+            preview = message[:65] + "..." if len(message) > 65 else message
+            print(f"   [{key:.<20}] {preview}")
+    cli.show_commands_help()
+
+
+def menu_novo(cli):
+    cli.clear_screen()
+    cli.show_header()
+    cli.show_categories_menu()
+    cli.show_commands_help()
+
+
+def medir(funcao, cli, repeat, antes=None):
+    tempos = []
+    for _ in range(repeat):
+        if antes:
+            antes()
+        buffer = io.StringIO()
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(buffer):
+            funcao(cli)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), buffer.getvalue().count("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        ResponseStore(data_dir, durable=False).write_snapshot(gerar_respostas(args.size))
+        cli = ChatCLI(data_dir)
+        cli.assistant.preload()
+
+        def invalidar():
+            cli.assistant.generation += 1
+
+        antigo, linhas_antigo = medir(menu_antigo, cli, args.repeat)
+        apos_mudanca, _ = medir(menu_novo, cli, args.repeat, antes=invalidar)
+        cache, linhas_novo = medir(menu_novo, cli, args.repeat)
+        cli.assistant.close()
+
+    print(f"{args.size:,} respostas, mediana de {args.repeat} telas")
+    print(f"   antigo (clear + menu completo): {antigo:8.2f} ms  ({linhas_antigo:,} linhas)")
+    print(f"   novo, após alteração:           {apos_mudanca:8.2f} ms")
+    print(f"   novo, em cache:                 {cache:8.2f} ms  ({linhas_novo} linhas)")
+
+
+if __name__ == "__main__":
+    main()
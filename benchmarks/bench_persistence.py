@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latência de inclusão de resposta com a biblioteca grande.
+
+Compara a reescrita completa do JSON a cada inclusão (caminho antigo de
+save_responses) com o ResponseStore (linha no WAL + compactação
+periódica), com e sem fsync.
+
+Uso: python benchmarks/bench_persistence.py [--size 100000] [--adds 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.response_store import ResponseStore
+
+
+def gerar_respostas(n):
+    return {
+        f"resposta_{i}": {
+            "message": f"Mensagem padrão número {i} para atendimento de chamados de suporte.",
+            "category": f"categoria_{i % 20}",
+        }
+        for i in range(n)
+    }
+
+
+def percentis(latencias):
+    ordenadas = sorted(latencias)
+    p = lambda pct: ordenadas[min(len(ordenadas) - 1, int(pct / 100 * len(ordenadas)))] * 1000
+    return f"média {sum(ordenadas) / len(ordenadas) * 1000:8.2f} ms   p50 {p(50):8.2f} ms   p99 {p(99):8.2f} ms"
+
+
+def reescrita_completa(data_dir, respostas, adds):
+    caminho = os.path.join(data_dir, "respostas_rapidas.json")
+    latencias = []
+    for i in range(adds):
+        inicio = time.perf_counter()
+        respostas[f"nova_{i}"] = {"message": f"Nova resposta {i}", "category": "nova"}
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(respostas, f, ensure_ascii=False, indent=2)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+
+def wal(data_dir, respostas, adds, durable):
+    store = ResponseStore(data_dir, durable=durable)
+    store.write_snapshot(respostas)
+    store.load()
+    latencias = []
+    for i in range(adds):
+        inicio = time.perf_counter()
+        store.put(f"nova_{i}", f"Nova resposta {i}", "nova")
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--adds", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{args.adds} inclusões sobre {args.size:,} respostas")
+    with tempfile.TemporaryDirectory() as data_dir:
+        print(f"reescrita completa : {percentis(reescrita_completa(data_dir, gerar_respostas(args.size), args.adds))}")
+    with tempfile.TemporaryDirectory() as data_dir:
+        print(f"WAL + fsync        : {percentis(wal(data_dir, gerar_respostas(args.size), args.adds, True))}")
+    with tempfile.TemporaryDirectory() as data_dir:
+        print(f"WAL sem fsync      : {percentis(wal(data_dir, gerar_respostas(args.size), args.adds, False))}")
+
+
+if __name__ == "__main__":
+    main()
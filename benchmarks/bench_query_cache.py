@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: busca com e sem cache de consultas (QueryCache).
+
+Simula atendentes digitando consultas letra a letra ("l", "le", "len",
+...), como faz a busca incremental da interface web, e repetindo os
+termos mais comuns. Compara a latência média da busca direta no
+repositório com a de ChatAssistant.search_responses (cache + extensão
+do resultado do prefixo).
+
+Uso: python benchmarks/bench_query_cache.py [--size 100000] [--agents 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+os.environ.setdefault("ASSISTENTE_CLIPBOARD", "memory")
+
+from bench_search import PALAVRAS, gerar_respostas
+from core.chat_assistant import ChatAssistant
+from core.response_store import ResponseStore
+
+
+def gerar_digitacao(agentes, consultas_por_agente, seed=7):
+    """Sequência de consultas parciais: cada termo é digitado letra a letra"""
+    rnd = random.Random(seed)
+    # Zipf: poucos termos concentram a maior parte das buscas
+    pesos = [1 / (i + 1) for i in range(len(PALAVRAS))]
+    sequencia = []
+    for _ in range(agentes * consultas_por_agente):
+        termo = rnd.choices(PALAVRAS, weights=pesos)[0]
+        sequencia.extend(termo[:fim] for fim in range(1, len(termo) + 1))
+    return sequencia
+
+
+def medir(buscar, consultas):
+    inicio = time.perf_counter()
+    for consulta in consultas:
+        buscar(consulta)
+    return (time.perf_counter() - inicio) / len(consultas) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=10, help="termos digitados por atendente")
+    parser.add_argument("--limit", type=int, default=20, help="0 = sem limite (habilita a extensão de prefixo)")
+    args = parser.parse_args()
+
+    limite = args.limit or None
+    consultas = gerar_digitacao(args.agents, args.queries)
+    with tempfile.TemporaryDirectory() as data_dir:
+        ResponseStore(data_dir, durable=False).write_snapshot(gerar_respostas(args.size))
+        assistant = ChatAssistant(data_dir)
+        assistant.preload()
+        print(f"{args.size:,} respostas; {len(consultas)} buscas parciais (limite {limite})")
+
+        sem_cache = medir(lambda q: assistant.repository.search(q, limit=limite), consultas)
+        com_cache = medir(lambda q: assistant.search_responses(q, limit=limite), consultas)
+        stats = assistant.search_cache.stats()
+        assistant.close()
+
+    print(f"\nsem cache: {sem_cache:8.3f} ms/busca")
+    print(f"com cache: {com_cache:8.3f} ms/busca  ({sem_cache / max(com_cache, 1e-9):.1f}x)")
+    print(f"\nacertos {stats['hits']} ({stats['hit_rate']:.0%}), extensões de prefixo "
+          f"{stats['extensions']}, remoções LRU {stats['evictions']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: respostas como dicts aninhados x QuickResponse (__slots__ +
+categoria internada), e agrupamento por categoria refeito a cada menu x
+CategoryIndex mantido.
+
+Mede memória (tracemalloc) das respostas em memória, tempo para
+percorrê-las lendo mensagem e categoria, e o custo de listar categorias
+e agrupar chaves por categoria.
+
+Uso: python benchmarks/bench_response_model.py [--sizes 100000 1000000]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_search import gerar_respostas
+from core.response_model import CategoryIndex, to_responses
+
+
+def medir_memoria(construir):
+    gc.collect()
+    tracemalloc.start()
+    valor = construir()
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return valor, memoria / 1024 / 1024
+
+
+def medir(func, repeticoes=3):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000
+
+
+def percorrer(respostas):
+    total = 0
+    for key, data in respostas.items():
+        total += len(data["message"]) + len(data["category"])
+    return total
+
+
+def percorrer_atributos(respostas):
+    total = 0
+    for key, data in respostas.items():
+        total += len(data.message) + len(data.category)
+    return total
+
+
+def agrupar(respostas):
+    grupos = {}
+    for key, data in respostas.items():
+        grupos.setdefault(data["category"], []).append(key)
+    return grupos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        texto = json.dumps(gerar_respostas(n))
+        dicts, memoria_dicts = medir_memoria(lambda: json.loads(texto))
+        registros, memoria_registros = medir_memoria(lambda: to_responses(json.loads(texto)))
+        indice, memoria_indice = medir_memoria(lambda: CategoryIndex(registros))
+
+        print(f"\n{n:,} respostas")
+        print(f"   memória   dicts {memoria_dicts:8.1f} MB   QuickResponse {memoria_registros:8.1f} MB"
+              f"   ({1 - memoria_registros / memoria_dicts:.0%} menos; CategoryIndex +{memoria_indice:.1f} MB)")
+        print(f"   percorrer dicts {medir(lambda: percorrer(dicts)):8.1f} ms   "
+              f"QuickResponse {medir(lambda: percorrer(registros)):8.1f} ms"
+              f"   (atributos {medir(lambda: percorrer_atributos(registros)):.1f} ms)")
+        print(f"   categorias: set a cada chamada {medir(lambda: sorted({d['category'] for d in dicts.values()})):8.2f} ms"
+              f"   CategoryIndex {medir(indice.categories):8.4f} ms")
+        print(f"   agrupar:    a cada menu        {medir(lambda: agrupar(dicts)):8.2f} ms"
+              f"   CategoryIndex {medir(indice.groups):8.2f} ms")
+        del dicts, registros, indice, texto
+
+
+if __name__ == "__main__":
+    main()
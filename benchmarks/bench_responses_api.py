@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/responses inteiro x paginado x projetado x em fluxo (NDJSON).
+
+Sobe a API num servidor local (werkzeug, em thread) sobre N respostas
+geradas e mede, para cada forma de carregar a lista, o tamanho do corpo
+transferido (com e sem gzip), o tempo até o primeiro byte do corpo (o que
+a tela precisa para a primeira pintura) e o tempo total.
+
+Uso: python benchmarks/bench_responses_api.py [--sizes 10000 100000]
+"""
+
+import argparse
+import http.client
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_search import gerar_respostas
+from core.response_store import ResponseStore
+
+# (nome, caminho, gzip, payload frio: invalida o JSON em cache antes de cada medida)
+CENARIOS = [
+    ("inteiro (JSON, em cache)", "/api/responses", True, False),
+    ("inteiro (JSON, frio)", "/api/responses", True, True),
+    ("inteiro, sem gzip", "/api/responses", False, False),
+    ("página de 100", "/api/responses?limit=100", True, False),
+    ("página de 100, key+preview", "/api/responses?limit=100&fields=key,preview", True, False),
+    ("NDJSON key+category+preview", "/api/responses?format=ndjson&fields=key,category,preview", True, False),
+    ("NDJSON, sem gzip", "/api/responses?format=ndjson&fields=key,category,preview", False, False),
+    ("NDJSON completo", "/api/responses?format=ndjson", True, False),
+]
+
+
+def medir(port, path, gzip, repeticoes, invalidar=None):
+    """(bytes do corpo, ms até o 1º byte do corpo, ms total), melhor de `repeticoes`"""
+    melhor = None
+    headers = {"Accept-Encoding": "gzip"} if gzip else {}
+    for _ in range(repeticoes):
+        if invalidar:
+            invalidar()
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        inicio = time.perf_counter()
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        primeiro = response.read1(65536) if hasattr(response, "read1") else response.read(1)
+        ttfb = time.perf_counter() - inicio
+        tamanho = len(primeiro) + len(response.read())
+        total = time.perf_counter() - inicio
+        conn.close()
+        if melhor is None or total < melhor[2]:
+            melhor = (tamanho, ttfb * 1000, total * 1000)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    from werkzeug.serving import make_server
+
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            ResponseStore(data_dir, durable=False).write_snapshot(gerar_respostas(n))
+            # O app lê o diretório de dados ao ser importado
+            os.environ["ASSISTENTE_DATA_DIR"] = data_dir
+            os.environ.setdefault("ASSISTENTE_CLIPBOARD", "memory")
+            sys.modules.pop("app", None)
+            sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'web'))
+            import app as web_app
+            web_app.assistant.preload()
+
+            server = make_server("127.0.0.1", 0, web_app.app, threaded=True)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            port = server.server_port
+
+            print(f"\n{n:,} respostas")
+            print(f"   {'cenário':30} {'corpo':>11} {'1º byte':>10} {'total':>10}")
+
+            def invalidar():
+                web_app.assistant.generation += 1
+
+            for nome, path, gzip, frio in CENARIOS:
+                # Aquecimento: payload em cache, índices montados
+                medir(port, path, gzip, 1)
+                tamanho, ttfb, total = medir(port, path, gzip, args.repeat, invalidar if frio else None)
+                print(f"   {nome:30} {tamanho / 1024:8.0f} KB {ttfb:7.1f} ms {total:7.1f} ms")
+
+            server.shutdown()
+            web_app.assistant.close()
+
+
+if __name__ == "__main__":
+    main()
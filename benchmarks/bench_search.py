@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: busca linear (implementação antiga) x índice invertido.
+
+Uso: python benchmarks/bench_search.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.search_index import SearchIndex
+
+PALAVRAS = [
+    "rede", "senha", "lentidão", "acesso", "sistema", "impressora", "email",
+    "protocolo", "atualização", "verificação", "conexão", "usuário", "bloqueio",
+    "aplicação", "servidor", "configuração", "reinicie", "roteador", "setor",
+    "solicitação", "atendimento", "retorno", "minutos", "informação", "cadastro",
+]
+
+CONSULTAS = ["lentidao", "senha", "rede", "ão", "configuracao", "xyz123", "impressora setor"]
+
+
+def gerar_respostas(n, seed=42):
+    """Gera um catálogo sintético de respostas rápidas"""
+    rnd = random.Random(seed)
+    # Vocabulário com cauda longa: palavras base + variações numeradas
+    vocabulario = PALAVRAS + [f"{p}{i}" for p in PALAVRAS for i in range(200)]
+    pesos = [50] * len(PALAVRAS) + [1] * (len(vocabulario) - len(PALAVRAS))
+    respostas = {}
+    for i in range(n):
+        palavras = rnd.choices(vocabulario, weights=pesos, k=rnd.randint(6, 18))
+        respostas[f"{rnd.choice(PALAVRAS)}_{i}"] = {
+            "message": " ".join(palavras).capitalize() + ".",
+            "category": rnd.choice(["rede", "acesso", "performance", "inicio"]),
+        }
+    return respostas
+
+
+def busca_linear(respostas, keyword):
+    """Implementação original de ChatAssistant.search_responses"""
+    matches = {}
+    for key, data in respostas.items():
+        if keyword.lower() in data["message"].lower() or keyword.lower() in key.lower():
+            matches[key] = data
+    return matches
+
+
+def medir(func, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        func()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20, help="top-k do índice")
+    args = parser.parse_args()
+
+    print(f"{'tamanho':>8} {'consulta':<18} {'linear ms':>10} {'índice ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        respostas = gerar_respostas(size)
+
+        inicio = time.perf_counter()
+        index = SearchIndex(respostas)
+        build_ms = (time.perf_counter() - inicio) * 1000
+        gc.collect()  # não cobrar da primeira consulta a coleta pós-construção
+        print(f"{size:>8} {'(construção)':<18} {'':>10} {build_ms:>10.1f}")
+
+        for consulta in CONSULTAS:
+            linear = medir(lambda: busca_linear(respostas, consulta), args.repeat)
+            indexada = medir(lambda: index.search(consulta, limit=args.limit), args.repeat)
+            speedup = linear / indexada if indexada else float("inf")
+            print(f"{size:>8} {consulta:<18} {linear:>10.2f} {indexada:>10.2f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
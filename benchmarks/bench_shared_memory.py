@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memória por worker web, backend json (cópia + índice em cada
+processo) x shared (snapshot mapeado compartilhado).
+
+Sobe N processos (como os workers do gunicorn), cada um carrega as
+respostas e faz algumas buscas e leituras; com todos vivos ao mesmo
+tempo, lê /proc/self/smaps_rollup de cada um. RSS conta as páginas
+compartilhadas inteiras em todo processo; PSS divide cada página entre
+os processos que a usam e é a medida justa de "quanto custa um worker a
+mais". Só Linux.
+
+Uso: python benchmarks/bench_shared_memory.py [--size 100000] [--workers 4]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bench_search import CONSULTAS, gerar_respostas
+from core.repository import create_repository
+from core.response_store import ResponseStore
+
+
+def memoria():
+    """(rss, pss, privada) do processo atual em MB, via smaps_rollup"""
+    campos = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for linha in f:
+            partes = linha.split()
+            if len(partes) == 3 and partes[2] == "kB":
+                campos[partes[0].rstrip(":")] = int(partes[1]) / 1024
+    privada = campos.get("Private_Clean", 0) + campos.get("Private_Dirty", 0)
+    return campos["Rss"], campos["Pss"], privada
+
+
+def worker(backend, data_dir, carregados, liberar, resultados):
+    inicio = time.perf_counter()
+    repositorio = create_repository(backend, data_dir)
+    respostas = repositorio.responses
+    carga = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for consulta in CONSULTAS:
+        repositorio.search(consulta, limit=20)
+    busca = (time.perf_counter() - inicio) / len(CONSULTAS)
+    for key in list(respostas)[::97]:
+        respostas[key]["message"]
+
+    carregados.wait()
+    # Todos vivos e com os dados tocados: agora o PSS reflete o compartilhamento
+    resultados.put((carga, busca) + memoria())
+    liberar.wait()
+    repositorio.close()
+
+
+def medir(backend, data_dir, workers):
+    contexto = multiprocessing.get_context("spawn")
+    carregados = contexto.Barrier(workers + 1)
+    liberar = contexto.Event()
+    resultados = contexto.Queue()
+    processos = [
+        contexto.Process(target=worker, args=(backend, data_dir, carregados, liberar, resultados))
+        for _ in range(workers)
+    ]
+    for processo in processos:
+        processo.start()
+    carregados.wait()
+    medidas = [resultados.get() for _ in processos]
+    liberar.set()
+    for processo in processos:
+        processo.join()
+
+    media = [sum(coluna) / workers for coluna in zip(*medidas)]
+    carga, busca, rss, pss, privada = media
+    print(f"\n[{backend}] {workers} workers")
+    print(f"   carga média        {carga * 1000:8.0f} ms")
+    print(f"   busca média        {busca * 1000:8.2f} ms (top-20, sem cache de consultas)")
+    print(f"   RSS por worker     {rss:8.1f} MB")
+    print(f"   PSS por worker     {pss:8.1f} MB   (total {pss * workers:.1f} MB)")
+    print(f"   privada por worker {privada:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--backends", nargs="+", default=["json", "shared"])
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("Este benchmark precisa de /proc/self/smaps_rollup (Linux)")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        ResponseStore(data_dir, durable=False).write_snapshot(gerar_respostas(args.size))
+        print(f"{args.size:,} respostas, {args.workers} workers por backend")
+        for backend in args.backends:
+            # Primeira carga fora da medição (monta o cache do json / publica o snapshot)
+            create_repository(backend, data_dir).preload()
+            medir(backend, data_dir, args.workers)
+
+
+if __name__ == "__main__":
+    main()
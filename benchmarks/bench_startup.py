@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark de inicialização da CLI.
+
+Mede, em processos novos (como o atendente abrindo a ferramenta):
+  - o tempo de import de `interface.cli` via `python -X importtime`, com
+    os módulos mais pesados;
+  - o tempo de parede até as respostas estarem prontas para o primeiro
+    menu, com o cache de snapshot desligado (frio) e ligado.
+
+Com --output, acrescenta uma linha JSON com os resultados ao arquivo,
+para acompanhar a evolução entre versões.
+
+Uso: python benchmarks/bench_startup.py [--size 20000] [--runs 5] [--output startup.jsonl]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(SRC_DIR)
+
+from core.response_store import ResponseStore
+
+# Mesmo caminho do main.py até o primeiro menu (ChatCLI usa ../data)
+PRIMEIRO_MENU = f"""
+import sys
+sys.path.insert(0, {SRC_DIR!r})
+from interface.cli import ChatCLI
+cli = ChatCLI()
+len(cli.assistant.quick_responses)
+cli.assistant.close()
+"""
+
+
+def gerar_respostas(n):
+    return {
+        f"resposta_{i}": {
+            "message": f"Mensagem padrão número {i} para atendimento de chamados de suporte e rede.",
+            "category": f"categoria_{i % 20}",
+        }
+        for i in range(n)
+    }
+
+
+def medir_imports():
+    """(total em ms, [(ms acumulado, módulo)] dos mais pesados)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import interface.cli"],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    modulos = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulativo, nome = line[len("import time:"):].split("|")
+        modulos.append((int(cumulativo) / 1000, nome.rstrip()))
+    total = next(ms for ms, nome in reversed(modulos) if nome.strip() == "interface.cli")
+    topo = sorted(((ms, nome.strip()) for ms, nome in modulos), reverse=True)
+    return total, topo
+
+
+def medir_primeiro_menu(cwd, runs, cache):
+    env = dict(os.environ, ASSISTENTE_SNAPSHOT_CACHE="1" if cache else "0", ASSISTENTE_BACKEND="json")
+    tempos = []
+    for _ in range(runs):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, "-c", PRIMEIRO_MENU], cwd=cwd, env=env, check=True)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="módulos mais pesados a listar")
+    parser.add_argument("--output", help="arquivo JSONL para acumular resultados")
+    args = parser.parse_args()
+
+    total_imports, topo = medir_imports()
+    print(f"import interface.cli: {total_imports:.1f} ms")
+    for ms, nome in topo[1:args.top + 1]:
+        print(f"   {ms:7.1f} ms  {nome}")
+
+    with tempfile.TemporaryDirectory() as raiz:
+        data_dir = os.path.join(raiz, "data")
+        cwd = os.path.join(raiz, "src")
+        os.makedirs(data_dir)
+        os.makedirs(cwd)
+        ResponseStore(data_dir, durable=False).write_snapshot(gerar_respostas(args.size))
+
+        frio = medir_primeiro_menu(cwd, args.runs, cache=False)
+        # Primeira execução com cache ligado grava o pickle; as seguintes o usam
+        medir_primeiro_menu(cwd, 1, cache=True)
+        quente = medir_primeiro_menu(cwd, args.runs, cache=True)
+
+    print(f"\nAté o primeiro menu ({args.size:,} respostas, mediana de {args.runs} execuções):")
+    print(f"   sem cache de snapshot: {frio:8.1f} ms")
+    print(f"   com cache de snapshot: {quente:8.1f} ms  ({frio / quente:.1f}x)")
+
+    if args.output:
+        resultado = {
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "size": args.size,
+            "import_ms": round(total_imports, 1),
+            "first_menu_cold_ms": round(frio, 1),
+            "first_menu_cached_ms": round(quente, 1),
+        }
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(resultado) + "\n")
+        print(f"\n📄 Resultado acrescentado a {args.output}")
+
+
+if __name__ == "__main__":
+    main()
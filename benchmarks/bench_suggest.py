@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark do motor de sugestões (BM25 vetorizado).
+
+Mede a montagem da matriz termo x resposta, a latência de uma mensagem e
+a vazão em lote (mensagens/s) comparada com pontuar uma a uma.
+
+Uso: python benchmarks/bench_suggest.py [--size 100000] [--messages 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.suggest_engine import SuggestEngine
+
+ASSUNTOS = (
+    "senha bloqueada acesso login conta usuário rede internet roteador wifi lentidão sistema "
+    "aplicativo impressora impressão boleto fatura pagamento cobrança entrega pedido troca "
+    "devolução cancelamento cadastro e-mail caixa anexo servidor backup arquivo pasta permissão "
+    "vpn certificado telefone ramal celular agendamento visita técnico instalação atualização"
+).split()
+
+# Nomes de produtos/sistemas: termos raros, como numa biblioteca real
+PRODUTOS = 5000
+
+FRASES = (
+    "Entendo o problema com {a} no {p}. Vou verificar {b} e retorno em seguida.",
+    "Para resolver {a} do {p}, preciso que confirme os dados de {b}.",
+    "O {a} do {p} está em análise pela equipe de {b}; acompanhe pelo protocolo.",
+    "Já solicitei a correção de {a} no {p}. Enquanto isso, tente reiniciar {b}.",
+)
+
+MENSAGENS = (
+    "Olá, estou com problema de {a} no {p} desde ontem e {b} não funciona",
+    "Bom dia! Meu {a} do {p} parou e preciso de ajuda com {b} urgente",
+    "Não consigo acessar {a} no {p}, aparece erro de {b}",
+    "Quero saber sobre {a} e {b} do {p}, podem me ajudar?",
+)
+
+
+def produto(rnd):
+    return f"sistema{rnd.randrange(PRODUTOS)}"
+
+
+def gerar_respostas(n, rnd):
+    respostas = {}
+    for i in range(n):
+        a, b = rnd.sample(ASSUNTOS, 2)
+        respostas[f"{a}_{b}_{i}"] = {
+            "message": rnd.choice(FRASES).format(a=a, b=b, p=produto(rnd)),
+            "category": rnd.choice(ASSUNTOS),
+        }
+    return respostas
+
+
+def gerar_mensagens(n, rnd):
+    return [
+        rnd.choice(MENSAGENS).format(a=a, b=b, p=produto(rnd))
+        for a, b in (rnd.sample(ASSUNTOS, 2) for _ in range(n))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    respostas = gerar_respostas(args.size, rnd)
+    mensagens = gerar_mensagens(args.messages, rnd)
+
+    inicio = time.perf_counter()
+    engine = SuggestEngine(respostas)
+    print(f"{args.size:,} respostas: matriz montada em {time.perf_counter() - inicio:.2f}s "
+          f"({len(engine.vocabulary):,} termos, {len(engine._docs):,} pares termo-resposta)")
+
+    inicio = time.perf_counter()
+    individuais = [engine.suggest(m, limit=args.limit) for m in mensagens]
+    uma_a_uma = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    lote = engine.suggest_many(mensagens, limit=args.limit)
+    em_lote = time.perf_counter() - inicio
+
+    assert [[k for k, _ in r] for r in individuais] == [[k for k, _ in r] for r in lote]
+    print(f"   uma a uma: {uma_a_uma / len(mensagens) * 1000:8.3f} ms/mensagem   "
+          f"{len(mensagens) / uma_a_uma:10,.0f} mensagens/s")
+    print(f"   em lote:   {em_lote / len(mensagens) * 1000:8.3f} ms/mensagem   "
+          f"{len(mensagens) / em_lote:10,.0f} mensagens/s")
+    print(f"\nExemplo: {mensagens[0]!r}")
+    for key, score in individuais[0]:
+        print(f"   {score:6.2f}  {key}")
+
+
+if __name__ == "__main__":
+    main()
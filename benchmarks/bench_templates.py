@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark do TemplateEngine: str.format a cada chamada (caminho
+antigo) x template compilado x preenchimento em lote.
+
+Uso: python benchmarks/bench_templates.py [--rows 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.template_engine import TemplateEngine
+
+
+def medir(func):
+    inicio = time.perf_counter()
+    func()
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    engine = TemplateEngine()
+    print(f"{'template':<16} {'format µs':>10} {'compilado µs':>13} {'lote µs':>9} {'speedup lote':>13}")
+    for name in engine.list_templates():
+        fields = engine.get_template_fields(name)
+        rows = [{field: f"{field}-{i}" for field in fields} for i in range(args.rows)]
+        source = engine.templates[name]
+
+        def antigo():
+            for values in rows:
+                source.format(**values)
+
+        def compilado():
+            for values in rows:
+                engine.render(name, **values)
+
+        antigo_s = medir(antigo)
+        compilado_s = medir(compilado)
+        lote_s = medir(lambda: engine.render_many(name, rows))
+        n = args.rows / 1e6
+        print(f"{name:<16} {antigo_s / n:>10.3f} {compilado_s / n:>13.3f} {lote_s / n:>9.3f} "
+              f"{antigo_s / lote_s:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
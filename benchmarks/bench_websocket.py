@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark: conexões WebSocket simultâneas e latência do fan-out no modo
+ASGI (web/asgi.py).
+
+Abre N conexões /ws direto no app ASGI (sem rede: mede o laço de eventos,
+o Broadcaster e a serialização, não o kernel), inclui respostas com
+`add_quick_response` numa thread, como faria uma requisição, e mede quanto
+tempo cada conexão leva para receber o delta: p50/p99/máximo e o tempo até
+a última conexão. Também mostra a memória por conexão aberta.
+
+Uso: python benchmarks/bench_websocket.py [--clients 100 1000 5000] [--changes 20]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'web'))
+
+from bench_search import gerar_respostas
+from core.response_store import ResponseStore
+
+
+def percentil(valores, pct):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(round(pct / 100.0 * (len(valores) - 1))))]
+
+
+class Entregas:
+    """Conta as conexões que já receberam o delta atual"""
+
+    def __init__(self, clientes):
+        self.clientes = clientes
+        self.chegadas = []
+        self.completo = asyncio.Event()
+
+    def chegou(self):
+        self.chegadas.append(time.perf_counter())
+        if len(self.chegadas) == self.clientes:
+            self.completo.set()
+
+    def reiniciar(self):
+        self.chegadas = []
+        self.completo.clear()
+
+
+class Cliente:
+    """Conexão /ws simulada: entrega connect/disconnect e anota quando cada delta chega"""
+
+    def __init__(self, entregas):
+        self.entregas = entregas
+        self.entrada = asyncio.Queue()
+        self.entrada.put_nowait({"type": "websocket.connect"})
+        self.aceito = asyncio.get_running_loop().create_future()
+
+    async def receive(self):
+        return await self.entrada.get()
+
+    async def send(self, message):
+        if message["type"] == "websocket.send":
+            if '"delta"' in message["text"]:
+                self.entregas.chegou()
+            elif not self.aceito.done():
+                self.aceito.set_result(None)
+
+
+async def rodada(asgi, clientes, mudancas):
+    loop = asyncio.get_running_loop()
+
+    entregas = Entregas(clientes)
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    conexoes = []
+    lista = [Cliente(entregas) for _ in range(clientes)]
+    for cliente in lista:
+        conexoes.append(asyncio.ensure_future(
+            asgi.app({"type": "websocket", "path": "/ws", "headers": []}, cliente.receive, cliente.send)
+        ))
+    await asyncio.gather(*(cliente.aceito for cliente in lista))
+    memoria = tracemalloc.get_traced_memory()[0] / clientes / 1024
+    tracemalloc.stop()
+    conectar = time.perf_counter() - inicio
+
+    latencias, ultimos = [], []
+    for i in range(mudancas):
+        entregas.reiniciar()
+        enviado = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            await loop.run_in_executor(
+                None, asgi.assistant.add_quick_response, f"ws_{clientes}_{i}", f"resposta nova {i}", "ws"
+            )
+        await entregas.completo.wait()
+        chegadas = [chegada - enviado for chegada in entregas.chegadas]
+        latencias.extend(chegadas)
+        ultimos.append(max(chegadas))
+
+    for cliente in lista:
+        cliente.entrada.put_nowait({"type": "websocket.disconnect"})
+    await asyncio.gather(*conexoes)
+
+    print(f"\n{clientes:,} conexões")
+    print(f"   abrir todas           {conectar * 1000:9.1f} ms ({memoria:.1f} KB por conexão;"
+          f" tempo medido com tracemalloc ligado)")
+    print(f"   entrega p50           {percentil(latencias, 50) * 1000:9.2f} ms")
+    print(f"   entrega p99           {percentil(latencias, 99) * 1000:9.2f} ms")
+    print(f"   última conexão (méd.) {sum(ultimos) / len(ultimos) * 1000:9.2f} ms"
+          f"   (máx. {max(ultimos) * 1000:.2f} ms)")
+
+
+async def executar(args):
+    import asgi
+    asgi.assistant.preload()
+    for clientes in args.clients:
+        await rodada(asgi, clientes, args.changes)
+    asgi._stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--changes", type=int, default=20, help="inclusões por rodada")
+    parser.add_argument("--size", type=int, default=10_000, help="respostas no acervo")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        ResponseStore(data_dir, durable=False).write_snapshot(gerar_respostas(args.size))
+        # O app lê o diretório de dados ao ser importado
+        os.environ["ASSISTENTE_DATA_DIR"] = data_dir
+        os.environ.setdefault("ASSISTENTE_CLIPBOARD", "memory")
+        asyncio.run(executar(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Teste de carga da API web: requisições/s e latência p50/p99 por endpoint.
+
+Uso:
+    python web/app.py &
+    python benchmarks/load_test.py --url http://127.0.0.1:5000 --concurrency 50 --duration 20
+"""
+
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+CONSULTAS = ["rede", "senha", "lent", "lentidao", "acesso", "roteador", "verif", "obrigado"]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+class Worker(threading.Thread):
+    """Cliente com conexão keep-alive que dispara requisições até o prazo"""
+
+    def __init__(self, host, port, deadline, keys, etag_revalidate, seed):
+        super().__init__(daemon=True)
+        self.host = host
+        self.port = port
+        self.deadline = deadline
+        self.keys = keys
+        self.etag_revalidate = etag_revalidate
+        self.random = random.Random(seed)
+        self.latencies = {}
+        self.errors = {}
+        self.etags = {}
+
+    def next_request(self):
+        roll = self.random.random()
+        if roll < 0.60:
+            query = self.random.choice(CONSULTAS)
+            query = query[:self.random.randint(2, len(query))]
+            return "search", "GET", f"/api/search?q={quote(query)}", None
+        if roll < 0.80:
+            body = json.dumps({"key": self.random.choice(self.keys)})
+            return "copy", "POST", "/api/copy", body
+        if roll < 0.90:
+            return "responses", "GET", "/api/responses", None
+        if roll < 0.95:
+            return "templates", "GET", "/api/templates", None
+        return "health", "GET", "/api/health", None
+
+    def run(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+        while time.perf_counter() < self.deadline:
+            name, method, path, body = self.next_request()
+            headers = {"Accept-Encoding": "gzip"}
+            if body is not None:
+                headers["Content-Type"] = "application/json"
+            if self.etag_revalidate and path in self.etags:
+                headers["If-None-Match"] = self.etags[path]
+
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status < 400 or (name == "copy" and response.status == 404)
+                etag = response.getheader("ETag")
+                if etag:
+                    self.etags[path] = etag
+            except (OSError, http.client.HTTPException):
+                ok = False
+                conn.close()
+                conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+
+            elapsed = time.perf_counter() - start
+            if ok:
+                self.latencies.setdefault(name, []).append(elapsed)
+            else:
+                self.errors[name] = self.errors.get(name, 0) + 1
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos")
+    parser.add_argument("--no-etag", action="store_true", help="não reenviar If-None-Match")
+    args = parser.parse_args()
+
+    parts = urlsplit(args.url)
+    host, port = parts.hostname, parts.port or 80
+
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request("GET", "/api/responses")
+    keys = list(json.loads(conn.getresponse().read())) or ["saudacao"]
+    conn.close()
+
+    deadline = time.perf_counter() + args.duration
+    workers = [
+        Worker(host, port, deadline, keys, not args.no_etag, seed)
+        for seed in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    wall = time.perf_counter() - start
+
+    latencies, errors = {}, {}
+    for worker in workers:
+        for name, values in worker.latencies.items():
+            latencies.setdefault(name, []).extend(values)
+        for name, count in worker.errors.items():
+            errors[name] = errors.get(name, 0) + count
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"\n{args.concurrency} clientes, {wall:.1f}s, {total} requisições OK, "
+          f"{sum(errors.values())} erros → {total / wall:.0f} req/s\n")
+    print(f"{'endpoint':<12} {'req':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'erros':>6}")
+    for name in sorted(set(latencies) | set(errors)):
+        values = latencies.get(name, [])
+        print(f"{name:<12} {len(values):>8} {len(values) / wall:>8.0f} "
+              f"{percentile(values, 50) * 1000:>8.2f} {percentile(values, 99) * 1000:>8.2f} "
+              f"{errors.get(name, 0):>6}")
+    all_values = [value for values in latencies.values() for value in values]
+    print(f"{'total':<12} {total:>8} {total / wall:>8.0f} "
+          f"{percentile(all_values, 50) * 1000:>8.2f} {percentile(all_values, 99) * 1000:>8.2f} "
+          f"{sum(errors.values()):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Reprodução de tráfego real: lê o histórico gravado por `log_conversation`
+(chat_history.json e os segmentos arquivados em history/), reconstrói as
+chamadas que os atendentes fizeram e as repete no ritmo original, acelerado,
+contra a API web ou direto contra o ChatAssistant (--in-process).
+
+O histórico só registra o uso de respostas; o resto da sessão é deduzido:
+- uso de uma resposta -> abrir a resposta (GET /api/responses/<key>) e
+  copiar (POST /api/copy); se a mensagem tem campos ({protocolo}...), também
+  o preenchimento (POST /api/template/generate);
+- com probabilidade --search-ratio, uma busca (GET /api/search) por parte de
+  uma palavra da chave, segundos antes do uso;
+- com probabilidade --template-ratio, um template (templates preenchidos não
+  entram no histórico);
+- registro com a mensagem do cliente em `context` -> sugestão (POST /api/suggest).
+
+Intervalos maiores que --max-gap (noites, fins de semana) são encurtados
+antes da aceleração. Cada chamada é agendada no seu instante pelo asyncio e
+disputa uma das --concurrency conexões (ou threads, em processo). O
+relatório traz vazão, latências p50/p90/p99 e erros por endpoint, e o atraso
+em relação à agenda: se ele cresce, o alvo não acompanha aquele ritmo.
+
+A reprodução também registra usos no histórico do alvo: aponte para uma
+cópia dos dados (em processo, os registros vão para uma pasta temporária).
+
+Uso:
+    python benchmarks/replay_traffic.py --history-dir data --url http://127.0.0.1:5000 --speed 10 60
+    python benchmarks/replay_traffic.py --history-dir data --in-process --speed 100 --output replay.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlsplit
+
+os.environ.setdefault("ASSISTENTE_CLIPBOARD", "memory")
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from core.history_store import HistoryStore, entry_key, entry_ts
+from core.search_index import normalize_text
+from load_test import percentile
+
+# Segundos (no tempo do histórico) entre as chamadas de uma mesma sessão
+BUSCA_ANTES = 3.0
+ABRIR_ANTES = 1.0
+PREENCHER_DEPOIS = 5.0
+TEMPLATE_DEPOIS = 10.0
+# O mesmo padrão de /api/search
+LIMITE_BUSCA = 200
+ENDPOINTS = ("search", "response", "copy", "template", "suggest")
+
+_CAMPO = re.compile(r"\{(\w+)\}")
+_PALAVRA = re.compile(r"[a-z]{3,}")
+
+
+def consulta_para(key, rnd):
+    """O que o atendente digitaria para achar `key`: começo de uma das palavras"""
+    palavras = _PALAVRA.findall(normalize_text(key)) or [key]
+    palavra = rnd.choice(palavras)
+    return palavra[:rnd.randint(min(3, len(palavra)), len(palavra))]
+
+
+def valores_campos(campos, i):
+    return {campo: f"{campo} {i}" for campo in campos}
+
+
+def reconstruir(entradas, templates, search_ratio=0.5, template_ratio=0.05, max_gap=60.0, seed=1):
+    """Lista de chamadas (instante em segundos, endpoint, dados), em ordem.
+
+    `templates` é {nome: [campos]}; os instantes partem de 0 e já vêm com
+    os intervalos longos encurtados para `max_gap`.
+    """
+    rnd = random.Random(seed)
+    nomes = sorted(templates)
+    eventos = []
+    relogio, anterior = 0.0, None
+    for i, entrada in enumerate(entradas):
+        ts = entry_ts(entrada)
+        if anterior is not None:
+            relogio += min(max(ts - anterior, 0.0), max_gap)
+        anterior = ts
+
+        key = entry_key(entrada)
+        contexto = entrada.get("context") or ""
+        if contexto and not contexto.startswith("Resposta: "):
+            eventos.append((max(relogio - BUSCA_ANTES, 0.0), "suggest", contexto))
+        if key is None:
+            continue
+        if rnd.random() < search_ratio:
+            eventos.append((max(relogio - BUSCA_ANTES, 0.0), "search", consulta_para(key, rnd)))
+        eventos.append((max(relogio - ABRIR_ANTES, 0.0), "response", key))
+        eventos.append((relogio, "copy", key))
+        campos = _CAMPO.findall(entrada.get("response") or "")
+        if campos:
+            eventos.append((relogio + PREENCHER_DEPOIS, "template", (key, valores_campos(campos, i), True)))
+        if nomes and rnd.random() < template_ratio:
+            nome = rnd.choice(nomes)
+            eventos.append((relogio + TEMPLATE_DEPOIS, "template", (nome, valores_campos(templates[nome], i), False)))
+    eventos.sort(key=lambda evento: evento[0])
+    return eventos
+
+
+class Conexao:
+    """Conexão HTTP/1.1 keep-alive sobre os streams do asyncio"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def pedir(self, method, path, body=None):
+        """Envia a requisição e descarta o corpo da resposta; retorna o status"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        cabecalho = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nAccept-Encoding: gzip\r\n"
+        dados = b""
+        if body is not None:
+            dados = json.dumps(body).encode("utf-8")
+            cabecalho += f"Content-Type: application/json\r\nContent-Length: {len(dados)}\r\n"
+        self.writer.write((cabecalho + "\r\n").encode("ascii") + dados)
+        await self.writer.drain()
+
+        linha = await self.reader.readline()
+        if not linha:
+            raise ConnectionResetError("conexão fechada pelo servidor")
+        status = int(linha.split()[1])
+        tamanho, chunked, fechar = None, False, linha.startswith(b"HTTP/1.0")
+        while True:
+            linha = await self.reader.readline()
+            if linha in (b"\r\n", b"\n", b""):
+                break
+            nome, _, valor = linha.decode("latin-1").partition(":")
+            nome, valor = nome.strip().lower(), valor.strip().lower()
+            if nome == "content-length":
+                tamanho = int(valor)
+            elif nome == "transfer-encoding":
+                chunked = "chunked" in valor
+            elif nome == "connection":
+                fechar = valor == "close"
+        if chunked:
+            while True:
+                n = int((await self.reader.readline()).split(b";")[0], 16)
+                await self.reader.readexactly(n + 2)
+                if n == 0:
+                    break
+        elif tamanho is not None:
+            await self.reader.readexactly(tamanho)
+        else:
+            await self.reader.read()
+            fechar = True
+        if fechar:
+            self.fechar()
+        return status
+
+    def fechar(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class AlvoHttp:
+    """Chamadas à API web, uma conexão por vaga de concorrência"""
+
+    def __init__(self, url, concorrencia):
+        partes = urlsplit(url)
+        self.host, self.port = partes.hostname, partes.port or 80
+        self._livres = [Conexao(self.host, self.port) for _ in range(concorrencia)]
+
+    def templates(self):
+        import http.client
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=10)
+        try:
+            conn.request("GET", "/api/templates/fields")
+            return json.loads(conn.getresponse().read())
+        finally:
+            conn.close()
+
+    async def chamar(self, endpoint, dados):
+        """None se deu certo; senão o motivo do erro"""
+        if endpoint == "search":
+            method, path, body = "GET", f"/api/search?q={quote(dados)}", None
+        elif endpoint == "response":
+            method, path, body = "GET", f"/api/responses/{quote(dados)}", None
+        elif endpoint == "copy":
+            method, path, body = "POST", "/api/copy", {"key": dados}
+        elif endpoint == "suggest":
+            method, path, body = "POST", "/api/suggest", {"message": dados}
+        else:
+            nome, campos, is_response = dados
+            method, path = "POST", "/api/template/generate"
+            body = {"template_name": nome, "fields": campos, "is_response": is_response}
+        # Sempre há uma livre: o semáforo da reprodução limita as chamadas em curso
+        conexao = self._livres.pop()
+        try:
+            status = await conexao.pedir(method, path, body)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            conexao.fechar()
+            raise
+        finally:
+            self._livres.append(conexao)
+        return None if status < 400 else f"HTTP {status}"
+
+    def fechar(self):
+        for conexao in self._livres:
+            conexao.fechar()
+
+
+class AlvoLocal:
+    """Chamadas diretas ao ChatAssistant, em threads (como as requisições do servidor)"""
+
+    def __init__(self, data_dir, backend, concorrencia):
+        from core.chat_assistant import ChatAssistant
+        from core.history_writer import HistoryWriter
+        from core.template_engine import TemplateEngine
+
+        self.assistant = ChatAssistant(data_dir, backend)
+        self.assistant.preload()
+        # Os usos reproduzidos vão para um histórico descartável, não para o real
+        self._historico = tempfile.TemporaryDirectory()
+        self.assistant.history_writer.close()
+        self.assistant.history = HistoryStore(self._historico.name)
+        self.assistant.history_writer = HistoryWriter(self.assistant.history.append)
+        self.template_engine = TemplateEngine(data_dir)
+        self._executor = ThreadPoolExecutor(concorrencia)
+
+    def templates(self):
+        engine = self.template_engine
+        return {name: engine.get_template_fields(name) for name in engine.list_templates()}
+
+    async def chamar(self, endpoint, dados):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._executar, endpoint, dados)
+
+    def _executar(self, endpoint, dados):
+        assistant = self.assistant
+        if endpoint == "search":
+            assistant.search_responses(dados, limit=LIMITE_BUSCA)
+        elif endpoint == "response":
+            response = assistant.quick_responses.get(dados)
+            if response is None:
+                return "não encontrada"
+            response.to_dict()
+        elif endpoint == "copy":
+            if assistant.get_response(dados, copy_to_clipboard=False) is None:
+                return "não encontrada"
+        elif endpoint == "suggest":
+            assistant.suggest_responses(dados)
+        else:
+            nome, campos, is_response = dados
+            try:
+                if is_response:
+                    response = assistant.quick_responses.get(nome)
+                    if response is None:
+                        return "não encontrada"
+                    response["message"].format(**campos)
+                else:
+                    self.template_engine.render(nome, **campos)
+            except KeyError as e:
+                return f"campo {e} ausente"
+        return None
+
+    def fechar(self):
+        self._executor.shutdown()
+        self.assistant.close()
+        self._historico.cleanup()
+
+
+class Medidas:
+    def __init__(self):
+        self.latencias = {}
+        self.erros = {}
+        self.atrasos = []
+
+    def registrar(self, endpoint, latencia, atraso, erro):
+        self.atrasos.append(atraso)
+        if erro is None:
+            self.latencias.setdefault(endpoint, []).append(latencia)
+        else:
+            self.erros.setdefault(endpoint, Counter())[erro] += 1
+
+
+async def _uma_chamada(alvo, vagas, medidas, endpoint, dados, agendado):
+    loop = asyncio.get_running_loop()
+    async with vagas:
+        inicio = loop.time()
+        try:
+            erro = await alvo.chamar(endpoint, dados)
+        except Exception as e:
+            erro = type(e).__name__
+        medidas.registrar(endpoint, loop.time() - inicio, inicio - agendado, erro)
+
+
+async def reproduzir(alvo, eventos, speed, concorrencia):
+    """Dispara cada evento no seu instante / speed; retorna (Medidas, segundos)"""
+    loop = asyncio.get_running_loop()
+    vagas = asyncio.Semaphore(concorrencia)
+    medidas = Medidas()
+    pendentes = set()
+    inicio = loop.time()
+    for instante, endpoint, dados in eventos:
+        agendado = inicio + instante / speed
+        espera = agendado - loop.time()
+        if espera > 0:
+            await asyncio.sleep(espera)
+        tarefa = loop.create_task(_uma_chamada(alvo, vagas, medidas, endpoint, dados, agendado))
+        pendentes.add(tarefa)
+        tarefa.add_done_callback(pendentes.discard)
+    if pendentes:
+        await asyncio.gather(*pendentes)
+    return medidas, loop.time() - inicio
+
+
+def resumo(medidas, segundos):
+    """{endpoint: {...}} com vazão, percentis (ms) e erros, mais o total"""
+    resultado = {}
+    todas = []
+    for endpoint in sorted(set(medidas.latencias) | set(medidas.erros)):
+        latencias = medidas.latencias.get(endpoint, [])
+        todas.extend(latencias)
+        erros = medidas.erros.get(endpoint, Counter())
+        resultado[endpoint] = _linha(latencias, sum(erros.values()), segundos)
+        resultado[endpoint]["motivos"] = dict(erros.most_common(3))
+    total_erros = sum(sum(erros.values()) for erros in medidas.erros.values())
+    resultado["total"] = _linha(todas, total_erros, segundos)
+    return resultado
+
+
+def _linha(latencias, erros, segundos):
+    return {
+        "requisicoes": len(latencias),
+        "por_segundo": len(latencias) / segundos if segundos else 0.0,
+        "p50_ms": percentile(latencias, 50) * 1000,
+        "p90_ms": percentile(latencias, 90) * 1000,
+        "p99_ms": percentile(latencias, 99) * 1000,
+        "max_ms": max(latencias, default=0.0) * 1000,
+        "erros": erros,
+    }
+
+
+def imprimir(speed, eventos, medidas, segundos):
+    duracao = eventos[-1][0] / speed if eventos else 0.0
+    print(f"\n⏩ {speed:g}x: {len(eventos)} chamadas em {segundos:.1f}s (agenda: {duracao:.1f}s), "
+          f"atraso p50 {percentile(medidas.atrasos, 50) * 1000:.1f} ms, "
+          f"p99 {percentile(medidas.atrasos, 99) * 1000:.1f} ms")
+    print(f"   {'endpoint':<10} {'req':>7} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p99 ms':>8} {'máx ms':>8} {'erros':>6}")
+    linhas = resumo(medidas, segundos)
+    for endpoint, linha in linhas.items():
+        print(f"   {endpoint:<10} {linha['requisicoes']:>7} {linha['por_segundo']:>8.1f} "
+              f"{linha['p50_ms']:>8.2f} {linha['p90_ms']:>8.2f} {linha['p99_ms']:>8.2f} "
+              f"{linha['max_ms']:>8.2f} {linha['erros']:>6}")
+        for motivo, quantos in linha.get("motivos", {}).items():
+            print(f"      ⚠️  {quantos}x {motivo}")
+    return {
+        "segundos": segundos,
+        "atraso_p50_ms": percentile(medidas.atrasos, 50) * 1000,
+        "atraso_p99_ms": percentile(medidas.atrasos, 99) * 1000,
+        "endpoints": linhas,
+    }
+
+
+async def reproduzir_todas(alvo, eventos, speeds, concorrencia):
+    """Uma reprodução por fator, em sequência, no mesmo loop (as conexões são reaproveitadas)"""
+    resultados = {}
+    for speed in speeds:
+        medidas, segundos = await reproduzir(alvo, eventos, speed, concorrencia)
+        resultados[f"{speed:g}x"] = imprimir(speed, eventos, medidas, segundos)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history-dir", default=os.path.join(os.path.dirname(__file__), '..', 'data'),
+                        help="pasta com chat_history.json (e history/)")
+    parser.add_argument("--since", help="início (ISO ou dd/mm/YYYY HH:MM:SS)")
+    parser.add_argument("--until", help="fim (exclusivo)")
+    parser.add_argument("--limit", type=int, help="no máximo estes registros do histórico")
+    parser.add_argument("--speed", type=float, nargs="+", default=[10.0], help="fatores de aceleração")
+    parser.add_argument("--max-gap", type=float, default=60.0, help="maior intervalo reproduzido (s)")
+    parser.add_argument("--search-ratio", type=float, default=0.5)
+    parser.add_argument("--template-ratio", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=20, help="conexões (ou threads) simultâneas")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--in-process", action="store_true", help="chama o ChatAssistant em vez da API")
+    parser.add_argument("--data-dir", help="respostas do modo em processo (padrão: --history-dir)")
+    parser.add_argument("--backend", choices=("json", "sqlite", "shared"))
+    parser.add_argument("--output", help="grava os resultados em JSON")
+    args = parser.parse_args()
+
+    entradas = HistoryStore(args.history_dir).between(args.since, args.until)
+    if args.limit:
+        entradas = itertools.islice(entradas, args.limit)
+    entradas = list(entradas)
+    if not entradas:
+        print(f"❌ Nenhum registro de histórico em '{args.history_dir}'")
+        return 1
+
+    if args.in_process:
+        alvo = AlvoLocal(args.data_dir or args.history_dir, args.backend, args.concurrency)
+    else:
+        alvo = AlvoHttp(args.url, args.concurrency)
+    try:
+        inicio = time.perf_counter()
+        eventos = reconstruir(entradas, alvo.templates(), args.search_ratio,
+                              args.template_ratio, args.max_gap, args.seed)
+        mistura = Counter(endpoint for _, endpoint, _ in eventos)
+        print(f"📜 {len(entradas)} registros -> {len(eventos)} chamadas "
+              f"({time.perf_counter() - inicio:.2f}s): "
+              + ", ".join(f"{endpoint} {mistura[endpoint]}" for endpoint in ENDPOINTS if mistura[endpoint]))
+        print(f"🎯 Alvo: {'ChatAssistant em processo' if args.in_process else args.url}, "
+              f"{args.concurrency} simultâneas")
+
+        resultados = asyncio.run(reproduzir_todas(alvo, eventos, args.speed, args.concurrency))
+    finally:
+        alvo.fechar()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"registros": len(entradas), "chamadas": len(eventos), "resultados": resultados},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados gravados em {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
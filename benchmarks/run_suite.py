@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Suíte reprodutível dos caminhos quentes (busca, carga, gravação, histórico,
+templates) sobre catálogos e históricos sintéticos determinísticos.
+
+Grava as medidas em JSON e, se houver base (--baseline), compara: sai com
+código 1 quando algum caminho fica mais lento (mediana) ou usa mais memória
+(pico) que a base além do limite (--threshold). As medidas dependem da
+máquina: gere a base na mesma máquina em que a suíte vai rodar
+(--save-baseline).
+
+Uso:
+    python benchmarks/run_suite.py                              # mede e compara com a base
+    python benchmarks/run_suite.py --save-baseline              # mede e grava como base
+    python benchmarks/run_suite.py --sizes 1000 --only search_responses load_responses
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+
+os.environ.setdefault("ASSISTENTE_CLIPBOARD", "memory")
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from suite.cases import CASOS, Contexto
+from suite.generator import SEED, gerar_catalogo
+from suite.harness import comparar, medir_memoria, medir_tempo
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def executar(args):
+    resultados = {}
+    for tamanho in args.sizes:
+        catalogo = gerar_catalogo(tamanho, args.seed)
+        with tempfile.TemporaryDirectory() as data_dir:
+            ctx = Contexto(data_dir, catalogo, args.history)
+            print(f"\n{tamanho:,} respostas, {args.history:,} registros de histórico")
+            print(f"   {'caso':26} {'mediana ms':>11} {'mín ms':>9} {'µs/op':>9} {'pico KB':>9}")
+            try:
+                for nome in args.only or CASOS:
+                    func, operacoes = CASOS[nome](ctx)
+                    medida = medir_tempo(func, args.repeat)
+                    medida["operacoes"] = operacoes
+                    medida["por_operacao_us"] = medida["mediana_ms"] * 1000 / operacoes
+                    if not args.no_memory:
+                        medida["pico_memoria_kb"] = medir_memoria(func)
+                    resultados[f"{nome}@{tamanho}"] = medida
+                    print(f"   {nome:26} {medida['mediana_ms']:11.3f} {medida['min_ms']:9.3f}"
+                          f" {medida['por_operacao_us']:9.1f} {medida.get('pico_memoria_kb', 0):9.0f}")
+            finally:
+                ctx.fechar()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="respostas no catálogo")
+    parser.add_argument("--history", type=int, default=20000, help="registros de histórico pré-existentes")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--only", nargs="+", choices=sorted(CASOS), help="só estes casos")
+    parser.add_argument("--no-memory", action="store_true", help="não mede o pico de memória")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="regressão tolerada (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="grava as medidas como a nova base")
+    args = parser.parse_args()
+
+    resultados = executar(args)
+    relatorio = {
+        "meta": {
+            "data": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "semente": args.seed,
+            "historico": args.history,
+            "repeticoes": args.repeat,
+        },
+        "resultados": resultados,
+    }
+    destino = args.baseline if args.save_baseline else args.output
+    with open(destino, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Medidas gravadas em {destino}")
+    if args.save_baseline:
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"💡 Sem base em {args.baseline}: rode com --save-baseline para criar")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        base = json.load(f)
+    if base["meta"].get("semente") != args.seed or base["meta"].get("historico") != args.history:
+        print("⚠️  Base gerada com outra semente ou outro histórico: comparação pode não ser justa")
+
+    regressoes = comparar(resultados, base["resultados"], args.threshold)
+    comparados = len(set(resultados) & set(base["resultados"]))
+    if not regressoes:
+        print(f"✅ {comparados} medidas dentro de {args.threshold:.0%} da base")
+        return 0
+    print(f"❌ {len(regressoes)} regressões (limite {args.threshold:.0%}):")
+    for nome, metrica, antes, depois, razao in regressoes:
+        print(f"   {nome:32} {metrica:16} {antes:10.3f} -> {depois:10.3f}  ({razao:.2f}x)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
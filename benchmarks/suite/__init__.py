@@ -0,0 +1,12 @@
+"""
+Suíte de benchmarks reprodutível dos caminhos quentes do assistente.
+
+- `generator`: catálogos de respostas e históricos de conversa sintéticos
+  em português, determinísticos (mesma semente, mesmos dados);
+- `harness`: medição de tempo (mediana de várias execuções) e de pico de
+  memória (tracemalloc, numa execução à parte) e comparação com a base;
+- `cases`: os caminhos medidos (busca, carga, gravação, histórico,
+  templates).
+
+Execução: python benchmarks/run_suite.py (veja --help).
+"""
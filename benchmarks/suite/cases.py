@@ -0,0 +1,154 @@
+"""Caminhos quentes medidos pela suíte.
+
+Cada caso recebe o Contexto (diretório com o catálogo e o histórico já
+gravados) e devolve (função, operações por chamada). A função é chamada
+várias vezes pelo harness, então precisa poder se repetir.
+"""
+
+import contextlib
+import io
+import itertools
+import os
+
+from core.chat_assistant import ChatAssistant
+from core.history_store import HistoryStore
+from core.response_store import ResponseStore
+from core.template_engine import TemplateEngine
+
+from suite.generator import CONSULTAS, gerar_historico, valores_template
+
+HISTORY_CHUNK = 10_000
+
+
+class Contexto:
+    """Diretório de dados de um tamanho de catálogo e os assistentes abertos nele"""
+
+    def __init__(self, data_dir, catalogo, historico):
+        self.data_dir = data_dir
+        self.catalogo = catalogo
+        self.tamanho = len(catalogo)
+        ResponseStore(data_dir).write_snapshot(catalogo)
+        store = HistoryStore(data_dir)
+        entradas = gerar_historico(historico, catalogo)
+        while True:
+            bloco = list(itertools.islice(entradas, HISTORY_CHUNK))
+            if not bloco:
+                break
+            store.append(bloco)
+        self._abertos = []
+
+    def assistente(self):
+        assistant = ChatAssistant(self.data_dir, "json")
+        assistant.preload()
+        self._abertos.append(assistant)
+        return assistant
+
+    def fechar(self):
+        for assistant in self._abertos:
+            assistant.close()
+        self._abertos = []
+
+
+def search_responses(ctx):
+    """Busca sem o cache de consultas (cada consulta vai ao índice)"""
+    assistant = ctx.assistente()
+
+    def buscar():
+        for consulta in CONSULTAS:
+            assistant.search_cache.clear()
+            assistant.search_responses(consulta, limit=20)
+    return buscar, len(CONSULTAS)
+
+
+def search_responses_cache(ctx):
+    """Busca repetida, respondida pelo cache de consultas"""
+    assistant = ctx.assistente()
+
+    def buscar():
+        for consulta in CONSULTAS:
+            assistant.search_responses(consulta, limit=20)
+    return buscar, len(CONSULTAS)
+
+
+def load_responses(ctx):
+    """Recarga com o cache do snapshot (pickle) já montado"""
+    assistant = ctx.assistente()
+    return assistant.load_responses, 1
+
+
+def load_responses_sem_cache(ctx):
+    """Recarga a partir do JSON, como na primeira execução"""
+    assistant = ctx.assistente()
+    cache = assistant.repository.snapshot_cache
+
+    def carregar():
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(cache.cache_path)
+        assistant.load_responses()
+    return carregar, 1
+
+
+def save_responses(ctx):
+    """Gravação completa (atômica) do snapshot"""
+    assistant = ctx.assistente()
+    return assistant.save_responses, 1
+
+
+def add_quick_response(ctx, quantidade=50):
+    """Inclusões uma a uma (cada uma vai para o WAL)"""
+    assistant = ctx.assistente()
+    contador = itertools.count()
+
+    def incluir():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(quantidade):
+                i = next(contador)
+                assistant.add_quick_response(f"bench_{i}", f"Resposta de benchmark {i}.", "bench")
+    return incluir, quantidade
+
+
+def get_response(ctx, quantidade=1000):
+    assistant = ctx.assistente()
+    keys = list(itertools.islice(itertools.cycle(sorted(ctx.catalogo)), quantidade))
+
+    def ler():
+        for key in keys:
+            assistant.get_response(key, copy_to_clipboard=False)
+    return ler, quantidade
+
+
+def log_conversation(ctx, quantidade=1000):
+    """Registros de uso, até estarem gravados em disco"""
+    assistant = ctx.assistente()
+
+    def registrar():
+        for i in range(quantidade):
+            assistant.log_conversation(f"Cliente {i}: não consigo acessar", "Resposta", key="saudacao")
+        assistant.history_writer.flush()
+    return registrar, quantidade
+
+
+def fill_template(ctx, por_template=200):
+    engine = TemplateEngine(ctx.data_dir)
+    chamadas = [
+        (name, valores_template(engine.get_template_fields(name), i))
+        for name in engine.list_templates() for i in range(por_template)
+    ]
+
+    def preencher():
+        for name, valores in chamadas:
+            engine.fill_template(name, **valores)
+    return preencher, len(chamadas)
+
+
+CASOS = {
+    "search_responses": search_responses,
+    "search_responses_cache": search_responses_cache,
+    "load_responses": load_responses,
+    "load_responses_sem_cache": load_responses_sem_cache,
+    "save_responses": save_responses,
+    "add_quick_response": add_quick_response,
+    "get_response": get_response,
+    "log_conversation": log_conversation,
+    "fill_template": fill_template,
+}
@@ -0,0 +1,138 @@
+"""Catálogos e históricos sintéticos, determinísticos, com cara de atendimento real"""
+
+import random
+from datetime import datetime, timedelta
+
+SEED = 2026
+
+# Categoria -> (temas das chaves, trechos de frase usados nas mensagens)
+CATEGORIAS = {
+    "rede": (
+        ["conexao", "wifi", "vpn", "roteador", "cabo", "dns"],
+        ["Vou verificar a conectividade de rede do seu setor.",
+         "Pode reiniciar o roteador e aguardar dois minutos?",
+         "Identificamos instabilidade no link principal da unidade.",
+         "A conexão VPN precisa ser refeita após a atualização.",
+         "Confirme se o cabo de rede está bem encaixado na tomada.",
+         "Estamos acompanhando a lentidão na rede junto à operadora."],
+    ),
+    "acesso": (
+        ["senha", "bloqueio", "usuario", "permissao", "token", "cadastro"],
+        ["Posso ajudar com o desbloqueio da sua senha.",
+         "Sua conta foi bloqueada após tentativas de acesso sem sucesso.",
+         "Enviei um link de redefinição para o e-mail cadastrado.",
+         "A permissão de acesso à pasta foi solicitada ao gestor.",
+         "O token expira em {minutos} minutos; gere um novo se precisar.",
+         "Confirme o nome de usuário utilizado no login, por favor."],
+    ),
+    "performance": (
+        ["lentidao", "travamento", "memoria", "sistema", "aplicacao"],
+        ["Entendo que o sistema está lento neste momento.",
+         "Qual aplicação está apresentando travamento?",
+         "Feche os programas que não estiver usando e tente novamente.",
+         "Nossa equipe está analisando a performance do servidor.",
+         "A atualização de hoje deve resolver a lentidão relatada.",
+         "Pode informar desde quando o problema acontece?"],
+    ),
+    "email": (
+        ["caixa", "anexo", "spam", "assinatura", "outlook"],
+        ["Sua caixa de e-mail está com o espaço quase esgotado.",
+         "Anexos acima de 25 MB não são aceitos pelo servidor.",
+         "Verifique a pasta de spam antes de reenviarmos a mensagem.",
+         "A assinatura padrão está disponível na intranet.",
+         "Reconfigure o Outlook seguindo o passo a passo enviado."],
+    ),
+    "impressora": (
+        ["fila", "toner", "papel", "driver", "digitalizacao"],
+        ["A impressora do {andar}º andar está com a fila travada.",
+         "O toner foi solicitado e chega até amanhã.",
+         "Retire o papel atolado pela tampa traseira, com cuidado.",
+         "Instalei o driver atualizado na sua estação.",
+         "A digitalização para e-mail voltou a funcionar."],
+    ),
+    "inicio": (
+        ["saudacao", "boas_vindas", "agradecimento", "despedida"],
+        ["Olá! Em que posso ajudar?",
+         "Bom dia! Meu nome é {atendente}, como posso ajudar?",
+         "Obrigado pelo contato! Fico feliz em ajudar.",
+         "Se precisar de algo mais, é só chamar."],
+    ),
+    "acompanhamento": (
+        ["retorno", "protocolo", "prazo", "encaminhamento"],
+        ["Vou acompanhar este caso e retorno em {minutos} minutos.",
+         "O protocolo do seu atendimento é {protocolo}.",
+         "O prazo para solução é de até {prazo} dias úteis.",
+         "Encaminhei seu caso para a equipe responsável.",
+         "Assim que houver novidade, entro em contato."],
+    ),
+}
+
+# Mensagens de cliente que originam o uso de cada categoria (contexto do histórico)
+PEDIDOS = {
+    "rede": ["a internet caiu aqui", "sem acesso à rede desde cedo", "wifi não conecta", "vpn não conecta"],
+    "acesso": ["esqueci minha senha", "minha conta está bloqueada", "não consigo fazer login"],
+    "performance": ["o sistema está muito lento", "a aplicação travou de novo", "demora para abrir"],
+    "email": ["não recebo e-mails", "anexo não envia", "caixa cheia"],
+    "impressora": ["impressora não imprime", "papel atolado", "acabou o toner"],
+    "inicio": ["oi", "bom dia", "obrigado pela ajuda"],
+    "acompanhamento": ["alguma novidade do chamado?", "qual o protocolo?", "quando resolve?"],
+}
+
+# Consultas típicas da busca: palavras inteiras, prefixos digitados e sem acento
+CONSULTAS = [
+    "senha", "sen", "lentidao", "lentidão", "rede", "roteador", "impressora", "toner",
+    "protocolo", "vpn", "bloque", "acesso", "email", "anexo", "travamento", "xyz123",
+]
+
+
+def gerar_catalogo(n, seed=SEED):
+    """{key: {"message", "category"}} com n respostas em português"""
+    rnd = random.Random(seed)
+    categorias = sorted(CATEGORIAS)
+    catalogo = {}
+    for i in range(n):
+        categoria = rnd.choice(categorias)
+        temas, trechos = CATEGORIAS[categoria]
+        frases = rnd.sample(trechos, rnd.randint(1, min(3, len(trechos))))
+        catalogo[f"{categoria}_{rnd.choice(temas)}_{i}"] = {
+            "message": " ".join(frases),
+            "category": categoria,
+        }
+    return catalogo
+
+
+def gerar_historico(n, catalogo, seed=SEED, inicio=datetime(2026, 1, 5, 8, 0)):
+    """Gera n registros de histórico (formato de `make_entry`) em ordem cronológica.
+
+    A popularidade das respostas segue uma cauda longa (poucas respostas
+    concentram o uso), os intervalos entre usos são exponenciais e os
+    registros ficam no horário comercial.
+    """
+    rnd = random.Random(seed)
+    keys = sorted(catalogo)
+    pesos = [1.0 / (rank + 1) for rank in range(len(keys))]
+    rnd.shuffle(keys)
+    instante = inicio
+    for i in range(0, n, 1000):
+        for key in rnd.choices(keys, weights=pesos, k=min(1000, n - i)):
+            instante += timedelta(seconds=rnd.expovariate(1 / 20.0))
+            if instante.hour >= 18:
+                instante = (instante + timedelta(days=1)).replace(hour=8, minute=0)
+            data = catalogo[key]
+            yield {
+                "timestamp": instante.isoformat(timespec="seconds"),
+                "ts": round(instante.timestamp(), 3),
+                "key": key,
+                "context": rnd.choice(PEDIDOS[data["category"]]),
+                "response": data["message"],
+            }
+
+
+def valores_template(campos, i):
+    """Valores plausíveis para os campos de um template"""
+    exemplos = {
+        "setor": "Infraestrutura", "protocolo": f"2026{i:08d}", "problema": "acesso à VPN",
+        "caso": f"#{i}", "status": "em análise", "previsao": "hoje às 17h",
+        "tempo": "30", "periodo": "amanhã",
+    }
+    return {campo: exemplos.get(campo, f"{campo}-{i}") for campo in campos}
@@ -0,0 +1,60 @@
+"""Medição de tempo e memória e comparação com a base"""
+
+import gc
+import statistics
+import time
+import tracemalloc
+
+# Diferenças menores que isso são ruído de medição, qualquer que seja a razão
+PISO_MS = 0.05
+PISO_MEMORIA_KB = 64
+
+
+def medir_tempo(func, repeticoes=5, aquecimento=1):
+    """Mediana, mínimo e máximo (ms) de `repeticoes` chamadas, depois do aquecimento"""
+    for _ in range(aquecimento):
+        func()
+    tempos = []
+    for _ in range(repeticoes):
+        # Coleta antes, para não cobrar de uma medida o lixo da anterior
+        gc.collect()
+        inicio = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        "mediana_ms": statistics.median(tempos),
+        "min_ms": min(tempos),
+        "max_ms": max(tempos),
+    }
+
+
+def medir_memoria(func):
+    """Pico de memória alocada (KB) durante uma chamada, via tracemalloc"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def comparar(atual, base, limite):
+    """Regressões de `atual` em relação a `base` (dicts "caso@tamanho" -> medidas).
+
+    Uma medida regride quando passa da base por mais de `limite` (0.25 =
+    25%) e por mais que o piso de ruído. Retorna [(nome, métrica, base,
+    atual, razão)]; casos sem base são ignorados.
+    """
+    regressoes = []
+    for nome, medida in sorted(atual.items()):
+        anterior = base.get(nome)
+        if anterior is None:
+            continue
+        for metrica, piso in (("mediana_ms", PISO_MS), ("pico_memoria_kb", PISO_MEMORIA_KB)):
+            antes, depois = anterior.get(metrica), medida.get(metrica)
+            if not antes or depois is None:
+                continue
+            if depois > antes * (1 + limite) and depois - antes > piso:
+                regressoes.append((nome, metrica, antes, depois, depois / antes))
+    return regressoes
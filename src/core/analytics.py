@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from core.history_store import entry_key, entry_ts
+
+# Registros mais novos que isso podem ainda estar na fila de outro processo
+SETTLE_SECONDS = 5
+
+
+class UsageAnalytics:
+    """Agregados de uso do histórico, mantidos de forma incremental.
+
+    Cada registro é contado uma única vez: `refresh` lê do HistoryStore só
+    o que chegou depois da marca d'água salva em `analytics.json`, então o
+    custo de atualizar é proporcional aos registros novos, não ao log.
+    """
+
+    def __init__(self, state_path=None):
+        self.state_path = state_path
+        self.total = 0
+        self.by_key = Counter()
+        self.by_hour = [0] * 24
+        self.by_day = Counter()
+        # Marca d'água: último ts contado e quantos registros tinham esse ts
+        self.last_ts = None
+        self.last_ts_count = 0
+        # (ts, key, context) -> quantos registros próprios já contados, à frente da marca d'água
+        self.pending = Counter()
+        self._hour_cache = {}
+        self._refresh_lock = threading.Lock()
+        if state_path:
+            self.load()
+
+    def _bucket(self, ts):
+        """(dia, hora) local de um epoch, com cache por hora cheia"""
+        hour_id = int(ts // 3600)
+        bucket = self._hour_cache.get(hour_id)
+        if bucket is None:
+            when = datetime.fromtimestamp(hour_id * 3600)
+            bucket = (when.strftime("%Y-%m-%d"), when.hour)
+            if len(self._hour_cache) > 100000:
+                self._hour_cache.clear()
+            self._hour_cache[hour_id] = bucket
+        return bucket
+
+    def observe(self, entry):
+        """Contabiliza um registro do histórico"""
+        ts = entry_ts(entry)
+        self._count(ts, entry_key(entry))
+        self._advance(ts)
+
+    def _count(self, ts, key):
+        day, hour = self._bucket(ts)
+        self.total += 1
+        self.by_hour[hour] += 1
+        self.by_day[day] += 1
+        if key:
+            self.by_key[key] += 1
+
+    def _advance(self, ts):
+        if self.last_ts is None or ts > self.last_ts:
+            self.last_ts = ts
+            self.last_ts_count = 1
+        elif ts == self.last_ts:
+            self.last_ts_count += 1
+
+    def observe_own(self, entries):
+        """Contabiliza na hora registros que este processo acabou de gravar.
+
+        Não esperam a janela de SETTLE_SECONDS (a ordem deles já é
+        conhecida) nem movem a marca d'água: ficam em `pending` até o
+        `refresh` passar por eles no store, que então não os conta de novo.
+        """
+        with self._refresh_lock:
+            for entry in entries:
+                ts = entry_ts(entry)
+                if self.last_ts is not None and ts <= self.last_ts:
+                    # O refresh já passou por este ponto: já foi contado
+                    continue
+                key = entry_key(entry)
+                self._count(ts, key)
+                self.pending[(ts, key, entry.get("context"))] += 1
+
+    def observe_many(self, entries):
+        for entry in entries:
+            self.observe(entry)
+
+    def refresh(self, store, settle=SETTLE_SECONDS):
+        """Processa os registros do store posteriores à marca d'água.
+
+        Só conta registros com mais de `settle` segundos: com vários
+        processos gravando em lote, um registro recente pode chegar ao
+        arquivo depois de outros mais novos que ele. Os gravados por este
+        processo já entraram por `observe_own` e aqui só movem a marca d'água.
+        """
+        with self._refresh_lock:
+            before = (self.total, self.last_ts, self.last_ts_count)
+            skip = self.last_ts_count
+            watermark = self.last_ts
+            end = time.time() - settle
+            pending = self.pending
+            for entry in store.between(start=watermark, end=end):
+                ts = entry_ts(entry)
+                if watermark is not None and skip and ts == watermark:
+                    # Já contados na rodada anterior
+                    skip -= 1
+                    continue
+                identity = (ts, entry_key(entry), entry.get("context"))
+                if pending.get(identity):
+                    # Gravado por este processo e já contado em observe_own
+                    pending[identity] -= 1
+                    if not pending[identity]:
+                        del pending[identity]
+                    self._advance(ts)
+                    continue
+                self.observe(entry)
+            # Os próprios registros anteriores a `end` já estavam no store
+            for identity in [identity for identity in pending if identity[0] < end]:
+                del pending[identity]
+            added = self.total - before[0]
+            if before != (self.total, self.last_ts, self.last_ts_count) and self.state_path:
+                self.save()
+            return added
+
+    # ------------------------------------------------------- relatórios
+
+    def top_responses(self, n=10):
+        return self.by_key.most_common(n)
+
+    def category_counts(self, responses):
+        """Usos por categoria, a partir das contagens por chave"""
+        counts = Counter()
+        for key, count in self.by_key.items():
+            data = responses.get(key)
+            counts[data["category"] if data else "(removida)"] += count
+        return counts
+
+    def never_used(self, responses):
+        return sorted(key for key in responses if key not in self.by_key)
+
+    def report(self, responses, top=10):
+        """Resumo serializável em JSON (usado pela CLI e pela API)"""
+        return {
+            "total": self.total,
+            "top_responses": [{"key": key, "count": count} for key, count in self.top_responses(top)],
+            "by_hour": list(self.by_hour),
+            "by_day": dict(sorted(self.by_day.items())),
+            "by_category": dict(self.category_counts(responses).most_common()),
+            "never_used": self.never_used(responses),
+        }
+
+    # ------------------------------------------------------- persistência
+
+    def load(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return
+        except ValueError:
+            # Estado corrompido: recomeça do zero (o histórico é a fonte da verdade)
+            return
+        self.total = state["total"]
+        self.by_key = Counter(state["by_key"])
+        self.by_hour = state["by_hour"]
+        self.by_day = Counter(state["by_day"])
+        self.last_ts = state["last_ts"]
+        self.last_ts_count = state["last_ts_count"]
+        self.pending = Counter({
+            (ts, key, context): count for ts, key, context, count in state.get("pending", ())
+        })
+
+    def save(self):
+        state = {
+            "total": self.total,
+            "by_key": self.by_key,
+            "by_hour": self.by_hour,
+            "by_day": self.by_day,
+            "last_ts": self.last_ts,
+            "last_ts_count": self.last_ts_count,
+            "pending": [[ts, key, context, count] for (ts, key, context), count in self.pending.items()],
+        }
+        tmp = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp, self.state_path)
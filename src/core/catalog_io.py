@@ -0,0 +1,171 @@
+import csv
+import io
+import json
+import re
+import sys
+import time
+
+FORMATS = ("csv", "jsonl")
+FIELDS = ("key", "message", "category")
+# Linhas gravadas por vez: uma escrita no armazenamento e uma atualização
+# dos índices por lote
+BATCH_SIZE = 1000
+# Quantas linhas rejeitadas o relatório guarda (as demais só contam)
+MAX_ERRORS = 20
+
+# Sem espaços nem caracteres de controle (\x00 e \x1f separam campos no snapshot mapeado)
+KEY_PATTERN = re.compile(r"[^\s\x00-\x1f\x7f]{1,200}")
+_FORBIDDEN = re.compile(r"[\x00\x1f]")
+
+
+def detect_format(path, fmt=None):
+    """Formato explícito ou pela extensão do arquivo"""
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato desconhecido: {fmt!r} (use {', '.join(FORMATS)})")
+        return fmt
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if path.lower().endswith(".csv"):
+        return "csv"
+    raise ValueError(f"Não sei o formato de {path!r}: use --format {'/'.join(FORMATS)}")
+
+
+def open_input(path):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", newline="")
+    return open(path, encoding="utf-8-sig", newline="")
+
+
+def open_output(path):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def read_rows(stream, fmt):
+    """Gera (número da linha, dict ou None se ilegível) sem carregar o arquivo"""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        missing = [field for field in ("key", "message") if field not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError(f"Cabeçalho do CSV sem a(s) coluna(s): {', '.join(missing)}")
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def validate(row):
+    """(key, message, category) ou a mensagem de erro da linha"""
+    if row is None:
+        return "linha ilegível (esperado um objeto JSON)"
+    key = row.get("key")
+    message = row.get("message")
+    category = row.get("category") or ""
+    if not isinstance(key, str) or not key.strip():
+        return "código vazio"
+    key = key.strip()
+    if not KEY_PATTERN.fullmatch(key):
+        return f"código inválido {key!r} (sem espaços, até 200 caracteres)"
+    if not isinstance(message, str) or not message.strip():
+        return f"mensagem vazia em '{key}'"
+    if not isinstance(category, str):
+        return f"categoria inválida em '{key}'"
+    if _FORBIDDEN.search(message) or _FORBIDDEN.search(category):
+        return f"caractere de controle na mensagem/categoria de '{key}'"
+    return key, message.strip(), category.strip()
+
+
+class ImportReport:
+    """Contagens e vazão de uma importação"""
+
+    def __init__(self):
+        self.read = 0
+        self.imported = 0
+        self.skipped = 0      # código já existente (sem --replace)
+        self.rejected = 0     # inválidas ou repetidas no próprio arquivo
+        self.batches = 0
+        self.errors = []      # (linha, motivo), até MAX_ERRORS
+        self.elapsed = 0.0
+
+    def reject(self, line, reason):
+        self.rejected += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((line, reason))
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+def import_catalog(assistant, stream, fmt, batch_size=BATCH_SIZE, replace=False, progress=None):
+    """Importa o catálogo em lotes; retorna um ImportReport.
+
+    Só o lote atual e o conjunto de códigos já lidos ficam em memória.
+    Cada lote vira uma chamada a `assistant.add_many` (um append no WAL /
+    uma transação, índices atualizados uma vez). Códigos que já existem
+    são pulados, a menos que `replace`; repetidos no arquivo valem só na
+    primeira ocorrência.
+    """
+    report = ImportReport()
+    seen = set()
+    batch = []
+    start = time.perf_counter()
+
+    def flush():
+        report.imported += assistant.add_many(batch)
+        report.batches += 1
+        batch.clear()
+        if progress:
+            progress(report)
+
+    for line, row in read_rows(stream, fmt):
+        report.read += 1
+        result = validate(row)
+        if isinstance(result, str):
+            report.reject(line, result)
+            continue
+        key = result[0]
+        if key in seen:
+            report.reject(line, f"código '{key}' repetido no arquivo")
+            continue
+        seen.add(key)
+        # Relido a cada linha: o backend shared troca o mapeamento a cada lote
+        if not replace and key in assistant.quick_responses:
+            report.skipped += 1
+            continue
+        batch.append(result)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def export_catalog(responses, stream, fmt, category=None):
+    """Grava as respostas em CSV/JSONL uma linha por vez; retorna quantas"""
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(FIELDS)
+    for key, data in responses.items():
+        if category is not None and data["category"] != category:
+            continue
+        if fmt == "csv":
+            writer.writerow((key, data["message"], data["category"]))
+        else:
+            stream.write(json.dumps(
+                {"key": key, "message": data["message"], "category": data["category"]},
+                ensure_ascii=False,
+            ) + "\n")
+        count += 1
+    return count
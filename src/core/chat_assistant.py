@@ -1,23 +1,102 @@
-import json
-import pyperclip
-from datetime import datetime
+from collections import deque
 import os
+import threading
+
+from core import clipboard, metrics
+from core.history_store import HistoryStore, make_entry
+from core.history_writer import HistoryWriter
+from core.query_cache import QueryCache
+from core.repository import create_repository
+from core.search_index import normalize_text
+
+# Quantos registros recentes ficam em memória (o arquivo guarda todos)
+HISTORY_MEMORY_LIMIT = 1000
+# Registros próprios contados e ainda não vistos pelo refresh antes de forçar um
+MAX_PENDING = 10000
+# "json" (padrão), "sqlite" ou "shared" (snapshot mapeado, para vários workers web)
+DEFAULT_BACKEND = os.environ.get("ASSISTENTE_BACKEND", "json")
+# Alterações maiores que isto (ex.: importação) viram um aviso "reset" em vez da lista
+MAX_DELTA_KEYS = 500
+# Similaridade a partir da qual uma resposta nova é avisada como quase-duplicata
+DUPLICATE_THRESHOLD = 0.8
 
 class ChatAssistant:
-    def __init__(self, data_dir="../data"):
+    def __init__(self, data_dir="../data", backend=None):
         self.data_dir = data_dir
         os.makedirs(data_dir, exist_ok=True)
-        self.quick_responses = self.load_responses()
-        self.conversation_history = []
+        self.repository = create_repository(
+            backend or DEFAULT_BACKEND, data_dir, self.get_default_responses
+        )
+        self.conversation_history = deque(maxlen=HISTORY_MEMORY_LIMIT)
+        self.history = HistoryStore(data_dir)
+        self.history_writer = HistoryWriter(self.history.append, on_written=self._history_written)
+        self._analytics = None
+        # Último registro gravado antes de os agregados serem carregados
+        self._last_written = None
+        self._analytics_lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self.search_cache = QueryCache()
+        self._suggest_engine = None
+        self._suggest_lock = threading.Lock()
+        self._dedup_index = None
+        self._dedup_lock = threading.Lock()
+        # Cópias em segundo plano (ASSISTENTE_CLIPBOARD=memory em servidores)
+        self.clipboard = clipboard.get_service()
+        # Incrementado a cada alteração das respostas (invalida caches derivados)
+        self.generation = 0
+        self._listeners = []
+    
+    @property
+    def analytics(self):
+        """Agregados de uso, carregados só quando alguém pede estatísticas"""
+        if self._analytics is None:
+            from core.analytics import UsageAnalytics
+            with self._analytics_lock:
+                if self._analytics is None:
+                    analytics = UsageAnalytics(os.path.join(self.data_dir, "analytics.json"))
+                    analytics.observe_own(self._written_history())
+                    self._analytics = analytics
+        return self._analytics
+    
+    def _written_history(self):
+        """Registros de `conversation_history` que já estão no disco"""
+        last = self._last_written
+        entries = list(self.conversation_history)
+        for i in range(len(entries) - 1, -1, -1):
+            if entries[i] is last:
+                return entries[:i + 1]
+        # Saiu do deque (ou nada gravado): os mais antigos ficam para o refresh
+        return []
+    
+    def _history_written(self, entries):
+        """Registros deste processo entram nos agregados assim que gravados"""
+        with self._analytics_lock:
+            analytics = self._analytics
+            if analytics is None:
+                # Só a posição: os registros continuam em conversation_history
+                self._last_written = entries[-1]
+                return
+        analytics.observe_own(entries)
+        if len(analytics.pending) > MAX_PENDING:
+            # Sem relatórios por muito tempo: o refresh esvazia `pending`
+            analytics.refresh(self.history)
+    
+    def preload(self):
+        """Carrega as respostas antes do primeiro uso (pode rodar em outra thread)"""
+        self.repository.preload()
+    
+    @property
+    def quick_responses(self):
+        """Mapeamento key -> {"message", "category"} do backend atual"""
+        return self.repository.responses
     
     def load_responses(self):
-        """Carrega respostas rápidas de um arquivo JSON"""
-        file_path = os.path.join(self.data_dir, "respostas_rapidas.json")
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return self.get_default_responses()
+        """(Re)carrega as respostas rápidas do armazenamento"""
+        responses = self.repository.load()
+        self.generation += 1
+        if self._listeners:
+            self._repository_changed(None, None, None)
+        return responses
     
     def get_default_responses(self):
         """Retorna respostas padrão"""
@@ -49,54 +128,295 @@ class ChatAssistant:
         }
     
     def save_responses(self):
-        """Salva as respostas no arquivo JSON"""
-        file_path = os.path.join(self.data_dir, "respostas_rapidas.json")
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(self.quick_responses, f, ensure_ascii=False, indent=2)
-    
-    def add_quick_response(self, key, message, category):
-        """Adiciona nova resposta rápida"""
-        self.quick_responses[key] = {
-            "message": message,
-            "category": category
-        }
-        self.save_responses()
+        """Salva todas as respostas (gravação atômica)"""
+        if self.repository.save():
+            self.generation += 1
+    
+    def reload_if_changed(self):
+        """Aplica alterações feitas em disco (edição manual ou outro processo)"""
+        if self.repository.poll():
+            self.generation += 1
+            return True
+        return False
+    
+    def add_quick_response(self, key, message, category, check_duplicates=True):
+        """Adiciona nova resposta rápida; retorna as parecidas que já existiam [(key, similaridade)].
+
+        A verificação só roda se o índice de duplicatas já foi carregado
+        (`find_similar_responses`, `find_duplicates`): uma inclusão nunca
+        calcula as assinaturas do acervo. Alterações vindas de fora desde
+        o último sync só entram na próxima análise.
+        """
+        duplicates, minhash = [], None
+        index = self._dedup_index
+        if check_duplicates and index is not None:
+            from core.dedup_index import message_minhash
+            minhash = message_minhash(message)
+            responses = self.quick_responses
+            duplicates = [
+                (other, similarity)
+                for other, similarity in index[1].similar(message, DUPLICATE_THRESHOLD, exclude=key, minhash=minhash)
+                if other in responses
+            ]
+        if self.repository.put(key, message, category):
+            generation = self.generation
+            self.generation += 1
+            self._dedup_added(generation, key, message, minhash)
         print(f"✅ Resposta '{key}' adicionada com sucesso!")
+        for other, similarity in duplicates:
+            print(f"⚠️  Parecida com '{other}' ({similarity:.0%})")
+        return duplicates
+    
+    @metrics.timed("import_batch")
+    def add_many(self, rows):
+        """Inclui/substitui um lote de (key, message, category) numa gravação só"""
+        count = self.repository.put_many(rows)
+        if count:
+            self.generation += 1
+        return count
     
-    def get_response(self, key):
+    @metrics.timed("get_response")
+    def get_response(self, key, copy_to_clipboard=True):
         """Recupera uma resposta rápida"""
         if key in self.quick_responses:
             response = self.quick_responses[key]["message"]
-            pyperclip.copy(response)
-            self.log_conversation(f"Resposta: {key}", response)
+            if copy_to_clipboard:
+                self.clipboard.copy(response)
+            self.log_conversation(f"Resposta: {key}", response, key=key)
             return response
         return None
     
-    def search_responses(self, keyword):
-        """Busca respostas por palavra-chave"""
+    @metrics.timed("search_responses")
+    def search_responses(self, keyword, limit=None):
+        """Busca respostas por palavra-chave (ignora acentos, ordena por relevância)"""
         matches = {}
-        for key, data in self.quick_responses.items():
-            if keyword.lower() in data["message"].lower() or keyword.lower() in key.lower():
+        responses = self.quick_responses
+        for key in self._search_keys(keyword, limit):
+            data = responses.get(key)
+            if data is not None:
                 matches[key] = data
         return matches
     
-    def log_conversation(self, context, response):
+    @property
+    def suggest_engine(self):
+        """Índice BM25 das respostas, remontado quando elas mudam"""
+        engine = self._suggest_engine
+        if engine is None or engine[0] != self.generation:
+            with self._suggest_lock:
+                engine = self._suggest_engine
+                if engine is None or engine[0] != self.generation:
+                    # NumPy só é importado quando alguém pede sugestões
+                    from core.suggest_engine import SuggestEngine
+                    generation = self.generation
+                    engine = (generation, SuggestEngine(self.quick_responses))
+                    self._suggest_engine = engine
+        return engine[1]
+    
+    @metrics.timed("suggest_responses")
+    def suggest_responses(self, message, limit=5):
+        """Respostas mais adequadas à mensagem do cliente: [(key, score)]"""
+        return self.suggest_engine.suggest(message, limit=limit)
+    
+    @metrics.timed("suggest_responses_many")
+    def suggest_responses_many(self, messages, limit=5):
+        """Sugestões para várias mensagens de uma vez"""
+        return self.suggest_engine.suggest_many(list(messages), limit=limit)
+    
+    @property
+    def dedup_index(self):
+        """Assinaturas MinHash das respostas, alinhadas com a versão atual.
+
+        Vêm do arquivo gravado (`respostas.minhash.npz`); só as respostas
+        novas ou alteradas desde a última gravação são recalculadas.
+        Inclusões deste processo atualizam o índice chave a chave
+        (`_dedup_added`); o sync aqui só roda depois de outras alterações
+        (recarga, importação, outros processos).
+        """
+        index = self._dedup_index
+        if index is None or index[0] != self.generation:
+            with self._dedup_lock:
+                index = self._dedup_index
+                if index is None or index[0] != self.generation:
+                    # NumPy só é importado quando alguém procura duplicatas
+                    from core.dedup_index import DedupIndex
+                    generation = self.generation
+                    dedup = index[1] if index else DedupIndex.load(
+                        os.path.join(self.data_dir, "respostas.minhash.npz")
+                    )
+                    if dedup.sync(self.quick_responses):
+                        dedup.save()
+                    index = (generation, dedup)
+                    self._dedup_index = index
+        return index[1]
+    
+    def _dedup_added(self, generation, key, message, minhash):
+        """Atualiza só a resposta incluída no índice de duplicatas, se ele já foi carregado"""
+        with self._dedup_lock:
+            index = self._dedup_index
+            if index is None:
+                return
+            index[1].add(key, message, minhash)
+            if index[0] == generation:
+                # Estava em dia antes da inclusão: continua, sem novo sync
+                self._dedup_index = (self.generation, index[1])
+    
+    def find_similar_responses(self, message, limit=5, exclude=None, threshold=DUPLICATE_THRESHOLD):
+        """Respostas existentes quase iguais a `message`: [(key, similaridade)]"""
+        return self.dedup_index.similar(message, threshold, limit=limit, exclude=exclude)
+    
+    @metrics.timed("find_duplicates")
+    def find_duplicates(self, threshold=DUPLICATE_THRESHOLD):
+        """Grupos de respostas quase iguais no acervo: [[(key, similaridade com a primeira)]]"""
+        return self.dedup_index.duplicate_groups(threshold)
+    
+    def complete_key(self, prefix, limit=10):
+        """Chaves que começam com `prefix` (ignora maiúsculas e acentos)"""
+        return self.repository.key_index.complete(prefix, limit=limit)
+    
+    def count_key_prefix(self, prefix):
+        """Quantas chaves começam com `prefix`"""
+        return self.repository.key_index.count_prefix(prefix)
+    
+    def unique_key_completion(self, prefix):
+        """A chave, se for a única que começa com `prefix`; senão None"""
+        return self.repository.key_index.unique_completion(prefix)
+    
+    def suggest_keys(self, text, limit=5):
+        """Chaves parecidas com `text` (até 2 erros de digitação)"""
+        return self.repository.key_index.suggest(text, limit=limit)
+    
+    def _search_keys(self, keyword, limit):
+        """Chaves do resultado, via cache de consultas quando possível"""
+        query = normalize_text(keyword.strip())
+        if not query:
+            return []
+        generation = self.generation
+        keys = self.search_cache.get(generation, query, limit)
+        if keys is None:
+            # "lent" depois de "len": refiltra o resultado anterior em vez do acervo
+            candidates = self.search_cache.extendable(generation, query, limit)
+            keys = self.repository.search(query, limit=limit, candidates=candidates)
+            self.search_cache.put(generation, query, limit, keys)
+        return keys
+    
+    @metrics.timed("log_conversation")
+    def log_conversation(self, context, response, key=None):
         """Registra o uso para analytics"""
-        log_entry = {
-            "timestamp": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
-            "context": context,
-            "response": response
-        }
-        self.conversation_history.append(log_entry)
-        
-        # Salva em arquivo
-        log_file = os.path.join(self.data_dir, "chat_history.json")
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(log_entry, ensure_ascii=False) + '\n')
+        log_entry = make_entry(context, response, key=key)
+        with self._log_lock:
+            # Mesma ordem no deque e na fila de gravação (ver `_written_history`)
+            self.conversation_history.append(log_entry)
+            # Gravado em lote, em segundo plano
+            self.history_writer.write(log_entry)
+    
+    def recent_history(self, n=5):
+        """Últimos n registros do histórico, inclusive de sessões anteriores"""
+        self.history_writer.flush()
+        return self.history.tail(n)
+    
+    def key_history(self, key, limit=5):
+        """Últimos usos de uma resposta específica"""
+        self.history_writer.flush()
+        return self.history.by_key(key, limit=limit)
+    
+    def usage_report(self, top=10):
+        """Estatísticas de uso (top respostas, horários, categorias, nunca usadas)"""
+        self.history_writer.flush()
+        self.analytics.refresh(self.history)
+        return self.analytics.report(self.quick_responses, top=top)
+    
+    def metric_samples(self):
+        """Valores atuais para o /metrics: (nome, tipo, ajuda, valor)"""
+        samples = [
+            ("assistente_responses", "gauge", "Respostas rápidas carregadas", len(self.quick_responses)),
+            ("assistente_responses_generation", "gauge", "Geração atual das respostas", self.generation),
+        ]
+        cache = self.search_cache.stats()
+        samples += [
+            ("assistente_search_cache_entries", "gauge", "Consultas no cache de busca", cache["entries"]),
+            ("assistente_search_cache_hits_total", "counter", "Acertos do cache de busca", cache["hits"]),
+            ("assistente_search_cache_misses_total", "counter", "Faltas do cache de busca", cache["misses"]),
+            ("assistente_search_cache_extensions_total", "counter",
+             "Buscas que refiltraram o resultado de um prefixo", cache["extensions"]),
+            ("assistente_search_cache_evictions_total", "counter", "Consultas removidas por LRU", cache["evictions"]),
+            ("assistente_search_cache_invalidations_total", "counter",
+             "Limpezas do cache por mudança nas respostas", cache["invalidations"]),
+        ]
+        copies = self.clipboard.stats()
+        samples += [
+            ("assistente_clipboard_requests_total", "counter", "Cópias pedidas", copies["requests"]),
+            ("assistente_clipboard_writes_total", "counter", "Cópias gravadas no backend", copies["writes"]),
+            ("assistente_clipboard_coalesced_total", "counter",
+             "Cópias substituídas por uma mais nova antes de gravar", copies["coalesced"]),
+        ]
+        return samples
+    
+    def close(self):
+        """Grava o histórico e a cópia pendentes; chamar ao encerrar"""
+        self.clipboard.flush(timeout=2.0)
+        self.history_writer.close()
+        if self._dedup_index is not None:
+            # Inclusões desta sessão: a próxima abertura não precisa recalculá-las
+            self._dedup_index[1].save()
+        self.repository.close()
+    
+    def list_keys(self, category=None, after=None, limit=100):
+        """Página de chaves (ordem alfabética) depois do cursor `after`; retorna (keys, próximo cursor ou None)"""
+        if category is None:
+            keys = self.repository.page_keys(after, limit + 1)
+        else:
+            keys = self.repository.category_index.page(category, after, limit + 1)
+        if len(keys) > limit:
+            keys = keys[:limit]
+            return keys, keys[-1]
+        return keys, None
+    
+    def count_keys(self, category=None):
+        """Total de respostas (da categoria, se informada)"""
+        if category is None:
+            return len(self.quick_responses)
+        return self.repository.category_index.count(category)
+    
+    def subscribe(self, listener):
+        """Chama `listener(change)` a cada alteração das respostas (inclusões, recargas).
+
+        `change` é um dict pronto para JSON: {"type": "delta", "added":
+        {key: resposta}, "changed": {...}, "removed": [keys], "total": n},
+        ou {"type": "reset", "total": n} quando não dá para dizer o que
+        mudou. Pode ser chamado de qualquer thread.
+        """
+        self._listeners.append(listener)
+        self.repository.on_change = self._repository_changed
+    
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+        if not self._listeners:
+            # Sem ninguém ouvindo o repositório não compara antes/depois
+            self.repository.on_change = None
+    
+    def _repository_changed(self, added, changed, removed):
+        responses = self.quick_responses
+        if added is None or len(added) + len(changed) + len(removed) > MAX_DELTA_KEYS:
+            change = {"type": "reset", "total": len(responses)}
+        else:
+            change = {
+                "type": "delta",
+                "added": {key: responses[key].to_dict() for key in added if key in responses},
+                "changed": {key: responses[key].to_dict() for key in changed if key in responses},
+                "removed": removed,
+                "total": len(responses),
+            }
+        for listener in list(self._listeners):
+            try:
+                listener(change)
+            except Exception as e:
+                print(f"⚠️ Falha ao avisar alteração das respostas: {e}")
     
     def get_categories(self):
         """Retorna todas as categorias disponíveis"""
-        categories = set()
-        for data in self.quick_responses.values():
-            categories.add(data["category"])
-        return sorted(list(categories))
\ No newline at end of file
+        return self.repository.categories()
+    
+    def get_category_groups(self):
+        """{categoria: [keys]} mantido pelo repositório (sem percorrer as respostas)"""
+        return self.repository.category_index.groups()
\ No newline at end of file
@@ -0,0 +1,183 @@
+import atexit
+import os
+import threading
+import time
+
+from core import metrics
+
+# "system" (pyperclip: xclip/xsel/wl-copy, pbcopy, Windows) ou "memory" (servidores, testes)
+DEFAULT_BACKEND = os.environ.get("ASSISTENTE_CLIPBOARD", "system")
+
+
+class SystemClipboard:
+    """Área de transferência do sistema via pyperclip.
+
+    O pyperclip só é importado no primeiro uso: ao carregar ele procura
+    backends (xclip, xsel, wl-copy, ...), o que pesa na inicialização de
+    quem nem chega a copiar nada. No Linux cada cópia ainda executa um
+    processo (xclip/xsel), por isso o ClipboardService chama isto fora
+    da thread da interface.
+    """
+
+    name = "system"
+
+    def copy(self, text):
+        import pyperclip
+        pyperclip.copy(text)
+
+    def paste(self):
+        import pyperclip
+        return pyperclip.paste()
+
+
+class MemoryClipboard:
+    """Área de transferência em memória (servidores sem display e testes)"""
+
+    name = "memory"
+
+    def __init__(self):
+        self.value = ""
+        self.copies = 0
+
+    def copy(self, text):
+        self.value = text
+        self.copies += 1
+
+    def paste(self):
+        return self.value
+
+
+BACKENDS = {"system": SystemClipboard, "memory": MemoryClipboard}
+
+
+class ClipboardService:
+    """Copia em segundo plano, sem travar a interface.
+
+    `copy` só guarda o texto e acorda a thread de trabalho, que chama o
+    backend. Cópias feitas enquanto o backend ainda está ocupado se fundem:
+    só a mais recente é gravada, que é o que o usuário vai colar. Falhas
+    do backend ficam em `last_error` em vez de derrubar quem copiou.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or SystemClipboard()
+        self._condition = threading.Condition()
+        self._pending = None
+        self._busy = False
+        self._closed = False
+        self._thread = None
+        self.last_error = None
+        # Instrumentação
+        self.requests = 0
+        self.writes = 0
+        self.coalesced = 0
+        self.request_seconds = 0.0
+        self.write_seconds = 0.0
+        self.max_write_seconds = 0.0
+
+    def _ensure_worker(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="clipboard", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def copy(self, text):
+        """Agenda a cópia e retorna imediatamente"""
+        start = time.perf_counter()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("ClipboardService encerrado")
+            self._ensure_worker()
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = text
+            self._condition.notify_all()
+            self.requests += 1
+            self.request_seconds += time.perf_counter() - start
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                text, self._pending = self._pending, None
+                self._busy = True
+
+            start = time.perf_counter()
+            error = None
+            try:
+                self.backend.copy(text)
+            except Exception as e:
+                error = e
+            elapsed = time.perf_counter() - start
+            metrics.observe("clipboard_write", elapsed)
+            if error is not None:
+                metrics.ERRORS.inc("clipboard_write")
+
+            with self._condition:
+                self._busy = False
+                self.writes += 1
+                self.write_seconds += elapsed
+                self.max_write_seconds = max(self.max_write_seconds, elapsed)
+                self.last_error = error
+                self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Espera a última cópia chegar ao backend; False se o tempo acabou"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._pending is None and not self._busy, timeout)
+
+    def paste(self):
+        self.flush()
+        return self.backend.paste()
+
+    def take_error(self):
+        """Retorna (e limpa) o erro da última cópia, se houve"""
+        with self._condition:
+            error, self.last_error = self.last_error, None
+            return error
+
+    def stats(self):
+        """Contadores e latências (ms) para comparar com a cópia síncrona"""
+        with self._condition:
+            return {
+                "backend": getattr(self.backend, "name", type(self.backend).__name__),
+                "requests": self.requests,
+                "writes": self.writes,
+                "coalesced": self.coalesced,
+                "avg_request_ms": self.request_seconds / self.requests * 1000 if self.requests else 0.0,
+                "avg_write_ms": self.write_seconds / self.writes * 1000 if self.writes else 0.0,
+                "max_write_ms": self.max_write_seconds * 1000,
+            }
+
+    def close(self, timeout=2.0):
+        """Grava a cópia pendente e encerra a thread"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service():
+    """Serviço compartilhado do processo, com o backend de ASSISTENTE_CLIPBOARD"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                backend = BACKENDS.get(DEFAULT_BACKEND, SystemClipboard)()
+                _service = ClipboardService(backend)
+    return _service
+
+
+def copy(text):
+    """Copia texto para a área de transferência (sem bloquear)"""
+    get_service().copy(text)
@@ -0,0 +1,414 @@
+import heapq
+import os
+import re
+import zlib
+
+import numpy as np
+
+from core.search_index import normalize_text
+
+# Shingles de 5 caracteres do texto normalizado (sem acento, só letras/dígitos)
+SHINGLE_SIZE = 5
+# Assinatura MinHash: 64 permutações, em 16 faixas de 4 para o LSH. Pares com
+# similaridade 0.8 caem juntos em alguma faixa com probabilidade ~99,9%;
+# pares com 0.3, em ~12%
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# Similaridade (Jaccard estimada) a partir da qual duas respostas são "quase iguais"
+DEFAULT_THRESHOLD = 0.8
+# Mude ao alterar o cálculo das assinaturas (invalida o arquivo gravado)
+INDEX_FORMAT = 1
+SEED = 20260101
+
+# Shingles processados por vez ao calcular assinaturas (limita a memória temporária)
+BATCH_SHINGLES = 1 << 20
+# Pares verificados por vez na análise completa
+BATCH_PAIRS = 1 << 16
+# Até quantos shingles as NUM_PERM permutações são calculadas numa operação só
+BROADCAST_SHINGLES = 4096
+# Inclusões guardadas num dict antes de refazer os baldes ordenados do LSH
+RECENT_LIMIT = 1024
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+_rng = np.random.RandomState(SEED)
+# Hash universal multiplicativo: ((a * x + b) mod 2^64) >> 32, com `a` ímpar
+_PERM_A = _rng.randint(1, 1 << 62, size=NUM_PERM, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+_PERM_B = _rng.randint(0, 1 << 62, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+_SHINGLE_BASE = np.uint64(1099511628211)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_SHIFT = np.uint64(32)
+# Mistura o número da faixa no hash: os baldes das BANDS faixas ficam num vetor só
+_BAND_SALT = _rng.randint(0, 1 << 62, size=BANDS, dtype=np.int64).astype(np.uint64)
+# Horner de band_hashes como produto escalar: r0*B^3 + r1*B^2 + r2*B + r3 (mod 2^64)
+_ROW_POWERS = np.array([pow(int(_SHINGLE_BASE), ROWS - 1 - i, 1 << 64) for i in range(ROWS)], dtype=np.uint64)
+
+
+def shingle_text(message):
+    """Texto comparado: sem acento, minúsculo, pontuação e espaços colapsados"""
+    text = _NON_WORD.sub(" ", normalize_text(message)).strip()
+    # Textos curtos viram um shingle só
+    return text.ljust(SHINGLE_SIZE).encode("ascii")
+
+
+def message_checksum(message):
+    return zlib.crc32(message.encode("utf-8"))
+
+
+def compute_signatures(messages):
+    """Matriz (len(messages), NUM_PERM) uint32 com a assinatura MinHash de cada mensagem.
+
+    Todos os textos são concatenados num só buffer de bytes; o hash de cada
+    janela de SHINGLE_SIZE bytes é calculado de uma vez (polinomial, em
+    uint64) e o mínimo por mensagem sai de um `np.minimum.reduceat` por
+    permutação, sem laço Python por shingle.
+    """
+    signatures = np.empty((len(messages), NUM_PERM), dtype=np.uint32)
+    start = 0
+    while start < len(messages):
+        texts, shingles = [], 0
+        for message in messages[start:]:
+            texts.append(shingle_text(message))
+            shingles += len(texts[-1])
+            if shingles >= BATCH_SHINGLES:
+                break
+        signatures[start:start + len(texts)] = _batch_signatures(texts)
+        start += len(texts)
+    return signatures
+
+
+def _batch_signatures(texts):
+    lengths = np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts))
+    data = np.frombuffer(b"".join(texts), dtype=np.uint8).astype(np.uint64)
+    windows = len(data) - SHINGLE_SIZE + 1
+    hashes = np.zeros(windows, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        hashes = hashes * _SHINGLE_BASE + data[offset:offset + windows]
+    hashes = (hashes * _MIX) >> _SHIFT
+
+    # Janelas que começam num texto e terminam no seguinte não contam
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    counts = lengths - SHINGLE_SIZE + 1
+    valid = np.repeat(starts, counts) + _ramp(counts)
+    hashes = hashes[valid]
+    firsts = np.cumsum(counts) - counts
+
+    if len(hashes) <= BROADCAST_SHINGLES:
+        # Poucos shingles (uma inclusão): todas as permutações de uma vez
+        values = (hashes[:, np.newaxis] * _PERM_A + _PERM_B) >> _SHIFT
+        return np.minimum.reduceat(values, firsts, axis=0).astype(np.uint32)
+    result = np.empty((len(texts), NUM_PERM), dtype=np.uint32)
+    for perm in range(NUM_PERM):
+        values = (hashes * _PERM_A[perm] + _PERM_B[perm]) >> _SHIFT
+        result[:, perm] = np.minimum.reduceat(values, firsts)
+    return result
+
+
+def _ramp(counts):
+    """0..c-1 para cada c de `counts`, concatenados"""
+    total = int(counts.sum())
+    return np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+
+
+def band_hashes(signatures):
+    """Um hash por faixa de ROWS valores: (n, BANDS) uint64"""
+    rows = signatures.astype(np.uint64).reshape(len(signatures), BANDS, ROWS)
+    result = np.zeros((len(signatures), BANDS), dtype=np.uint64)
+    for row in range(ROWS):
+        result = result * _SHINGLE_BASE + rows[:, :, row]
+    return result
+
+
+def message_minhash(message):
+    """(assinatura, hashes das faixas) de uma mensagem, para `similar` e `add`.
+
+    O mesmo cálculo de `compute_signatures` e `band_hashes`, sem o
+    preparo do lote (que custa mais que a conta para um texto só).
+    """
+    data = np.frombuffer(shingle_text(message), dtype=np.uint8).astype(np.uint64)
+    windows = len(data) - SHINGLE_SIZE + 1
+    hashes = data[:windows]
+    for offset in range(1, SHINGLE_SIZE):
+        hashes = hashes * _SHINGLE_BASE + data[offset:offset + windows]
+    hashes = (hashes * _MIX) >> _SHIFT
+    signature = ((hashes[:, np.newaxis] * _PERM_A + _PERM_B) >> _SHIFT).min(axis=0).astype(np.uint32)
+    bands = (signature.astype(np.uint64).reshape(BANDS, ROWS) * _ROW_POWERS).sum(axis=1, dtype=np.uint64)
+    return signature, bands
+
+
+class DedupIndex:
+    """Assinaturas MinHash + LSH das respostas, para achar quase-duplicatas.
+
+    Cada resposta vira uma assinatura de NUM_PERM mínimos (a fração de
+    posições iguais entre duas assinaturas estima a similaridade de Jaccard
+    dos shingles). A análise completa agrupa, em cada faixa, as respostas
+    com o mesmo hash de faixa e só compara as que caem juntas: o custo é
+    linear no tamanho do acervo, não quadrático.
+
+    Para `similar`, os baldes ficam num vetor ordenado de hashes de faixa
+    (com a faixa misturada) e nas linhas correspondentes: as candidatas
+    saem de um `searchsorted`, sem percorrer o acervo. Inclusões vão para
+    um dict (`_recent`) até RECENT_LIMIT, quando o vetor é refeito; uma
+    linha reaproveitada por `add` pode deixar entradas velhas nos baldes,
+    que só custam uma comparação a mais.
+
+    As assinaturas são gravadas em `path` com o CRC de cada mensagem; ao
+    abrir, `sync` só recalcula as respostas novas ou alteradas.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.keys = []
+        self._positions = {}
+        self._checksums = np.empty(0, dtype=np.uint32)
+        self._signatures = np.empty((0, NUM_PERM), dtype=np.uint32)
+        self._bands = np.empty((0, BANDS), dtype=np.uint64)
+        self._count = 0
+        self._bucket_keys = np.empty(0, dtype=np.uint64)
+        self._bucket_rows = np.empty(0, dtype=np.int32)
+        self._recent = {}   # hash de faixa (com a faixa) -> [linhas]
+        self._recent_count = 0
+        self.dirty = False
+
+    def __len__(self):
+        return self._count
+
+    @classmethod
+    def load(cls, path):
+        """Índice gravado em `path` (vazio se ausente, ilegível ou de outro formato)"""
+        index = cls(path)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data["format"]) != INDEX_FORMAT:
+                    return index
+                keys = data["keys"].tolist()
+                checksums = data["checksums"]
+                signatures = data["signatures"]
+        except (OSError, KeyError, ValueError):
+            return index
+        if signatures.shape != (len(keys), NUM_PERM) or len(checksums) != len(keys):
+            return index
+        index._replace(keys, checksums, signatures)
+        return index
+
+    def save(self):
+        """Grava as assinaturas (atômico); nada a fazer se não mudaram"""
+        if not self.path or not self.dirty:
+            return
+        n = self._count
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f, format=np.int64(INDEX_FORMAT), keys=np.array(self.keys[:n], dtype=str),
+                    checksums=self._checksums[:n], signatures=self._signatures[:n],
+                )
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError:
+            # Só cache: na próxima abertura as assinaturas são recalculadas
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def sync(self, responses):
+        """Alinha o índice com `responses` (key -> {"message", ...}); retorna quantas recalculou"""
+        n = self._count
+        keys, checksums, rows = [], [], []
+        missing_keys, missing_messages, missing_checksums = [], [], []
+        for key, data in responses.items():
+            message = data["message"]
+            checksum = message_checksum(message)
+            position = self._positions.get(key)
+            if position is not None and position < n and self._checksums[position] == checksum:
+                keys.append(key)
+                checksums.append(checksum)
+                rows.append(position)
+            else:
+                missing_keys.append(key)
+                missing_messages.append(message)
+                missing_checksums.append(checksum)
+        if not missing_keys and len(keys) == n:
+            return 0
+        signatures = self._signatures[np.array(rows, dtype=np.int64)]
+        if missing_keys:
+            signatures = np.concatenate([signatures, compute_signatures(missing_messages)])
+        self._replace(
+            keys + missing_keys,
+            np.array(checksums + missing_checksums, dtype=np.uint32),
+            signatures,
+        )
+        self.dirty = True
+        return len(missing_keys)
+
+    def add(self, key, message, minhash=None):
+        """Inclui ou atualiza uma resposta sem recalcular as demais"""
+        signature, bands = minhash or message_minhash(message)
+        position = self._positions.get(key)
+        if position is None:
+            position = self._count
+            self._reserve(position + 1)
+            self.keys.append(key)
+            self._positions[key] = position
+            self._count += 1
+        self._checksums[position] = message_checksum(message)
+        self._signatures[position] = signature
+        self._bands[position] = bands
+        self.dirty = True
+        if self._recent_count >= RECENT_LIMIT:
+            self._build_buckets()
+            return
+        recent = self._recent
+        for bucket in (bands ^ _BAND_SALT).tolist():
+            recent.setdefault(bucket, []).append(position)
+        self._recent_count += 1
+
+    def similar(self, message, threshold=DEFAULT_THRESHOLD, limit=5, exclude=None, minhash=None):
+        """[(key, similaridade)] das respostas parecidas com `message`, da mais parecida"""
+        if not self._count:
+            return []
+        signature, bands = minhash or message_minhash(message)
+        candidates = self._candidates(bands ^ _BAND_SALT)
+        if not len(candidates):
+            return []
+        excluded = self._positions.get(exclude)
+        if excluded is not None:
+            candidates = candidates[candidates != excluded]
+        scores = (self._signatures[candidates] == signature).mean(axis=1)
+        keep = scores >= threshold
+        candidates, scores = candidates[keep], scores[keep]
+        keys = self.keys
+        if len(candidates) > limit:
+            # Muitas parecidas (ex.: várias cópias): só as `limit` melhores viram
+            # tuplas; no empate da última vaga, as primeiras em ordem alfabética
+            cut = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            above = scores > cut
+            matches = list(zip((keys[i] for i in candidates[above].tolist()), scores[above].tolist()))
+            tied = (keys[i] for i in candidates[scores == cut].tolist())
+            matches.extend((key, float(cut)) for key in heapq.nsmallest(limit - len(matches), tied))
+        else:
+            matches = list(zip((keys[i] for i in candidates.tolist()), scores.tolist()))
+        matches.sort(key=lambda item: (-item[1], item[0]))
+        return matches
+
+    def _candidates(self, buckets):
+        """Linhas que dividem algum balde (hash de faixa com a faixa) com `buckets`"""
+        keys = self._bucket_keys
+        starts = np.searchsorted(keys, buckets, side="left")
+        ends = np.searchsorted(keys, buckets, side="right")
+        found = [self._bucket_rows[start:end] for start, end in zip(starts.tolist(), ends.tolist()) if end > start]
+        if self._recent:
+            recent = []
+            for bucket in buckets.tolist():
+                recent.extend(self._recent.get(bucket, ()))
+            if recent:
+                found.append(np.array(recent, dtype=np.int32))
+        if not found:
+            return found
+        return np.unique(np.concatenate(found))
+
+    def _build_buckets(self):
+        n = self._count
+        keys = (self._bands[:n] ^ _BAND_SALT).ravel()
+        order = np.argsort(keys, kind="stable")
+        self._bucket_keys = keys[order]
+        # Posição no vetor achatado (n, BANDS) -> linha
+        self._bucket_rows = (order // BANDS).astype(np.int32)
+        self._recent = {}
+        self._recent_count = 0
+
+    def duplicate_groups(self, threshold=DEFAULT_THRESHOLD, keys=None):
+        """Grupos de respostas quase iguais: [[(key, similaridade com a primeira)], ...].
+
+        `keys`, se dado, restringe a análise a essas chaves (ex.: as que
+        ainda existem). Os grupos vêm do maior para o menor.
+        """
+        n = self._count
+        rows = np.arange(n)
+        if keys is not None:
+            rows = np.array(sorted(self._positions[k] for k in keys if k in self._positions), dtype=np.int64)
+        if len(rows) < 2:
+            return []
+        left, right = self._candidate_pairs(rows)
+        parent = list(range(len(rows)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        signatures = self._signatures[rows]
+        for start in range(0, len(left), BATCH_PAIRS):
+            a = left[start:start + BATCH_PAIRS]
+            b = right[start:start + BATCH_PAIRS]
+            scores = (signatures[a] == signatures[b]).mean(axis=1)
+            for x, y in zip(a[scores >= threshold].tolist(), b[scores >= threshold].tolist()):
+                root_x, root_y = find(x), find(y)
+                if root_x != root_y:
+                    parent[max(root_x, root_y)] = min(root_x, root_y)
+
+        members = {}
+        for x in range(len(rows)):
+            root = find(x)
+            if root != x:
+                members.setdefault(root, [root]).append(x)
+        groups = []
+        for group in members.values():
+            group = np.array(group)
+            scores = (signatures[group] == signatures[group[0]]).mean(axis=1)
+            groups.append([(self.keys[rows[i]], float(s)) for i, s in zip(group.tolist(), scores)])
+        groups.sort(key=lambda g: (-len(g), g[0][0]))
+        return groups
+
+    def _candidate_pairs(self, rows):
+        """Pares (i, j), i < j, de posições em `rows` que dividem algum balde do LSH.
+
+        Em cada faixa, ordena os hashes e liga cada resposta à primeira do
+        seu balde: no máximo n pares por faixa, mesmo em baldes enormes
+        (muitas cópias idênticas). Ligações por faixas diferentes e a união
+        dos grupos cobrem o restante.
+        """
+        bands = self._bands[rows]
+        n = len(rows)
+        lefts, rights = [], []
+        for band in range(BANDS):
+            order = np.argsort(bands[:, band], kind="stable")
+            ordered = bands[order, band]
+            same = np.empty(n, dtype=bool)
+            same[0] = False
+            np.not_equal(ordered[1:], ordered[:-1], out=same[1:])
+            np.logical_not(same[1:], out=same[1:])
+            if not same.any():
+                continue
+            run_start = np.maximum.accumulate(np.where(same, 0, np.arange(n)))
+            lefts.append(order[run_start[same]])
+            rights.append(order[same])
+        if not lefts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        pairs = np.unique(np.concatenate(lefts).astype(np.int64) * n + np.concatenate(rights))
+        return pairs // n, pairs % n
+
+    def _replace(self, keys, checksums, signatures):
+        self.keys = list(keys)
+        self._positions = {key: i for i, key in enumerate(self.keys)}
+        self._count = len(self.keys)
+        self._checksums = np.asarray(checksums, dtype=np.uint32).copy()
+        self._signatures = np.ascontiguousarray(signatures, dtype=np.uint32)
+        self._bands = band_hashes(self._signatures)
+        self._build_buckets()
+
+    def _reserve(self, size):
+        """Garante espaço para `size` linhas (dobra a capacidade, como uma lista)"""
+        capacity = len(self._signatures)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, 64)
+        for name in ("_checksums", "_signatures", "_bands"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._count] = old[:self._count]
+            setattr(self, name, new)
@@ -0,0 +1,46 @@
+import errno
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def locked(path):
+    """Lock exclusivo entre processos sobre o arquivo `path` (criado se preciso).
+
+    flock no POSIX; no Windows, `msvcrt.locking` no primeiro byte do
+    arquivo. Sem lock não há como dois processos gravarem a mesma pasta
+    de dados com segurança, então não existe modo "sem lock".
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        else:
+            _lock_windows(fd)
+            try:
+                yield
+            finally:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+def _lock_windows(fd):
+    os.lseek(fd, 0, os.SEEK_SET)
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            return
+        except OSError as e:
+            # LK_LOCK desiste depois de ~10 tentativas de 1 s; quem segura o
+            # lock (ex.: uma compactação grande) pode demorar mais
+            if e.errno != errno.EDEADLOCK:
+                raise
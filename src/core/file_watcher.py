@@ -0,0 +1,48 @@
+import os
+import time
+
+
+def file_signature(path):
+    """Identidade barata de um arquivo: (inode, tamanho, mtime em ns)"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class FileWatcher:
+    """Detecta alterações em um arquivo por polling de stat().
+
+    O stat só é feito se passou `min_interval` segundos desde o último, então
+    `changed()` pode ser chamado a cada requisição ou volta do menu sem custo.
+    Comparar o inode pega também a troca atômica por rename (o padrão de
+    gravação segura), que nem sempre muda o mtime de forma visível.
+    """
+
+    def __init__(self, path, min_interval=1.0):
+        self.path = path
+        self.min_interval = min_interval
+        self._signature = file_signature(path)
+        self._next_check = time.monotonic() + min_interval
+
+    def changed(self):
+        """True se o arquivo mudou desde a última vez que foi visto"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.min_interval
+        signature = file_signature(self.path)
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        return True
+
+    def mark_seen(self):
+        """Registra o estado atual como visto (ex.: após gravar o próprio arquivo)"""
+        self._signature = file_signature(self.path)
+
+    def reset(self):
+        """Força nova comparação na próxima chamada (ex.: leitura falhou)"""
+        self._signature = None
+        self._next_check = 0.0
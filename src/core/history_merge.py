@@ -0,0 +1,516 @@
+import gzip
+import heapq
+import json
+import os
+import pickle
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from operator import itemgetter
+
+FORMATS = ("jsonl", "columnar", "store")
+HISTORY_FILENAME = "chat_history.json"
+# Segmentos rotacionados pelo HistoryStore: <pasta>/history/<início>.jsonl.gz
+ARCHIVE_DIR = "history"
+SEGMENT_SUFFIX = ".jsonl.gz"
+# Pedaço de arquivo entregue a cada processo (alinhado em fim de linha)
+CHUNK_BYTES = 16 * 1024 * 1024
+# Registros por HistoryStore.append no formato "store"
+STORE_BATCH = 10_000
+# Quantas linhas rejeitadas o relatório guarda (as demais só contam)
+MAX_ERRORS = 20
+# Registros interpretados mantidos em memória antes de ir para arquivos temporários
+MAX_BUFFERED_RECORDS = 2_000_000
+# Arquivos temporários abertos ao mesmo tempo (acima disso são juntados num só)
+MAX_SPILLED_RUNS = 32
+# Registros por pickle num arquivo temporário
+SPILL_BATCH = 10_000
+
+_TS = itemgetter(0)
+
+
+def discover(paths):
+    """[(caminho, agente)] dos históricos em `paths` (arquivos ou pastas).
+
+    Em pastas, vale todo `chat_history.json` ou `*.jsonl` (recursivo); o
+    agente é a pasta do arquivo, relativa à pasta dada (ou o nome do
+    arquivo, quando não é um chat_history.json). Os segmentos já
+    rotacionados de um HistoryStore (`history/*.jsonl.gz`) entram com o
+    agente do chat_history.json ao lado; os `rotating-*.jsonl` de uma
+    rotação interrompida não (viram segmento na próxima gravação).
+    """
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            full = os.path.abspath(path)
+            agent = _agent_name(os.path.basename(path), path)
+            found.append((full, agent))
+            if os.path.basename(full) == HISTORY_FILENAME:
+                found.extend((segment, agent) for segment in _segments(os.path.dirname(full)))
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            store = HISTORY_FILENAME in files or os.path.exists(os.path.join(root, ARCHIVE_DIR, "index.json"))
+            if store and ARCHIVE_DIR in dirs:
+                # Pasta de arquivo do HistoryStore: só os segmentos, via _segments
+                dirs.remove(ARCHIVE_DIR)
+            for name in sorted(files):
+                if name == HISTORY_FILENAME or name.endswith(".jsonl"):
+                    full = os.path.join(root, name)
+                    found.append((os.path.abspath(full), _agent_name(os.path.relpath(full, path), full)))
+            if store:
+                agent = _agent_name(os.path.relpath(os.path.join(root, HISTORY_FILENAME), path), root)
+                found.extend((segment, agent) for segment in _segments(root))
+    return found
+
+
+def _segments(store_dir):
+    """Segmentos arquivados do HistoryStore em `store_dir`, do mais antigo ao mais novo"""
+    archive = os.path.join(store_dir, ARCHIVE_DIR)
+    try:
+        names = os.listdir(archive)
+    except FileNotFoundError:
+        return []
+    return [os.path.abspath(os.path.join(archive, name)) for name in sorted(names) if name.endswith(SEGMENT_SUFFIX)]
+
+
+def _active_path(segment):
+    """chat_history.json do HistoryStore a que o segmento pertence"""
+    return os.path.join(os.path.dirname(os.path.dirname(segment)), HISTORY_FILENAME)
+
+
+def _agent_name(relative, full):
+    if os.path.basename(relative) == HISTORY_FILENAME:
+        relative = os.path.dirname(relative) or os.path.basename(os.path.dirname(os.path.abspath(full)))
+    else:
+        relative = os.path.splitext(relative)[0]
+    return relative.replace(os.sep, "/")
+
+
+# ------------------------------------------------------------- offsets
+
+def load_offsets(path):
+    """{arquivo: {"offset", "inode"}} da última execução"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError:
+        # Estado ilegível: relê tudo (a saída pode repetir registros)
+        return {}
+
+
+def save_offsets(path, offsets):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(offsets, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+def plan_chunks(files, offsets, chunk_bytes=CHUNK_BYTES):
+    """Pedaços novos a ler: ([(caminho, agente, início, fim, início do arquivo, depois de)], novos offsets).
+
+    Cada arquivo é lido do offset salvo até a última quebra de linha (uma
+    linha ainda sendo escrita fica para a próxima vez). Se o inode mudou ou
+    o arquivo encolheu, foi rotacionado ou truncado: relê do começo.
+    Segmentos arquivados (início do arquivo None) são lidos uma vez, só
+    com os registros posteriores a "depois de" (ver `_segment_chunks`).
+    """
+    chunks = []
+    updated = dict(offsets)
+    for path, agent in files:
+        if path.endswith(SEGMENT_SUFFIX):
+            chunks.extend(_segment_chunks(path, agent, offsets, updated, chunk_bytes))
+            continue
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        previous = offsets.get(path) or {}
+        start = previous.get("offset", 0)
+        if previous.get("inode") != stat.st_ino or stat.st_size < start:
+            start = 0
+        end = _last_line_end(path, start, stat.st_size)
+        updated[path] = dict(previous, offset=end, inode=stat.st_ino)
+        for chunk_start in range(start, end, chunk_bytes):
+            chunks.append((path, agent, chunk_start, min(chunk_start + chunk_bytes, end), start, None))
+    return chunks, updated
+
+
+def _segment_chunks(path, agent, offsets, updated, chunk_bytes):
+    """Pedaços de um segmento arquivado ainda não lido.
+
+    O segmento tem o que estava no chat_history.json ao rotacionar, e a
+    parte lida antes da rotação já foi entregue: só entram os registros
+    depois do mais novo já lido daquele histórico ("ts" salvo nos offsets
+    do chat_history.json). Os blocos do índice `.idx` (membros gzip
+    independentes, em ordem de tempo) evitam descomprimir os antigos.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return []
+    if (offsets.get(path) or {}).get("inode") == stat.st_ino:
+        # Segmentos não mudam depois de gravados
+        return []
+    updated[path] = {"offset": stat.st_size, "inode": stat.st_ino}
+    after = (offsets.get(_active_path(path)) or {}).get("ts")
+    try:
+        with open(path[:-len(SEGMENT_SUFFIX)] + ".idx", encoding="utf-8") as f:
+            blocks = json.load(f)
+    except (OSError, ValueError):
+        blocks = [{"offset": 0, "length": stat.st_size, "last_ts": None}]
+
+    chunks = []
+    start = end = None
+    for block in blocks:
+        if after is not None and block["last_ts"] is not None and block["last_ts"] <= after:
+            continue
+        if start is not None and (block["offset"] != end or end - start >= chunk_bytes):
+            chunks.append((path, agent, start, end, None, after))
+            start = None
+        if start is None:
+            start = block["offset"]
+        end = block["offset"] + block["length"]
+    if start is not None:
+        chunks.append((path, agent, start, end, None, after))
+    return chunks
+
+
+def _last_line_end(path, start, size):
+    """Posição logo após a última quebra de linha em [start, size)"""
+    with open(path, "rb") as f:
+        position = size
+        while position > start:
+            step = min(64 * 1024, position - start)
+            f.seek(position - step)
+            data = f.read(step)
+            newline = data.rfind(b"\n")
+            if newline >= 0:
+                return position - step + newline + 1
+            position -= step
+    return start
+
+
+# ------------------------------------------------------------- parsing
+
+class _Timestamps:
+    """Timestamp ISO ou legado ("dd/mm/YYYY HH:MM:SS") -> (epoch, ISO), com cache por hora"""
+
+    def __init__(self):
+        self._hours = {}
+
+    def normalize(self, value):
+        if len(value) == 19 and value[2] == "/" and value[5] == "/" and value[10] == " ":
+            # Fatiar é dezenas de vezes mais rápido que strptime
+            hour = f"{value[6:10]}-{value[3:5]}-{value[0:2]}T{value[11:13]}"
+            base = self._hours.get(hour)
+            if base is None:
+                base = self._hours[hour] = datetime.fromisoformat(hour + ":00:00").timestamp()
+            return base + int(value[14:16]) * 60 + int(value[17:19]), f"{hour}{value[13:19]}"
+        when = datetime.fromisoformat(value)
+        return when.timestamp(), when.isoformat(timespec="seconds")
+
+
+def parse_chunk(task):
+    """Lê um pedaço de histórico e devolve (registros ordenados por tempo, rejeitadas, erros).
+
+    Registro: (ts, timestamp ISO, agente, key, context, response). Roda em
+    outro processo: recebe e devolve só tipos simples.
+    """
+    path, agent, start, end, first, after = task
+    with open(path, "rb") as f:
+        if first is None:
+            # Blocos de um segmento arquivado: membros gzip inteiros
+            f.seek(start)
+            data = gzip.decompress(f.read(end - start))
+        else:
+            if start != first:
+                # A linha que começou no pedaço anterior é dele
+                f.seek(start - 1)
+                f.readline()
+            else:
+                f.seek(start)
+            position = f.tell()
+            data = f.read(max(0, end - position)) if position < end else b""
+            if data and not data.endswith(b"\n"):
+                data += f.readline()
+
+    timestamps = _Timestamps()
+    records, rejected, errors = [], 0, []
+    for line in data.split(b"\n"):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            ts, iso = timestamps.normalize(entry["timestamp"])
+            # "ts" (quando existe) tem milissegundos; o texto, só segundos
+            ts = float(entry.get("ts") or ts)
+            if after is not None and ts <= after:
+                continue
+            context = entry.get("context") or ""
+            key = entry.get("key")
+            if key is None and context.startswith("Resposta: "):
+                key = context[len("Resposta: "):]
+            records.append((ts, iso, agent, key, context, entry.get("response") or ""))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            rejected += 1
+            if len(errors) < MAX_ERRORS:
+                errors.append((path, f"{type(e).__name__}: {e}"[:200]))
+    # Lotes de processos diferentes chegam levemente fora de ordem
+    records.sort(key=_TS)
+    return records, rejected, errors
+
+
+# ------------------------------------------------------------- saída
+
+def write_jsonl(records, stream):
+    """Registros no formato de `make_entry`, mais o campo "agent"; retorna quantos"""
+    count = 0
+    dumps = json.dumps
+    for ts, iso, agent, key, context, response in records:
+        stream.write(dumps(
+            {"timestamp": iso, "ts": round(ts, 3), "agent": agent, "key": key,
+             "context": context, "response": response},
+            ensure_ascii=False,
+        ) + "\n")
+        count += 1
+    return count
+
+
+def write_columnar(records, directory):
+    """Uma parte `part-NNNNN.npz` por execução, com colunas e dicionários.
+
+    `ts` (float64) e, para agente, key, context e response, códigos int32
+    num vetor de valores distintos (os textos se repetem muito). Retorna
+    quantos registros gravou.
+    """
+    import numpy as np
+
+    os.makedirs(directory, exist_ok=True)
+    stamps = []
+    columns = {name: ([], {}) for name in ("agent", "key", "context", "response")}
+    agent_codes, agent_values = columns["agent"]
+    key_codes, key_values = columns["key"]
+    context_codes, context_values = columns["context"]
+    response_codes, response_values = columns["response"]
+    for ts, iso, agent, key, context, response in records:
+        stamps.append(ts)
+        agent_codes.append(agent_values.setdefault(agent, len(agent_values)))
+        key_codes.append(key_values.setdefault(key or "", len(key_values)))
+        context_codes.append(context_values.setdefault(context, len(context_values)))
+        response_codes.append(response_values.setdefault(response, len(response_values)))
+    if not stamps:
+        return 0
+
+    arrays = {"ts": np.array(stamps, dtype=np.float64)}
+    for name, (codes, values) in columns.items():
+        arrays[name] = np.array(codes, dtype=np.int32)
+        arrays[name + "_values"] = np.array(list(values), dtype=str)
+    number = len([name for name in os.listdir(directory) if name.startswith("part-") and name.endswith(".npz")])
+    path = os.path.join(directory, f"part-{number:05d}.npz")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+    return len(stamps)
+
+
+def read_columnar(directory):
+    """Registros das partes gravadas por `write_columnar`, parte a parte (cada uma em ordem)"""
+    import numpy as np
+
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith("part-") and name.endswith(".npz")):
+            continue
+        with np.load(os.path.join(directory, name), allow_pickle=False) as data:
+            decoded = {
+                column: data[column + "_values"][data[column]].tolist()
+                for column in ("agent", "key", "context", "response")
+            }
+            for i, ts in enumerate(data["ts"].tolist()):
+                yield {
+                    "ts": ts, "agent": decoded["agent"][i], "key": decoded["key"][i] or None,
+                    "context": decoded["context"][i], "response": decoded["response"][i],
+                }
+
+
+def write_store(records, data_dir):
+    """Acrescenta ao HistoryStore de `data_dir` (rotação e índices dele); retorna quantos"""
+    from core.history_store import HistoryStore
+
+    store = HistoryStore(data_dir)
+    os.makedirs(data_dir, exist_ok=True)
+    batch, count = [], 0
+    for ts, iso, agent, key, context, response in records:
+        batch.append({"timestamp": iso, "ts": round(ts, 3), "agent": agent, "key": key,
+                      "context": context, "response": response})
+        if len(batch) >= STORE_BATCH:
+            store.append(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        store.append(batch)
+        count += len(batch)
+    return count
+
+
+# ------------------------------------------------------------- merge
+
+class MergeReport:
+    """Contagens e vazão de uma junção"""
+
+    def __init__(self):
+        self.files = 0
+        self.files_with_data = 0
+        self.chunks = 0
+        self.bytes = 0
+        self.records = 0
+        self.rejected = 0
+        self.errors = []      # (arquivo, motivo), até MAX_ERRORS
+        self.parse_seconds = 0.0
+        self.elapsed = 0.0
+
+    @property
+    def megabytes_per_second(self):
+        return self.bytes / 1e6 / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def records_per_second(self):
+        return self.records / self.elapsed if self.elapsed else 0.0
+
+
+def merge_histories(paths, write, state_path=None, workers=None, chunk_bytes=CHUNK_BYTES):
+    """Lê o que há de novo nos históricos e entrega tudo, em ordem de tempo, a `write`.
+
+    Os pedaços são interpretados num pool de processos (`workers`, padrão:
+    um por CPU; 1 = no próprio processo), no máximo 2 por processo em
+    andamento, e cada lista ordenada que chega vai para `_Runs` (memória
+    limitada; o excedente vai para arquivos temporários). `write` recebe
+    o merge de k vias (`heapq.merge`) delas, consome o fluxo e retorna
+    quantos gravou. Os offsets só são salvos em `state_path` depois que
+    `write` termina.
+    """
+    report = MergeReport()
+    start = time.perf_counter()
+    files = discover(paths)
+    report.files = len(files)
+    offsets = load_offsets(state_path) if state_path else {}
+    chunks, updated = plan_chunks(files, offsets, chunk_bytes)
+    report.chunks = len(chunks)
+    report.bytes = sum(end - begin for _, _, begin, end, _, _ in chunks)
+    report.files_with_data = len({path for path, *_ in chunks})
+
+    with _Runs() as runs:
+        for chunk, (records, rejected, errors) in _parse_chunks(chunks, workers or os.cpu_count() or 1):
+            if records:
+                # O mais novo já lido de cada histórico: marca d'água dos segmentos rotacionados depois
+                path = chunk[0] if chunk[4] is not None else _active_path(chunk[0])
+                state = updated.setdefault(path, {})
+                state["ts"] = max(state.get("ts", records[-1][0]), records[-1][0])
+            runs.add(records)
+            report.rejected += rejected
+            report.errors.extend(errors[:MAX_ERRORS - len(report.errors)])
+        report.parse_seconds = time.perf_counter() - start
+        report.records = write(runs.merged())
+    if state_path:
+        save_offsets(state_path, updated)
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def _parse_chunks(chunks, workers):
+    """(pedaço, resultado de `parse_chunk`) na ordem dos pedaços.
+
+    Com vários processos, só 2 * workers pedaços ficam em andamento ou
+    prontos e ainda não consumidos: o resultado de todos nunca está na
+    memória ao mesmo tempo.
+    """
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield chunk, parse_chunk(chunk)
+        return
+    with ProcessPoolExecutor(min(workers, len(chunks))) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(parse_chunk, chunk)))
+            if len(pending) >= 2 * workers:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
+
+class _Runs:
+    """Listas ordenadas por tempo a juntar, com memória limitada.
+
+    Até `max_buffered` registros ficam em memória; passando disso, as
+    listas guardadas são juntadas num arquivo temporário (pickle em lotes
+    de SPILL_BATCH). Para não manter arquivos demais abertos no merge
+    final, a cada `max_spilled` arquivos eles são juntados num só.
+    """
+
+    def __init__(self, max_buffered=MAX_BUFFERED_RECORDS, max_spilled=MAX_SPILLED_RUNS):
+        self.max_buffered = max_buffered
+        self.max_spilled = max_spilled
+        self._buffered = []
+        self._count = 0
+        self._spilled = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        for f in self._spilled:
+            f.close()
+        self._spilled = []
+
+    def add(self, records):
+        if not records:
+            return
+        self._buffered.append(records)
+        self._count += len(records)
+        if self._count > self.max_buffered:
+            self._spill()
+
+    def _spill(self):
+        self._spilled.append(_write_run(heapq.merge(*self._buffered, key=_TS)))
+        self._buffered = []
+        self._count = 0
+        if len(self._spilled) >= self.max_spilled:
+            merged = _write_run(heapq.merge(*map(_read_run, self._spilled), key=_TS))
+            for f in self._spilled:
+                f.close()
+            self._spilled = [merged]
+
+    def merged(self):
+        """Todos os registros em ordem de tempo (lendo os arquivos aos poucos)"""
+        return heapq.merge(*self._buffered, *map(_read_run, self._spilled), key=_TS)
+
+
+def _write_run(records):
+    """Grava registros já ordenados num arquivo temporário (apagado ao fechar)"""
+    f = tempfile.TemporaryFile()
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= SPILL_BATCH:
+            pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+            batch = []
+    if batch:
+        pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+    return f
+
+
+def _read_run(f):
+    f.seek(0)
+    while True:
+        try:
+            batch = pickle.load(f)
+        except EOFError:
+            return
+        yield from batch
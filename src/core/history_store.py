@@ -0,0 +1,435 @@
+import bisect
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+from operator import itemgetter
+
+from core.file_lock import locked
+
+LEGACY_TIMESTAMP_FORMAT = "%d/%m/%Y %H:%M:%S"
+BLOCK_ENTRIES = 1000
+MAX_ACTIVE_BYTES = 64 * 1024 * 1024
+# Lotes de processos diferentes podem chegar levemente fora de ordem
+ORDER_SLACK_SECONDS = 60
+READ_CHUNK = 64 * 1024
+
+_TS = itemgetter(0)
+
+
+def make_entry(context, response, key=None, when=None):
+    """Cria um registro de histórico com timestamp ISO (ordenável) e epoch"""
+    when = when or datetime.now()
+    return {
+        "timestamp": when.isoformat(timespec="seconds"),
+        "ts": round(when.timestamp(), 3),
+        "key": key,
+        "context": context,
+        "response": response,
+    }
+
+
+def parse_timestamp(value):
+    """Converte timestamp ISO ou legado ("dd/mm/YYYY HH:MM:SS") em epoch"""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return datetime.strptime(value, LEGACY_TIMESTAMP_FORMAT).timestamp()
+
+
+def entry_ts(entry):
+    """Epoch de um registro, aceitando também o formato antigo sem 'ts'"""
+    ts = entry.get("ts")
+    if ts is None:
+        ts = parse_timestamp(entry["timestamp"])
+    return ts
+
+
+def entry_key(entry):
+    """Chave da resposta usada, inclusive em registros antigos sem o campo 'key'"""
+    key = entry.get("key")
+    if key is None:
+        context = entry.get("context", "")
+        if context.startswith("Resposta: "):
+            key = context[len("Resposta: "):]
+    return key
+
+
+def format_timestamp(entry):
+    """Timestamp de um registro no formato de exibição da CLI"""
+    return datetime.fromtimestamp(entry_ts(entry)).strftime(LEGACY_TIMESTAMP_FORMAT)
+
+
+def _to_epoch(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return parse_timestamp(value)
+
+
+def _day(ts):
+    return datetime.fromtimestamp(ts).date()
+
+
+class HistoryStore:
+    """Histórico de uso em segmentos rotativos com índice esparso.
+
+    O segmento ativo é o próprio `chat_history.json` (JSONL), para que
+    ferramentas que leem o arquivo antigo continuem funcionando. Ele é
+    rotacionado quando passa de `max_active_bytes` ou quando vira o dia, e
+    vira `history/<inicio>.jsonl.gz`: blocos de BLOCK_ENTRIES registros
+    comprimidos como membros gzip independentes (o arquivo inteiro continua
+    legível com zcat). Para cada segmento, `<nome>.idx` guarda offset,
+    intervalo de tempo e chaves usadas de cada bloco; `history/index.json`
+    resume os segmentos. Assim as consultas descomprimem só os blocos que
+    podem conter a resposta. Linhas ilegíveis (ex.: truncadas por uma
+    queda) não entram no segmento: vão para `history/quarantine.log`.
+    """
+
+    def __init__(self, data_dir, max_active_bytes=MAX_ACTIVE_BYTES, rotate_daily=True):
+        self.active_path = os.path.join(data_dir, "chat_history.json")
+        self.archive_dir = os.path.join(data_dir, "history")
+        self.manifest_path = os.path.join(self.archive_dir, "index.json")
+        self.quarantine_path = os.path.join(self.archive_dir, "quarantine.log")
+        self.lock_path = self.active_path + ".lock"
+        self.max_active_bytes = max_active_bytes
+        self.rotate_daily = rotate_daily
+        self._block_index_cache = {}
+        # Rotações interrompidas são recuperadas no primeiro append desta instância
+        self._recovered = False
+
+    # ----------------------------------------------------------- escrita
+
+    def _locked(self):
+        """Lock entre processos para acrescentar e rotacionar"""
+        return locked(self.lock_path)
+
+    def append(self, entries):
+        """Acrescenta registros ao segmento ativo, rotacionando se preciso"""
+        if not entries:
+            return
+        data = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        data = data.encode("utf-8")
+        with self._locked():
+            if not self._recovered:
+                self._recover_pending()
+                self._recovered = True
+            self._maybe_rotate(entry_ts(entries[0]))
+            fd = os.open(self.active_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+
+    def _maybe_rotate(self, incoming_ts):
+        try:
+            size = os.path.getsize(self.active_path)
+        except FileNotFoundError:
+            return
+        if size == 0:
+            return
+        if size < self.max_active_bytes:
+            if not self.rotate_daily:
+                return
+            first = self._first_active_entry()
+            if first is None or _day(entry_ts(first)) == _day(incoming_ts):
+                return
+        self.rotate()
+
+    def _first_active_entry(self):
+        try:
+            with open(self.active_path, "rb") as f:
+                line = f.readline()
+        except FileNotFoundError:
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    def rotate(self):
+        """Arquiva o segmento ativo (chamar com o lock já adquirido)"""
+        self._recover_pending()
+        if not os.path.exists(self.active_path):
+            return None
+        os.makedirs(self.archive_dir, exist_ok=True)
+        pending = os.path.join(self.archive_dir, f"rotating-{os.getpid()}-{time.time_ns()}.jsonl")
+        os.replace(self.active_path, pending)
+        return self._archive(pending)
+
+    def _recover_pending(self):
+        """Arquiva rotações interrompidas (queda entre renomear o ativo e gravar o segmento)"""
+        try:
+            names = os.listdir(self.archive_dir)
+        except FileNotFoundError:
+            return
+        for name in sorted(names):
+            if name.startswith("rotating-") and name.endswith(".jsonl"):
+                self._archive(os.path.join(self.archive_dir, name))
+
+    def _archive(self, pending):
+        """Grava `pending` como segmento, índice e entrada do manifesto; depois o remove"""
+        source = os.path.basename(pending)
+        if any(segment.get("source") == source for segment in self._read_manifest()):
+            # Já arquivado: a queda foi depois do manifesto, antes de remover o arquivo
+            os.remove(pending)
+            return None
+        # Só (ts, key, linha) por registro: a linha já é o JSON gravado, e
+        # guardar os dicionários de um segmento inteiro custaria várias vezes mais
+        rows = []
+        rejected = []
+        with open(pending, "rb") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    rows.append((entry_ts(entry), entry_key(entry), line))
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    # Linha truncada (queda no meio de um append) ou editada à
+                    # mão: vai para a quarentena em vez de travar o arquivamento
+                    rejected.append(line)
+        if rejected:
+            self._quarantine(source, rejected)
+        if not rows:
+            os.remove(pending)
+            return None
+        # Segmentos arquivados ficam em ordem cronológica estrita
+        rows.sort(key=_TS)
+
+        first_ts = rows[0][0]
+        name = datetime.fromtimestamp(first_ts).strftime("%Y%m%d-%H%M%S")
+        suffix = 0
+        while os.path.exists(os.path.join(self.archive_dir, f"{name}-{suffix}.jsonl.gz")):
+            suffix += 1
+        name = f"{name}-{suffix}"
+        segment_path = os.path.join(self.archive_dir, name + ".jsonl.gz")
+
+        blocks = []
+        tmp_path = segment_path + ".tmp"
+        with open(tmp_path, "wb") as out:
+            for start in range(0, len(rows), BLOCK_ENTRIES):
+                chunk = rows[start:start + BLOCK_ENTRIES]
+                payload = gzip.compress(b"".join(line + b"\n" for _, _, line in chunk))
+                stamps = [ts for ts, _, _ in chunk]
+                keys = {}
+                for _, key, _ in chunk:
+                    if key:
+                        keys[key] = keys.get(key, 0) + 1
+                blocks.append({
+                    "offset": out.tell(),
+                    "length": len(payload),
+                    "first_ts": min(stamps),
+                    "last_ts": max(stamps),
+                    "count": len(chunk),
+                    "keys": keys,
+                })
+                out.write(payload)
+            out.flush()
+            os.fsync(out.fileno())
+        self._write_json(segment_path[:-len(".jsonl.gz")] + ".idx", blocks)
+        os.replace(tmp_path, segment_path)
+
+        manifest = self._read_manifest()
+        segment_keys = {}
+        for block in blocks:
+            for key, count in block["keys"].items():
+                segment_keys[key] = segment_keys.get(key, 0) + count
+        manifest.append({
+            "name": name,
+            "first_ts": first_ts,
+            "last_ts": max(block["last_ts"] for block in blocks),
+            "count": len(rows),
+            "keys": segment_keys,
+            "source": source,
+            "rejected": len(rejected),
+        })
+        manifest.sort(key=lambda segment: (segment["first_ts"], segment["name"]))
+        self._write_json(self.manifest_path, {"segments": manifest})
+        os.remove(pending)
+        return name
+
+    def _quarantine(self, source, lines):
+        """Guarda linhas ilegíveis de um segmento em `history/quarantine.log`, com a origem"""
+        with open(self.quarantine_path, "ab") as f:
+            for line in lines:
+                f.write(source.encode("utf-8") + b"\t" + line + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        print(f"⚠️ {len(lines)} linhas ilegíveis do histórico movidas para {self.quarantine_path}")
+
+    @staticmethod
+    def _write_json(path, data):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    # ----------------------------------------------------------- leitura
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)["segments"]
+        except FileNotFoundError:
+            return []
+
+    def _blocks(self, name):
+        blocks = self._block_index_cache.get(name)
+        if blocks is None:
+            with open(os.path.join(self.archive_dir, name + ".idx"), encoding="utf-8") as f:
+                blocks = json.load(f)
+            self._block_index_cache[name] = blocks
+        return blocks
+
+    def _read_block(self, name, block):
+        with open(os.path.join(self.archive_dir, name + ".jsonl.gz"), "rb") as f:
+            f.seek(block["offset"])
+            data = gzip.decompress(f.read(block["length"]))
+        return [json.loads(line) for line in data.splitlines() if line.strip()]
+
+    def _active_lines_reversed(self):
+        """Linhas do segmento ativo, da última para a primeira, lendo o fim do arquivo"""
+        try:
+            f = open(self.active_path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            remainder = b""
+            while position > 0:
+                step = min(READ_CHUNK, position)
+                position -= step
+                f.seek(position)
+                lines = (f.read(step) + remainder).split(b"\n")
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    if line.strip():
+                        yield line
+            if remainder.strip():
+                yield remainder
+
+    def _active_offset_for(self, ts):
+        """Busca binária por offset no segmento ativo (ordenado por tempo)"""
+        try:
+            f = open(self.active_path, "rb")
+        except FileNotFoundError:
+            return 0
+        with f:
+            f.seek(0, os.SEEK_END)
+            low, high = 0, f.tell()
+            while high - low > READ_CHUNK:
+                middle = (low + high) // 2
+                f.seek(middle)
+                f.readline()  # descarta a linha parcial
+                line = f.readline()
+                if not line:
+                    high = middle
+                    continue
+                if entry_ts(json.loads(line)) < ts:
+                    low = middle
+                else:
+                    high = middle
+            return low
+
+    def _iter_active(self, start_offset=0):
+        try:
+            f = open(self.active_path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(start_offset)
+            if start_offset:
+                f.readline()
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def tail(self, n):
+        """Os últimos n registros, do mais recente para o mais antigo"""
+        result = []
+        for line in self._active_lines_reversed():
+            result.append(json.loads(line))
+            if len(result) >= n:
+                return result
+        for segment in reversed(self._read_manifest()):
+            for block in reversed(self._blocks(segment["name"])):
+                for entry in reversed(self._read_block(segment["name"], block)):
+                    result.append(entry)
+                    if len(result) >= n:
+                        return result
+        return result
+
+    def between(self, start=None, end=None):
+        """Registros com start <= tempo < end, em ordem cronológica.
+
+        `start`/`end` aceitam epoch, datetime ou string ISO/"dd/mm/YYYY HH:MM:SS".
+        """
+        start = _to_epoch(start)
+        end = _to_epoch(end)
+        for segment in self._read_manifest():
+            if start is not None and segment["last_ts"] < start:
+                continue
+            if end is not None and segment["first_ts"] >= end:
+                break
+            blocks = self._blocks(segment["name"])
+            first = 0
+            if start is not None:
+                # first_ts é crescente entre blocos: pula direto ao primeiro relevante
+                starts = [block["first_ts"] for block in blocks]
+                first = max(0, bisect.bisect_right(starts, start) - 1)
+            for block in blocks[first:]:
+                if end is not None and block["first_ts"] >= end:
+                    break
+                if start is not None and block["last_ts"] < start:
+                    continue
+                for entry in self._read_block(segment["name"], block):
+                    ts = entry_ts(entry)
+                    if (start is None or ts >= start) and (end is None or ts < end):
+                        yield entry
+
+        offset = 0 if start is None else self._active_offset_for(start - ORDER_SLACK_SECONDS)
+        for entry in self._iter_active(offset):
+            ts = entry_ts(entry)
+            if start is not None and ts < start:
+                continue
+            if end is not None and ts >= end:
+                if ts >= end + ORDER_SLACK_SECONDS:
+                    break
+                continue
+            yield entry
+
+    def by_key(self, key, limit=None):
+        """Usos da resposta `key`, do mais recente para o mais antigo"""
+        result = []
+        # Filtro barato antes do parse: o nome da chave precisa aparecer na linha
+        needle = json.dumps(key, ensure_ascii=False)[1:-1].encode("utf-8")
+        for line in self._active_lines_reversed():
+            if needle not in line:
+                continue
+            entry = json.loads(line)
+            if entry_key(entry) == key:
+                result.append(entry)
+                if limit is not None and len(result) >= limit:
+                    return result
+        for segment in reversed(self._read_manifest()):
+            if key not in segment["keys"]:
+                continue
+            for block in reversed(self._blocks(segment["name"])):
+                if key not in block["keys"]:
+                    continue
+                entries = self._read_block(segment["name"], block)
+                for entry in reversed(entries):
+                    if entry_key(entry) != key:
+                        continue
+                    result.append(entry)
+                    if limit is not None and len(result) >= limit:
+                        return result
+        return result
+
@@ -0,0 +1,96 @@
+import atexit
+import queue
+import threading
+import time
+
+_FLUSH = object()
+_STOP = object()
+
+
+class HistoryWriter:
+    """Grava registros do histórico em lotes, numa thread de fundo.
+
+    `write` só enfileira (fila limitada: se o disco não acompanhar, quem
+    chama espera em vez de acumular memória sem limite). O lote é entregue
+    a `sink(entries)` quando atinge `batch_size` registros ou após
+    `flush_interval` segundos.
+    """
+
+    def __init__(self, sink, batch_size=200, flush_interval=1.0, max_queue=10000, on_written=None):
+        self.sink = sink
+        # Chamado com cada lote depois de gravado (ex.: agregados de uso em dia)
+        self.on_written = on_written
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, entry):
+        """Enfileira um registro para gravação"""
+        if self._closed:
+            self._write_batch([entry])
+            return
+        self._queue.put(entry)
+
+    def flush(self, timeout=5.0):
+        """Bloqueia até que tudo o que já foi enfileirado esteja no disco"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Grava o que estiver pendente e encerra a thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            stop = item is _STOP
+            flush_event = None
+            if isinstance(item, tuple) and item and item[0] is _FLUSH:
+                flush_event = item[1]
+            elif item is not None and not stop:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            due = deadline is not None and time.monotonic() >= deadline
+            if batch and (stop or flush_event or due or len(batch) >= self.batch_size):
+                self._write_batch(batch)
+                batch = []
+                deadline = None
+
+            if flush_event is not None:
+                flush_event.set()
+            if stop:
+                return
+
+    def _write_batch(self, batch):
+        try:
+            self.sink(batch)
+        except Exception as e:
+            # Não derruba a thread: o histórico é best-effort
+            print(f"⚠️ Falha ao gravar histórico: {e}")
+            return
+        if self.on_written is not None:
+            try:
+                self.on_written(batch)
+            except Exception as e:
+                print(f"⚠️ Falha ao atualizar agregados do histórico: {e}")
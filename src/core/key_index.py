@@ -0,0 +1,301 @@
+import bisect
+
+from core.search_index import copy_on_write, normalize_text
+
+# Estilo SymSpell: "deleções" pré-calculadas só do começo e do fim de cada chave
+AFFIX_LENGTH = 7
+MAX_DISTANCE = 2
+
+# Maior code point: (prefixo + isto) fica depois de tudo que começa com o prefixo
+_PREFIX_END = "\U0010ffff"
+
+
+def deletes(word, distance):
+    """Todas as variantes de `word` com até `distance` caracteres removidos"""
+    result = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def edit_distance(a, b, max_distance):
+    """Distância de Damerau-Levenshtein (transposição adjacente conta 1).
+
+    Retorna `max_distance + 1` assim que fica claro que o limite será
+    ultrapassado. Prefixo e sufixo comuns são descartados antes, o que
+    reduz a tabela a poucas células no caso típico (um erro de digitação).
+    """
+    if a == b:
+        return 0
+    start = 0
+    limit = min(len(a), len(b))
+    while start < limit and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a = a[start:end_a]
+    b = b[start:end_b]
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if not a or not b:
+        return max(len(a), len(b))
+
+    # Só a faixa diagonal |i - j| <= max_distance pode ficar dentro do limite
+    over = max_distance + 1
+    len_b = len(b)
+    previous2 = None
+    previous = [j if j <= max_distance else over for j in range(len_b + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (len_b + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_min = over
+        char_a = a[i - 1]
+        for j in range(max(1, i - max_distance), min(len_b, i + max_distance) + 1):
+            cost = 0 if char_a == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return over
+        previous2, previous = previous, current
+    return min(previous[-1], over)
+
+
+class KeyIndex:
+    """Índice das chaves de resposta para o prompt da CLI.
+
+    - completar por prefixo: lista ordenada de (chave normalizada, chave)
+      com bisect, O(log n) para achar o início e contar;
+    - sugestões com erro de digitação, no estilo SymSpell: o prefixo e o
+      sufixo (AFFIX_LENGTH caracteres) de cada chave são registrados sob
+      todas as suas deleções de até MAX_DISTANCE caracteres. Duas chaves a
+      até MAX_DISTANCE edições compartilham uma deleção do prefixo *e* uma
+      do sufixo, então a consulta só verifica (com a distância de edição)
+      as chaves cujo prefixo e sufixo casam ao mesmo tempo.
+
+    Comparações ignoram maiúsculas e acentos. As tabelas de deleções só são
+    montadas na primeira sugestão. `add`/`remove` atualizam o índice sem
+    reconstruí-lo.
+    """
+
+    def __init__(self, keys=None):
+        self._by_norm = {}          # normalizada -> set(keys)
+        self._groups = None         # prefixo -> {sufixo -> set(normalizadas)}
+        self._prefix_deletes = None  # deleção -> set(prefixos)
+        self._suffix_deletes = None  # deleção -> set(sufixos)
+        self._suffix_count = None   # sufixo -> quantas normalizadas o usam
+        self._owned = None          # valores já duplicados desde o último `copy` (ver copy_on_write)
+        # Uma ordenação só em vez de um insort por chave
+        self._sorted = sorted((normalize_text(key), key) for key in set(keys or ()))
+        for norm, key in self._sorted:
+            keys_of = self._by_norm.get(norm)
+            if keys_of is None:
+                self._by_norm[norm] = {key}
+            else:
+                keys_of.add(key)
+
+    def __len__(self):
+        return len(self._sorted)
+
+    def __contains__(self, key):
+        return key in self._by_norm.get(normalize_text(key), ())
+
+    def copy(self):
+        """Cópia independente (alterar uma não afeta a outra).
+
+        Como no SearchIndex, só o primeiro nível é copiado; os conjuntos
+        compartilhados são duplicados por quem os altera primeiro.
+        """
+        clone = KeyIndex()
+        clone._sorted = list(self._sorted)
+        clone._by_norm = dict(self._by_norm)
+        if self._groups is not None:
+            clone._groups = dict(self._groups)
+            clone._prefix_deletes = dict(self._prefix_deletes)
+            clone._suffix_deletes = dict(self._suffix_deletes)
+            clone._suffix_count = dict(self._suffix_count)
+        self._owned = set()
+        clone._owned = set()
+        return clone
+
+    def add(self, key):
+        norm = normalize_text(key)
+        keys = self._by_norm.get(norm)
+        if keys is None:
+            keys = self._by_norm[norm] = set()
+            if self._groups is not None:
+                self._add_affixes(norm)
+        elif key in keys:
+            return
+        else:
+            keys = copy_on_write(self._by_norm, norm, self._owned, set.copy)
+        keys.add(key)
+        bisect.insort(self._sorted, (norm, key))
+
+    def remove(self, key):
+        norm = normalize_text(key)
+        keys = self._by_norm.get(norm)
+        if not keys or key not in keys:
+            return
+        position = bisect.bisect_left(self._sorted, (norm, key))
+        del self._sorted[position]
+        if len(keys) == 1:
+            del self._by_norm[norm]
+            if self._groups is not None:
+                self._remove_affixes(norm)
+        else:
+            copy_on_write(self._by_norm, norm, self._owned, set.copy).discard(key)
+
+    def _build_affixes(self):
+        """Tabelas de deleções, só na primeira sugestão: completar e paginar não precisam delas"""
+        groups = {}
+        suffix_count = {}
+        for norm in self._by_norm:
+            prefix, suffix = norm[:AFFIX_LENGTH], norm[-AFFIX_LENGTH:]
+            groups.setdefault(prefix, {}).setdefault(suffix, set()).add(norm)
+            suffix_count[suffix] = suffix_count.get(suffix, 0) + 1
+        prefix_deletes = {}
+        for prefix in groups:
+            _register(prefix_deletes, prefix)
+        suffix_deletes = {}
+        for suffix in suffix_count:
+            _register(suffix_deletes, suffix)
+        # Pode rodar num índice já publicado: `_groups` por último, quem o vê
+        # preenchido encontra as outras tabelas prontas
+        self._prefix_deletes = prefix_deletes
+        self._suffix_deletes = suffix_deletes
+        self._suffix_count = suffix_count
+        self._groups = groups
+
+    def _add_affixes(self, norm):
+        prefix, suffix = norm[:AFFIX_LENGTH], norm[-AFFIX_LENGTH:]
+        if prefix in self._groups:
+            group = copy_on_write(self._groups, prefix, self._owned, _copy_group)
+        else:
+            group = self._groups[prefix] = {}
+            _register(self._prefix_deletes, prefix, self._owned)
+        group.setdefault(suffix, set()).add(norm)
+        count = self._suffix_count.get(suffix, 0)
+        if not count:
+            _register(self._suffix_deletes, suffix, self._owned)
+        self._suffix_count[suffix] = count + 1
+
+    def _remove_affixes(self, norm):
+        prefix, suffix = norm[:AFFIX_LENGTH], norm[-AFFIX_LENGTH:]
+        group = copy_on_write(self._groups, prefix, self._owned, _copy_group)
+        bucket = group[suffix]
+        bucket.discard(norm)
+        if not bucket:
+            del group[suffix]
+            if not group:
+                del self._groups[prefix]
+                _unregister(self._prefix_deletes, prefix, self._owned)
+        count = self._suffix_count[suffix] - 1
+        if count:
+            self._suffix_count[suffix] = count
+        else:
+            del self._suffix_count[suffix]
+            _unregister(self._suffix_deletes, suffix, self._owned)
+
+    def _prefix_range(self, prefix):
+        norm = normalize_text(prefix)
+        start = bisect.bisect_left(self._sorted, (norm,))
+        end = bisect.bisect_left(self._sorted, (norm + _PREFIX_END,), start)
+        return start, end
+
+    def count_prefix(self, prefix):
+        """Quantas chaves começam com `prefix`"""
+        start, end = self._prefix_range(prefix)
+        return end - start
+
+    def complete(self, prefix, limit=10):
+        """Chaves que começam com `prefix`, em ordem alfabética"""
+        start, end = self._prefix_range(prefix)
+        if limit is not None:
+            end = min(end, start + limit)
+        return [key for _, key in self._sorted[start:end]]
+
+    def page(self, after=None, limit=100):
+        """Até `limit` chaves depois de `after` (cursor: a última chave já vista), na ordem de `complete`"""
+        start = 0
+        if after is not None:
+            start = bisect.bisect_right(self._sorted, (normalize_text(after), after))
+        return [key for _, key in self._sorted[start:start + limit]]
+
+    def unique_completion(self, prefix):
+        """A única chave que começa com `prefix`, ou None se há zero ou várias"""
+        start, end = self._prefix_range(prefix)
+        if end - start == 1:
+            return self._sorted[start][1]
+        return None
+
+    def suggest(self, text, limit=5, max_distance=MAX_DISTANCE):
+        """Chaves a até `max_distance` edições de `text`, das mais próximas às mais distantes"""
+        query = normalize_text(text.strip())
+        if not query:
+            return []
+        max_distance = min(max_distance, MAX_DISTANCE)
+        if self._groups is None:
+            self._build_affixes()
+
+        prefixes = _lookup(self._prefix_deletes, query[:AFFIX_LENGTH], max_distance)
+        suffixes = _lookup(self._suffix_deletes, query[-AFFIX_LENGTH:], max_distance)
+
+        scored = []
+        for prefix in prefixes:
+            group = self._groups[prefix]
+            if len(group) < len(suffixes):
+                buckets = [bucket for suffix, bucket in group.items() if suffix in suffixes]
+            else:
+                buckets = [group[suffix] for suffix in suffixes if suffix in group]
+            for bucket in buckets:
+                for norm in bucket:
+                    if abs(len(norm) - len(query)) > max_distance:
+                        continue
+                    distance = edit_distance(query, norm, max_distance)
+                    if distance <= max_distance:
+                        for key in self._by_norm[norm]:
+                            scored.append((distance, key))
+        scored.sort()
+        return [key for _, key in scored[:limit]]
+
+
+def _copy_group(group):
+    return {suffix: set(norms) for suffix, norms in group.items()}
+
+
+def _register(table, affix, owned=None):
+    for variant in deletes(affix, MAX_DISTANCE):
+        if variant in table:
+            copy_on_write(table, variant, owned, set.copy).add(affix)
+        else:
+            table[variant] = {affix}
+
+
+def _unregister(table, affix, owned=None):
+    for variant in deletes(affix, MAX_DISTANCE):
+        posting = table.get(variant)
+        if posting is None or affix not in posting:
+            continue
+        if len(posting) == 1:
+            del table[variant]
+        else:
+            copy_on_write(table, variant, owned, set.copy).discard(affix)
+
+
+def _lookup(table, affix, max_distance):
+    """Prefixos/sufixos indexados que compartilham uma deleção com `affix`"""
+    found = set()
+    for variant in deletes(affix, max_distance):
+        posting = table.get(variant)
+        if posting:
+            found |= posting
+    return found
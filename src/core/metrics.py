@@ -0,0 +1,355 @@
+import atexit
+import bisect
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# ASSISTENTE_METRICS=0 desliga a instrumentação: `timed` devolve a própria
+# função e `timer` não mede nada
+ENABLED = os.environ.get("ASSISTENTE_METRICS", "1") != "0"
+
+# ASSISTENTE_PROFILE=cprofile (perfil determinístico da thread principal) ou
+# sample (amostragem de todas as threads); saída em ASSISTENTE_PROFILE_OUTPUT
+PROFILE_MODE = os.environ.get("ASSISTENTE_PROFILE", "")
+PROFILE_OUTPUT = os.environ.get("ASSISTENTE_PROFILE_OUTPUT", "")
+PROFILE_INTERVAL = float(os.environ.get("ASSISTENTE_PROFILE_INTERVAL", "0.005"))
+
+# Limites (segundos) dos buckets de latência, de 50µs a 5s
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+class _Series:
+    """Contagens (não acumuladas) por bucket, soma e máximo de um valor do rótulo"""
+
+    __slots__ = ("buckets", "counts", "total", "peak", "_lock")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.peak = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += value
+            if value > self.peak:
+                self.peak = value
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.total, self.peak
+
+
+class Histogram:
+    """Família de histogramas de latência com um rótulo (ex.: operation).
+
+    Cada valor do rótulo tem sua série; quem mede sempre a mesma coisa
+    guarda a série (`labels`) e paga só um bisect e algumas somas sob um
+    lock sem disputa na prática.
+    """
+
+    def __init__(self, name, help, label, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label = label
+        self.buckets = tuple(buckets)
+        self._series = {}   # valor do rótulo -> _Series
+        self._lock = threading.Lock()
+
+    def labels(self, label_value):
+        series = self._series.get(label_value)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(label_value, _Series(self.buckets))
+        return series
+
+    def observe(self, label_value, value):
+        self.labels(label_value).observe(value)
+
+    def snapshot(self):
+        """{valor do rótulo: (contagens, soma, máximo)}"""
+        with self._lock:
+            series = list(self._series.items())
+        return {label: s.snapshot() for label, s in series}
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_value, (counts, total, _) in sorted(self.snapshot().items()):
+            label = f'{self.label}="{_escape(label_value)}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{label},le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {_format_value(total)}")
+            lines.append(f"{self.name}_count{{{label}}} {cumulative}")
+        return lines
+
+    def summary(self):
+        """[(rótulo, chamadas, média, p50, p95, máximo)] em segundos; p50/p95 são limites de bucket"""
+        rows = []
+        for label_value, (counts, total, peak) in sorted(self.snapshot().items()):
+            calls = sum(counts)
+            if not calls:
+                continue
+            rows.append((
+                label_value, calls, total / calls,
+                self._quantile(counts, calls, 0.5, peak),
+                self._quantile(counts, calls, 0.95, peak),
+                peak,
+            ))
+        return rows
+
+    def _quantile(self, counts, calls, q, peak):
+        target = q * calls
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, peak)
+        return peak
+
+
+class CounterFamily:
+    """Família de contadores com um rótulo"""
+
+    def __init__(self, name, help, label):
+        self.name = name
+        self.help = help
+        self.label = label
+        self._values = Counter()
+        self._lock = threading.Lock()
+
+    def inc(self, label_value, amount=1):
+        with self._lock:
+            self._values[label_value] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_value, value in sorted(self.snapshot().items()):
+            lines.append(f'{self.name}{{{self.label}="{_escape(label_value)}"}} {_format_value(value)}')
+        return lines
+
+
+class Registry:
+    """Métricas do processo, exportadas no formato texto do Prometheus"""
+
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _family(self, cls, name, help, label):
+        with self._lock:
+            family = self._families.get(name)
+            if family is None:
+                family = self._families[name] = cls(name, help, label)
+            return family
+
+    def histogram(self, name, help, label):
+        return self._family(Histogram, name, help, label)
+
+    def counter(self, name, help, label):
+        return self._family(CounterFamily, name, help, label)
+
+    def clear(self):
+        for family in list(self._families.values()):
+            family.clear()
+
+    def render(self, samples=()):
+        """Texto para o endpoint /metrics.
+
+        `samples` são valores calculados na hora (tamanho do acervo, cache
+        de busca, área de transferência): (nome, tipo, ajuda, valor).
+        """
+        lines = []
+        for family in list(self._families.values()):
+            lines.extend(family.render())
+        for name, kind, help, value in samples:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+OPERATIONS = REGISTRY.histogram(
+    "assistente_operation_seconds", "Duração das operações do assistente", "operation"
+)
+ERRORS = REGISTRY.counter(
+    "assistente_operation_errors_total", "Operações que terminaram com exceção", "operation"
+)
+
+
+class _Timer:
+    __slots__ = ("operation", "series", "start")
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.series = OPERATIONS.labels(operation)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.series.observe(time.perf_counter() - self.start)
+        if exc_type is not None:
+            ERRORS.inc(self.operation)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(operation):
+    """Context manager que mede o bloco como `operation`"""
+    if not ENABLED:
+        return _NULL_TIMER
+    return _Timer(operation)
+
+
+def timed(operation):
+    """Decorator que mede cada chamada da função como `operation`"""
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        record = OPERATIONS.labels(operation).observe
+        clock = time.perf_counter
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                ERRORS.inc(operation)
+                raise
+            finally:
+                record(clock() - start)
+        return wrapper
+    return decorate
+
+
+def observe(operation, seconds):
+    """Registra uma duração já medida (ex.: trabalho feito em outra thread)"""
+    if ENABLED:
+        OPERATIONS.observe(operation, seconds)
+
+
+def render(samples=()):
+    return REGISTRY.render(samples)
+
+
+class SamplingProfiler:
+    """Amostra a pilha de todas as threads a cada `interval` segundos.
+
+    A saída é o formato "collapsed" (uma pilha por linha + contagem),
+    aceito por flamegraph.pl e speedscope. Diferente do cProfile, não
+    deixa as chamadas mais lentas e enxerga as threads do servidor web.
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+_profiler = None
+
+
+def start_profiler(mode=PROFILE_MODE, output=PROFILE_OUTPUT):
+    """Liga o profiler pedido em ASSISTENTE_PROFILE; o resultado é gravado ao sair"""
+    global _profiler
+    if not mode or _profiler is not None:
+        return None
+    if mode == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        output = output or "assistente.prof"
+
+        def finish():
+            profiler.disable()
+            profiler.dump_stats(output)
+        profiler.enable()
+    elif mode == "sample":
+        profiler = SamplingProfiler()
+        output = output or "assistente.stacks"
+
+        def finish():
+            profiler.stop()
+            profiler.write(output)
+        profiler.start()
+    else:
+        raise ValueError(f"ASSISTENTE_PROFILE inválido: {mode!r} (use 'cprofile' ou 'sample')")
+    atexit.register(finish)
+    _profiler = profiler
+    return profiler
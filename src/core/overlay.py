@@ -0,0 +1,147 @@
+import math
+from collections.abc import ItemsView, MutableMapping, ValuesView
+
+# Marca, na camada de cima, uma chave da base que foi removida
+_DELETED = object()
+_MISSING = object()
+# Camada de cima que sempre cabe numa cópia, por menor que seja a base
+MIN_TOP = 64
+
+
+class OverlayDict(MutableMapping):
+    """Dict em duas camadas: uma base nunca alterada e as mudanças por cima.
+
+    `copy()` compartilha a base e duplica só a camada de cima, então o
+    custo acompanha as mudanças desde a última compactação, não o tamanho
+    do dict. Quando a camada de cima passa de ~8·√n entradas, a cópia
+    junta as duas numa base nova (O(n) a cada O(√n) mudanças).
+
+    A ordem de iteração é a de um dict comum: uma chave da base removida e
+    reincluída passa a valer na posição da camada de cima (o fim).
+    """
+
+    __slots__ = ("_base", "_top", "_moved", "_len")
+
+    def __init__(self, base=None):
+        # `base` passa a ser da OverlayDict (e das cópias): não alterar depois
+        self._base = {} if base is None else base
+        self._top = {}
+        self._moved = set()  # chaves da base reincluídas: iteradas na ordem de `_top`
+        self._len = len(self._base)
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, key):
+        value = self._top.get(key, _MISSING)
+        if value is _MISSING:
+            return self._base[key]
+        if value is _DELETED:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = self._top.get(key, _MISSING)
+        if value is _MISSING:
+            return self._base.get(key, default)
+        if value is _DELETED:
+            return default
+        return value
+
+    def __contains__(self, key):
+        value = self._top.get(key, _MISSING)
+        if value is _MISSING:
+            return key in self._base
+        return value is not _DELETED
+
+    def __setitem__(self, key, value):
+        top = self._top
+        current = top.get(key, _MISSING)
+        if current is _DELETED:
+            # Reincluída: vai para o fim, como num dict
+            del top[key]
+            self._moved.add(key)
+            self._len += 1
+        elif current is _MISSING and key not in self._base:
+            self._len += 1
+        top[key] = value
+
+    def __delitem__(self, key):
+        top = self._top
+        current = top.get(key, _MISSING)
+        if current is _DELETED:
+            raise KeyError(key)
+        if key in self._base:
+            top[key] = _DELETED
+        elif current is _MISSING:
+            raise KeyError(key)
+        else:
+            del top[key]
+        self._len -= 1
+
+    def __iter__(self):
+        if not self._top:
+            return iter(self._base)
+        return (key for key, _ in self._iter_items())
+
+    def _iter_items(self):
+        base, top, moved = self._base, self._top, self._moved
+        if not top:
+            yield from base.items()
+            return
+        for key, value in base.items():
+            new = top.get(key, _MISSING)
+            if new is _MISSING:
+                yield key, value
+            elif new is not _DELETED and key not in moved:
+                yield key, new
+        for key, value in top.items():
+            if value is not _DELETED and (key not in base or key in moved):
+                yield key, value
+
+    def items(self):
+        return _Items(self)
+
+    def values(self):
+        return _Values(self)
+
+    def copy(self):
+        clone = OverlayDict.__new__(OverlayDict)
+        clone._len = self._len
+        if len(self._top) > max(MIN_TOP, 8 * math.isqrt(len(self._base))):
+            clone._base = dict(self._iter_items())
+            clone._top = {}
+            clone._moved = set()
+        else:
+            clone._base = self._base
+            clone._top = dict(self._top)
+            clone._moved = set(self._moved)
+        return clone
+
+    def __reduce__(self):
+        return OverlayDict, (dict(self._iter_items()),)
+
+    def __repr__(self):
+        return f"OverlayDict({dict(self._iter_items())!r})"
+
+
+class _Items(ItemsView):
+    __slots__ = ()
+
+    def __iter__(self):
+        return self._mapping._iter_items()
+
+
+class _Values(ValuesView):
+    __slots__ = ()
+
+    def __iter__(self):
+        for _, value in self._mapping._iter_items():
+            yield value
+
+
+def layered(table):
+    """`table` como OverlayDict (um dict vira a base de uma, sem cópia)"""
+    if isinstance(table, OverlayDict):
+        return table
+    return OverlayDict(table)
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """Cache LRU (com TTL) de resultados de busca por consulta normalizada.
+
+    Cada resultado vale para uma geração das respostas: quando
+    `ChatAssistant.generation` muda (inclusão, recarga), o cache inteiro é
+    descartado no próximo acesso. Além do acerto exato, `extendable`
+    encontra o resultado completo de um prefixo da consulta ("len" para
+    "lent"): como a busca é por substring, quem casa com a consulta mais
+    longa está nesse resultado, e basta refiltrá-lo.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # (query, limit) -> (expira_em, keys)
+        self._generation = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_generation(self, generation):
+        """Avança para `generation` se for nova; False se for uma geração velha"""
+        if self._generation is None or generation > self._generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._generation = generation
+        return generation == self._generation
+
+    def _fresh(self, cache_key, now):
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            return None
+        if entry[0] < now:
+            del self._entries[cache_key]
+            self.expirations += 1
+            return None
+        return entry[1]
+
+    def get(self, generation, query, limit):
+        """Resultado em cache para a consulta, ou None"""
+        with self._lock:
+            current = self._check_generation(generation)
+            keys = self._fresh((query, limit), time.monotonic()) if current else None
+            if keys is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((query, limit))
+            self.hits += 1
+            return keys
+
+    def extendable(self, generation, query, limit):
+        """Resultado completo do maior prefixo em cache da consulta, ou None.
+
+        Completo quer dizer que não foi cortado pelo limite: só assim ele
+        contém todos os candidatos da consulta mais longa.
+        """
+        with self._lock:
+            if not self._check_generation(generation):
+                return None
+            now = time.monotonic()
+            for end in range(len(query) - 1, 0, -1):
+                keys = self._fresh((query[:end], limit), now)
+                if keys is not None and (limit is None or len(keys) < limit):
+                    self.extensions += 1
+                    return keys
+            return None
+
+    def put(self, generation, query, limit, keys):
+        with self._lock:
+            if not self._check_generation(generation):
+                # Busca feita antes de uma alteração: resultado já velho
+                return
+            self._entries[(query, limit)] = (time.monotonic() + self.ttl, keys)
+            self._entries.move_to_end((query, limit))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Contadores do cache (para métricas)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "extensions": self.extensions,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
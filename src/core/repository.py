@@ -0,0 +1,358 @@
+import os
+import threading
+
+from core import metrics
+from core.response_store import ResponseStore, apply_op
+from core.key_index import KeyIndex
+from core.overlay import layered
+from core.response_model import CategoryIndex, to_responses
+from core.search_index import SearchIndex
+from core.snapshot_cache import SnapshotCache
+
+
+class ResponseRepository:
+    """Interface de armazenamento das respostas rápidas usada pelo ChatAssistant.
+
+    `responses` é um mapeamento key -> QuickResponse (pode ser um dict em
+    memória ou uma visão sobre o banco). Os métodos que alteram
+    estado retornam True quando algo mudou, para o ChatAssistant invalidar
+    caches derivados.
+
+    `on_change(added, changed, removed)`, se definido, recebe as chaves de
+    cada alteração aplicada (inclusive as vindas de outros processos);
+    None nas três listas quando o backend não sabe o que mudou.
+    """
+
+    name = None
+    on_change = None
+
+    @property
+    def responses(self):
+        raise NotImplementedError
+
+    def load(self):
+        """(Re)carrega tudo do armazenamento e retorna `responses`"""
+        raise NotImplementedError
+
+    def preload(self):
+        """Adianta a carga preguiçosa, se houver"""
+        pass
+
+    def put(self, key, message, category):
+        """Inclui ou substitui uma resposta"""
+        raise NotImplementedError
+
+    def put_many(self, rows):
+        """Inclui/substitui várias respostas (key, message, category); retorna quantas"""
+        count = 0
+        for key, message, category in rows:
+            self.put(key, message, category)
+            count += 1
+        return count
+
+    def poll(self):
+        """Aplica alterações feitas por outros processos"""
+        raise NotImplementedError
+
+    def search(self, keyword, limit=None, candidates=None):
+        """Chaves que casam com a consulta, ordenadas por relevância.
+
+        `candidates`, se dado, restringe a busca a essas chaves.
+        """
+        raise NotImplementedError
+
+    @property
+    def key_index(self):
+        """KeyIndex das chaves (prefixo e sugestões para o prompt)"""
+        raise NotImplementedError
+
+    def page_keys(self, after=None, limit=100):
+        """Até `limit` chaves depois do cursor `after` (a última já vista), em ordem alfabética"""
+        return self.key_index.page(after, limit)
+
+    @property
+    def category_index(self):
+        """CategoryIndex (categoria -> chaves) das respostas"""
+        raise NotImplementedError
+
+    def categories(self):
+        """Categorias existentes, em ordem alfabética"""
+        raise NotImplementedError
+
+    def save(self):
+        """Garante que o estado atual está gravado por completo.
+
+        Retorna True se, no caminho, trouxe alterações de outros processos.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def _present(self, keys):
+        """{key: já existia?} antes de uma alteração, só se alguém acompanha as mudanças"""
+        if self.on_change is None:
+            return None
+        responses = self.responses
+        return {key: key in responses for key in keys}
+
+    def _report(self, before):
+        """Avisa `on_change` comparando `_present` com o estado atual"""
+        if self.on_change is None or before is None:
+            return
+        responses = self.responses
+        added, changed, removed = [], [], []
+        for key, existed in before.items():
+            if key in responses:
+                (changed if existed else added).append(key)
+            elif existed:
+                removed.append(key)
+        if added or changed or removed:
+            self.on_change(added, changed, removed)
+
+    def _report_unknown(self):
+        if self.on_change is not None:
+            self.on_change(None, None, None)
+
+
+def _apply(state, ops):
+    """Aplica operações do WAL a (respostas, SearchIndex, KeyIndex, CategoryIndex); None = pula"""
+    responses, index, keys, categories = state
+    for op in ops:
+        key = op["key"]
+        if responses is not None:
+            apply_op(responses, op)
+        if op["op"] == "put":
+            if index is not None:
+                index.add(key, op["message"])
+            if keys is not None:
+                keys.add(key)
+            if categories is not None:
+                categories.add(key, op["category"])
+        else:
+            if index is not None:
+                index.remove(key)
+            if keys is not None:
+                keys.remove(key)
+            if categories is not None:
+                categories.remove(key)
+
+
+class JsonResponseRepository(ResponseRepository):
+    """Respostas em `respostas_rapidas.json` (+ WAL), inteiras em memória.
+
+    Indicado para bibliotecas pequenas e médias: a busca usa o SearchIndex
+    em memória e o arquivo continua editável à mão. Nada é lido no
+    construtor: a carga acontece no primeiro acesso (ou em `preload`), e
+    o snapshot já parseado e indexado vem de um cache em pickle enquanto
+    o JSON não muda.
+
+    Leitores nunca esperam nem veem um estado (respostas + índices) pela
+    metade: cada mudança monta o próximo estado ao lado, sobre cópias das
+    partes, e o publica numa única atribuição de `_state`. Respostas e
+    tabelas dos índices viram OverlayDicts na primeira mudança: a cópia
+    compartilha a base e os postings com o estado publicado e só duplica
+    o que mudou desde a última compactação, então o custo acompanha o
+    tamanho das mudanças, não o do acervo.
+    """
+
+    name = "json"
+
+    def __init__(self, data_dir, defaults=dict):
+        self.store = ResponseStore(data_dir)
+        self.snapshot_cache = SnapshotCache(
+            self.store.snapshot_path, os.path.join(data_dir, "respostas_rapidas.cache")
+        )
+        self.defaults = defaults
+        self._load_lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        # (respostas, SearchIndex, KeyIndex ou None até o primeiro uso, CategoryIndex) publicados
+        self._state = None
+
+    def _ensure_loaded(self):
+        if self._state is None:
+            with self._load_lock:
+                if self._state is None:
+                    self.load()
+
+    def preload(self):
+        """Carrega agora (ex.: numa thread enquanto o usuário lê a tela inicial)"""
+        self._ensure_loaded()
+
+    def _published(self):
+        """Estado publicado (carrega no primeiro acesso)"""
+        state = self._state
+        if state is None:
+            self._ensure_loaded()
+            state = self._state
+        return state
+
+    @property
+    def responses(self):
+        return self._published()[0]
+
+    @property
+    def search_index(self):
+        return self._published()[1]
+
+    @property
+    def key_index(self):
+        index = self._published()[2]
+        if index is None:
+            # Montado no primeiro uso (só a CLI completa chaves): não entra
+            # na carga nem no cache do snapshot
+            with self._update_lock:
+                state = self._state
+                index = state[2]
+                if index is None:
+                    index = KeyIndex(state[0])
+                    self._state = state[:2] + (index,) + state[3:]
+        return index
+
+    @property
+    def category_index(self):
+        return self._published()[3]
+
+    @metrics.timed("load_responses")
+    def load(self):
+        if self.store.exists():
+            state, ops = self.store.read(self._read_snapshot)
+            _apply(state, ops)
+        else:
+            responses = to_responses(self.defaults())
+            state = (responses, SearchIndex(responses), None, CategoryIndex(responses))
+        with self._update_lock:
+            self._state = tuple(state)
+        return state[0]
+
+    def _read_snapshot(self):
+        return self.snapshot_cache.load(self._build_snapshot)
+
+    def _build_snapshot(self):
+        responses = self.store.read_snapshot()
+        return responses, SearchIndex(responses), None, CategoryIndex(responses)
+
+    def save(self):
+        self._ensure_loaded()
+        with self._update_lock:
+            # Inclusões de outros processos ainda não lidas entram no snapshot e aqui
+            merged = self.store.write_snapshot(self._state[0])
+            if merged is None:
+                return self._apply_responses(self.store.load())
+            return self._apply_ops(merged)
+
+    def put(self, key, message, category):
+        return self.put_many([(key, message, category)]) > 0
+
+    def put_many(self, rows):
+        """Grava o lote com um único append no WAL e atualiza os índices uma vez"""
+        ops = [
+            {"op": "put", "key": key, "message": message, "category": category}
+            for key, message, category in rows
+        ]
+        if not ops:
+            return 0
+        self._ensure_loaded()
+        if not self.store.exists():
+            # Primeira gravação: materializa as respostas padrão no snapshot
+            self.save()
+        with self._update_lock:
+            # O WAL devolve também inclusões de outros processos ainda não vistas
+            applied = self.store.append(ops)
+            if applied is None:
+                self._apply_responses(self.store.load())
+            else:
+                self._apply_ops(applied)
+        return len(ops)
+
+    def poll(self):
+        """Aplica alterações feitas em disco (edição manual ou outro processo).
+
+        Inclusões de outros processos chegam como linhas novas do WAL e
+        são aplicadas uma a uma; uma troca do snapshot (compactação,
+        edição manual) substitui o dicionário de uma vez, e quem já pegou
+        a referência antiga continua lendo um estado completo. Só as
+        entradas que mudaram são reindexadas. Se outra thread já está
+        recarregando, retorna sem esperar.
+        """
+        if self._state is None:
+            # Ainda não carregado: o primeiro acesso já lerá o estado atual
+            return False
+        if not self._update_lock.acquire(blocking=False):
+            return False
+        try:
+            try:
+                change = self.store.poll()
+            except ValueError:
+                # Arquivo editado à mão e ainda inválido: tenta de novo depois
+                return False
+            if change is None:
+                return False
+            kind, payload = change
+            if kind == "snapshot":
+                return self._apply_responses(payload)
+            return self._apply_ops(payload)
+        finally:
+            self._update_lock.release()
+
+    def _apply_ops(self, ops):
+        """Publica o estado com as operações do WAL aplicadas"""
+        before = self._present(dict.fromkeys(op["key"] for op in ops))
+        if ops:
+            self._publish(ops)
+        self._report(before)
+        return bool(ops)
+
+    def _apply_responses(self, responses):
+        """Troca o snapshot de respostas, reindexando só o que mudou"""
+        current = self._state[0]
+        changed = [key for key, data in responses.items() if current.get(key) != data]
+        removed = [key for key in current if key not in responses]
+        before = self._present(changed + removed)
+
+        ops = [{"op": "delete", "key": key} for key in removed]
+        ops.extend(
+            {"op": "put", "key": key, "message": responses[key].message, "category": responses[key].category}
+            for key in changed
+        )
+        if ops:
+            self._publish(ops, responses)
+        self._report(before)
+        return bool(ops)
+
+    def _publish(self, ops, responses=None):
+        """Aplica `ops` a cópias do estado e as publica de uma vez.
+
+        `responses`, se dado, já é o dicionário final (troca de snapshot,
+        na ordem do arquivo): só os índices recebem as operações.
+        Chamar com `_update_lock`.
+        """
+        state = self._state
+        parts = [layered(state[0]).copy() if responses is None else None]
+        parts.extend(part.copy() if part is not None else None for part in state[1:])
+        _apply(parts, ops)
+        if responses is not None:
+            parts[0] = responses
+        self._state = tuple(parts)
+
+    def search(self, keyword, limit=None, candidates=None):
+        return self.search_index.search(keyword, limit=limit, candidates=candidates)
+
+    def categories(self):
+        return self.category_index.categories()
+
+
+BACKENDS = ("json", "sqlite", "shared")
+
+
+def create_repository(backend, data_dir, defaults=dict):
+    """Cria o repositório do backend pedido ("json", "sqlite" ou "shared")"""
+    if backend == "json":
+        return JsonResponseRepository(data_dir, defaults)
+    if backend == "sqlite":
+        from core.sqlite_repository import SqliteResponseRepository
+        return SqliteResponseRepository(os.path.join(data_dir, "respostas.db"), defaults)
+    if backend == "shared":
+        from core.shared_repository import SharedResponseRepository
+        return SharedResponseRepository(data_dir, defaults)
+    raise ValueError(f"Backend desconhecido: {backend!r} (use {', '.join(BACKENDS)})")
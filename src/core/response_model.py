@@ -0,0 +1,180 @@
+import bisect
+import sys
+from collections.abc import Mapping
+
+from core.overlay import layered
+from core.search_index import copy_on_write, normalize_text
+
+
+class QuickResponse(Mapping):
+    """Uma resposta rápida: mensagem e categoria.
+
+    Registro com __slots__ (sem o dicionário por instância) e com a
+    categoria internada: milhares de respostas da mesma categoria apontam
+    para uma única string. Continua lendo como o dict de antes
+    (`data["message"]`, `**data`, `dict(data)`), então quem consome as
+    respostas não muda; o JSON em disco também não (`to_dict`).
+    """
+
+    __slots__ = ("message", "category")
+
+    FIELDS = ("message", "category")
+
+    def __init__(self, message, category):
+        self.message = message
+        self.category = sys.intern(category)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["message"], data["category"])
+
+    def __getitem__(self, field):
+        if field == "message":
+            return self.message
+        if field == "category":
+            return self.category
+        raise KeyError(field)
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return 2
+
+    def __eq__(self, other):
+        if isinstance(other, QuickResponse):
+            return self.message == other.message and self.category == other.category
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Pickle compacto (cache do snapshot) que reinterna a categoria ao carregar
+        return QuickResponse, (self.message, self.category)
+
+    def __repr__(self):
+        return f"QuickResponse(message={self.message!r}, category={self.category!r})"
+
+    def to_dict(self):
+        return {"message": self.message, "category": self.category}
+
+
+def to_responses(mapping):
+    """{key: dict} (JSON, padrões) -> {key: QuickResponse}"""
+    return {key: QuickResponse.from_dict(data) for key, data in mapping.items()}
+
+
+def json_default(value):
+    """`default` do json.dump: grava QuickResponse como o dict de sempre"""
+    if isinstance(value, QuickResponse):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class CategoryIndex:
+    """Índice categoria -> chaves, mantido a cada inclusão/remoção.
+
+    As chaves de cada categoria ficam num dict usado como conjunto
+    ordenado (ordem de inclusão, remoção O(1)). A lista ordenada de
+    categorias é guardada até alguma categoria surgir ou sumir, então
+    `categories()` não percorre as respostas; a ordem alfabética das chaves
+    de uma categoria (paginação) é montada no primeiro `page` e guardada
+    até a categoria mudar.
+    """
+
+    def __init__(self, responses=None):
+        self._keys = {}          # categoria -> {key: None}
+        self._category_of = {}   # key -> categoria
+        self._sorted = None
+        self._ordered = {}       # categoria -> [(normalizada, key)] ordenada
+        self._owned = None       # categorias já duplicadas desde o último `copy` (ver copy_on_write)
+        if responses:
+            for key, data in responses.items():
+                self.add(key, data["category"])
+
+    def __len__(self):
+        return len(self._keys)
+
+    def copy(self):
+        """Cópia independente (alterar uma não afeta a outra).
+
+        Como no SearchIndex, key -> categoria vira um OverlayDict e as
+        chaves de cada categoria ficam compartilhadas até um dos lados
+        alterar a categoria (que também vira um OverlayDict, para a cópia
+        não custar o tamanho da categoria).
+        """
+        clone = CategoryIndex()
+        clone._keys = dict(self._keys)
+        self._category_of = layered(self._category_of)
+        clone._category_of = self._category_of.copy()
+        self._owned = set()
+        clone._owned = set()
+        # As listas guardadas são trocadas, nunca alteradas: podem ser compartilhadas
+        clone._sorted = self._sorted
+        clone._ordered = dict(self._ordered)
+        return clone
+
+    def add(self, key, category):
+        category = sys.intern(category)
+        current = self._category_of.get(key)
+        if current == category:
+            return
+        if current is not None:
+            self._discard(current, key)
+        if category in self._keys:
+            keys = copy_on_write(self._keys, category, self._owned, _copy_keys)
+        else:
+            keys = self._keys[category] = {}
+            self._sorted = None
+        keys[key] = None
+        self._ordered.pop(category, None)
+        self._category_of[key] = category
+
+    def remove(self, key):
+        category = self._category_of.pop(key, None)
+        if category is not None:
+            self._discard(category, key)
+
+    def _discard(self, category, key):
+        """Tira `key` das chaves de `category` (sem mexer em `_category_of`)"""
+        self._ordered.pop(category, None)
+        if len(self._keys[category]) == 1:
+            del self._keys[category]
+            self._sorted = None
+        else:
+            del copy_on_write(self._keys, category, self._owned, _copy_keys)[key]
+
+    def category_of(self, key):
+        return self._category_of.get(key)
+
+    def categories(self):
+        """Categorias existentes, em ordem alfabética"""
+        if self._sorted is None:
+            self._sorted = sorted(self._keys)
+        return list(self._sorted)
+
+    def keys(self, category):
+        """Chaves da categoria, na ordem de inclusão"""
+        return list(self._keys.get(category, ()))
+
+    def page(self, category, after=None, limit=100):
+        """Até `limit` chaves da categoria depois do cursor `after`, em ordem alfabética"""
+        ordered = self._ordered.get(category)
+        if ordered is None:
+            ordered = sorted((normalize_text(key), key) for key in self._keys.get(category, ()))
+            self._ordered[category] = ordered
+        start = 0
+        if after is not None:
+            start = bisect.bisect_right(ordered, (normalize_text(after), after))
+        return [key for _, key in ordered[start:start + limit]]
+
+    def count(self, category):
+        return len(self._keys.get(category, ()))
+
+    def groups(self):
+        """{categoria: [keys]}, categorias na ordem em que apareceram"""
+        return {category: list(keys) for category, keys in self._keys.items()}
+
+
+def _copy_keys(keys):
+    return layered(keys).copy()
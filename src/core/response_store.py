@@ -0,0 +1,240 @@
+import json
+import os
+
+from core.file_lock import locked
+from core.file_watcher import FileWatcher, file_signature
+from core.response_model import QuickResponse, json_default, to_responses
+
+# Compacta quando o WAL passa de 1 MB e de metade do snapshot: o custo
+# O(biblioteca) da compactação fica diluído entre muitas inclusões.
+COMPACT_MIN_BYTES = 1024 * 1024
+COMPACT_RATIO = 0.5
+
+
+def apply_op(responses, op):
+    """Aplica uma operação do WAL a um dicionário de respostas"""
+    if op["op"] == "put":
+        responses[op["key"]] = QuickResponse(op["message"], op["category"])
+    elif op["op"] == "delete":
+        responses.pop(op["key"], None)
+
+
+class ResponseStore:
+    """Persistência das respostas: snapshot JSON + write-ahead log.
+
+    Cada inclusão acrescenta uma linha a `respostas_rapidas.wal` (O(1)),
+    em vez de reescrever o JSON inteiro. De tempos em tempos o WAL é
+    compactado no snapshot, gravado num temporário e trocado com rename,
+    então uma queda no meio nunca deixa o `respostas_rapidas.json` pela
+    metade. Tudo que escreve usa um flock em `.lock`, e a compactação
+    relê snapshot + WAL do disco, então inclusões de outros processos
+    não se perdem.
+    """
+
+    def __init__(self, data_dir, durable=True):
+        self.snapshot_path = os.path.join(data_dir, "respostas_rapidas.json")
+        self.wal_path = os.path.join(data_dir, "respostas_rapidas.wal")
+        self.lock_path = os.path.join(data_dir, "respostas_rapidas.lock")
+        self.durable = durable
+        self._wal_offset = 0
+        self._snapshot_signature = None
+        self._snapshot_watcher = FileWatcher(self.snapshot_path)
+        self._wal_watcher = FileWatcher(self.wal_path)
+
+    def _locked(self):
+        return locked(self.lock_path)
+
+    def exists(self):
+        return os.path.exists(self.snapshot_path) or os.path.exists(self.wal_path)
+
+    # ----------------------------------------------------------- leitura
+
+    def read_snapshot(self):
+        """Conteúdo do snapshot JSON ({key: QuickResponse}), sem o WAL"""
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                return to_responses(json.load(f))
+        except FileNotFoundError:
+            return {}
+
+    def _read_wal(self, offset):
+        """Operações completas a partir de `offset`; retorna (ops, novo_offset).
+
+        Uma última linha sem '\\n' (gravação interrompida) é ignorada e
+        será relida quando estiver completa.
+        """
+        try:
+            with open(self.wal_path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+        end = data.rfind(b"\n") + 1
+        ops = []
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                ops.append(json.loads(line))
+            except ValueError:
+                # Resto de uma gravação interrompida por queda: descarta
+                continue
+        return ops, offset + end
+
+    def read(self, snapshot_reader=None):
+        """Snapshot e operações do WAL lidos juntos; retorna (snapshot, ops).
+
+        `snapshot_reader` substitui a leitura do JSON (ex.: um cache já
+        processado do mesmo arquivo).
+        """
+        with self._locked():
+            snapshot = (snapshot_reader or self.read_snapshot)()
+            ops, self._wal_offset = self._read_wal(0)
+            self._snapshot_signature = file_signature(self.snapshot_path)
+        self._snapshot_watcher.mark_seen()
+        self._wal_watcher.mark_seen()
+        return snapshot, ops
+
+    def load(self):
+        """Estado completo: snapshot + operações do WAL"""
+        responses, ops = self.read()
+        for op in ops:
+            apply_op(responses, op)
+        return responses
+
+    def poll(self):
+        """Mudanças feitas por outros processos desde a última leitura.
+
+        Retorna None se nada mudou, ("ops", [operações]) quando só chegaram
+        linhas novas no WAL, ou ("snapshot", respostas) quando houve
+        compactação ou o arquivo foi substituído e é preciso recarregar tudo.
+        """
+        snapshot_changed = self._snapshot_watcher.changed()
+        wal_changed = self._wal_watcher.changed()
+        if not (snapshot_changed or wal_changed):
+            return None
+
+        if file_signature(self.snapshot_path) != self._snapshot_signature:
+            return ("snapshot", self.load())
+        try:
+            wal_size = os.path.getsize(self.wal_path)
+        except FileNotFoundError:
+            wal_size = 0
+        if wal_size < self._wal_offset:
+            # WAL truncado sem troca de snapshot visível: recarrega por segurança
+            return ("snapshot", self.load())
+        ops, self._wal_offset = self._read_wal(self._wal_offset)
+        return ("ops", ops) if ops else None
+
+    # ----------------------------------------------------------- escrita
+
+    def append(self, ops):
+        """Grava operações no WAL.
+
+        Retorna as operações de outros processos que ainda não tinham sido
+        lidas seguidas das próprias, na ordem do log, para o chamador
+        aplicar ao seu estado em memória.
+        """
+        data = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops).encode("utf-8")
+        with self._locked():
+            if file_signature(self.snapshot_path) != self._snapshot_signature:
+                pending = None  # compactado por outro processo: chamador recarrega
+            else:
+                pending, self._wal_offset = self._read_wal(self._wal_offset)
+
+            fd = os.open(self.wal_path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                size = os.fstat(fd).st_size
+                if size:
+                    os.lseek(fd, size - 1, os.SEEK_SET)
+                    if os.read(fd, 1) != b"\n":
+                        # Fecha a linha incompleta deixada por uma queda
+                        data = b"\n" + data
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                if self.durable:
+                    os.fsync(fd)
+                wal_size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+
+            if pending is not None:
+                self._wal_offset = wal_size
+            if self._should_compact(wal_size):
+                self._compact()
+        self._wal_watcher.mark_seen()
+        return None if pending is None else pending + list(ops)
+
+    def put(self, key, message, category):
+        return self.append([{"op": "put", "key": key, "message": message, "category": category}])
+
+    def delete(self, key):
+        return self.append([{"op": "delete", "key": key}])
+
+    def _should_compact(self, wal_size):
+        if wal_size < COMPACT_MIN_BYTES:
+            return False
+        try:
+            snapshot_size = os.path.getsize(self.snapshot_path)
+        except FileNotFoundError:
+            snapshot_size = 0
+        return wal_size > snapshot_size * COMPACT_RATIO
+
+    def compact(self):
+        """Incorpora o WAL ao snapshot"""
+        with self._locked():
+            self._compact()
+
+    def _compact(self):
+        # Relê do disco (e não do estado em memória) para incluir
+        # o que outros processos gravaram
+        responses = self.read_snapshot()
+        ops, _ = self._read_wal(0)
+        for op in ops:
+            apply_op(responses, op)
+        self._write_snapshot(responses)
+        # Uma queda entre o rename e o truncate só faz o WAL ser reaplicado
+        # sobre o snapshot novo, e put/delete são idempotentes
+        with open(self.wal_path, 'wb'):
+            pass
+        self._wal_offset = 0
+
+    def write_snapshot(self, responses):
+        """Grava `responses` como snapshot novo e esvazia o WAL.
+
+        O que outros processos acrescentaram ao WAL e este ainda não leu
+        (de `_wal_offset` em diante) é reaplicado por cima antes do
+        truncate, e as operações são retornadas para o chamador aplicar ao
+        seu estado. Se outro processo trocou o snapshot desde a nossa
+        leitura, `responses` pode estar desatualizado: compacta o que está
+        em disco e retorna None (o chamador recarrega).
+        """
+        with self._locked():
+            if (self._snapshot_signature is not None
+                    and file_signature(self.snapshot_path) != self._snapshot_signature):
+                self._compact()
+                return None
+            ops, _ = self._read_wal(self._wal_offset)
+            # json.dump só aceita dict: um OverlayDict (estado já alterado) vira cópia
+            if ops or not isinstance(responses, dict):
+                responses = dict(responses)
+            for op in ops:
+                apply_op(responses, op)
+            self._write_snapshot(responses)
+            with open(self.wal_path, 'wb'):
+                pass
+            self._wal_offset = 0
+        self._wal_watcher.mark_seen()
+        return ops
+
+    def _write_snapshot(self, responses):
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(responses, f, ensure_ascii=False, indent=2, default=json_default)
+            f.flush()
+            if self.durable:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        self._snapshot_signature = file_signature(self.snapshot_path)
+        self._snapshot_watcher.mark_seen()
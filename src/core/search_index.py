@@ -0,0 +1,427 @@
+import bisect
+import heapq
+import re
+import unicodedata
+from array import array
+
+from core.overlay import layered
+
+_TOKEN_RE = re.compile(r"\w+")
+# Ids das respostas nas listas de postings (uint32)
+_ID_TYPE = "I"
+# Separa chave e mensagem no texto normalizado de uma vez na construção
+_SEP = "\x1f"
+# A partir daqui a construção agrupa os trigramas com numpy
+BULK_BUILD_MIN = 5000
+# Ids de respostas removidas tolerados antes de renumerar (além de um por resposta viva)
+MIN_GARBAGE = 5000
+
+# Marcas diacríticas combinantes (U+0300..U+036F) que sobram após a decomposição NFKD
+_STRIP_ACCENTS = {codepoint: None for codepoint in range(0x300, 0x370)}
+
+
+def _strip_accents(text):
+    return unicodedata.normalize("NFKD", text).translate(_STRIP_ACCENTS)
+
+
+def _latin1_fold():
+    """Tabela Latin-1 -> sem acento (bytes) e os bytes que ela não resolve"""
+    table = bytearray(range(256))
+    unfoldable = []
+    for code in range(0x80, 0x100):
+        folded = _strip_accents(chr(code))
+        if len(folded) == 1 and ord(folded) < 0x100:
+            table[code] = ord(folded)
+        else:
+            # "½" -> "1⁄2", "µ" -> "μ": ficam para o NFKD
+            unfoldable.append(bytes([code]))
+    return bytes(table), unfoldable
+
+
+# Texto em português cabe em Latin-1: trocar byte a byte dá o mesmo que o
+# NFKD caractere a caractere (ali não há marcas combinantes a reordenar),
+# por uma fração do custo
+_LATIN1_FOLD, _LATIN1_UNFOLDABLE = _latin1_fold()
+
+
+def normalize_text(text):
+    """Normaliza texto para busca: minúsculas e sem acentos ("lentidão" -> "lentidao")"""
+    text = text.lower()
+    if text.isascii():
+        return text
+    try:
+        data = text.encode("latin-1")
+    except UnicodeEncodeError:
+        return _strip_accents(text)
+    for byte in _LATIN1_UNFOLDABLE:
+        if byte in data:
+            return _strip_accents(text)
+    return data.translate(_LATIN1_FOLD).decode("latin-1")
+
+
+def trigrams(text):
+    """Retorna o conjunto de trigramas de um texto já normalizado"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def index_terms(norm_key, norm_message):
+    """(trigramas de chave + mensagem, trigramas da chave, tokens) de uma resposta normalizada"""
+    key_grams = trigrams(norm_key)
+    tokens = set(_TOKEN_RE.findall(norm_key + " " + norm_message))
+    return key_grams | trigrams(norm_message), key_grams, tokens
+
+
+def match_score(norm_key, norm_message, query, whole_word):
+    """Relevância de uma resposta (textos normalizados) para a consulta; 0 se não casa"""
+    score = 0.0
+    if norm_key == query:
+        score += 100
+    elif norm_key.startswith(query):
+        score += 50
+    elif query in norm_key:
+        score += 30
+
+    position = norm_message.find(query)
+    if position >= 0:
+        score += 10 + 5.0 / (1 + position)
+        if whole_word:
+            # Palavra inteira vale mais que pedaço de palavra
+            score += 10
+    return score
+
+
+def best_keys(scored, limit=None):
+    """Ordena pares (-score, key) (qualquer iterável) e aplica o top-k"""
+    if limit is not None:
+        best = heapq.nsmallest(limit, scored)
+    else:
+        best = sorted(scored)
+    return [key for _, key in best]
+
+
+def _normalize_all(keys, messages):
+    """(chaves, mensagens) normalizadas numa única chamada sobre o texto todo.
+
+    Retorna também o texto normalizado (chave SEP mensagem SEP ...), ou None
+    se o separador aparece em algum texto e foi preciso normalizar um a um.
+    """
+    texts = [text for pair in zip(keys, messages) for text in pair]
+    joined = _SEP.join(texts)
+    if not texts or joined.count(_SEP) != len(texts) - 1:
+        return [normalize_text(key) for key in keys], [normalize_text(message) for message in messages], None
+    # O separador não é letra nem muda na normalização: cada pedaço sai igual
+    # ao que sairia sozinho
+    joined = normalize_text(joined)
+    pieces = joined.split(_SEP)
+    return pieces[0::2], pieces[1::2], joined
+
+
+def _group(terms_per_doc):
+    """{termo: array(ids)} a partir dos termos de cada resposta, na ordem dos ids"""
+    table = {}
+    get = table.get
+    for doc, terms in enumerate(terms_per_doc):
+        for term in terms:
+            postings = get(term)
+            if postings is None:
+                table[term] = [doc]
+            else:
+                postings.append(doc)
+    return {term: array(_ID_TYPE, postings) for term, postings in table.items()}
+
+
+def _bulk_trigram_postings(joined, count):
+    """(trigrama -> ids, trigrama da chave -> ids) de `count` respostas com numpy.
+
+    `joined` é chave SEP mensagem SEP ... já normalizado. Cada trigrama vira
+    um inteiro (posição de cada caractere no alfabeto do texto) e o par
+    (trigrama, id) cabe num uint64: uma única ordenação agrupa e deduplica
+    tudo, sem um append por ocorrência. None se o par não couber em 64 bits
+    (alfabeto ou acervo grandes demais).
+    """
+    import numpy as np
+
+    chars = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+    present = np.bincount(chars)
+    alphabet = np.flatnonzero(present)
+    char_bits = max(1, (len(alphabet) - 1).bit_length())
+    doc_bits = max(1, (count - 1).bit_length())
+    if 3 * char_bits + doc_bits > 64:
+        return None
+    rank = np.zeros(len(present), dtype=np.uint64)
+    rank[alphabet] = np.arange(len(alphabet), dtype=np.uint64)
+    ranks = rank[chars]
+
+    # Trigramas que cruzam um separador não existem; o segmento diz de que
+    # resposta (segmento // 2) e de que campo (par: chave) cada um é
+    is_sep = chars == ord(_SEP)
+    del chars
+    valid = ~(is_sep[:-2] | is_sep[1:-1] | is_sep[2:])
+    segments = np.cumsum(is_sep, dtype=np.uint64)[:-2][valid]
+    del is_sep
+    # Arrays do tamanho do texto: alterados no lugar para não duplicar o pico de memória
+    pairs = ranks[:-2] << np.uint64(2 * char_bits)
+    pairs |= ranks[1:-1] << np.uint64(char_bits)
+    pairs |= ranks[2:]
+    del ranks
+    pairs = pairs[valid]
+    del valid
+    pairs <<= np.uint64(doc_bits)
+    in_key = (segments & np.uint64(1)) == 0
+    segments >>= np.uint64(1)
+    pairs |= segments
+    del segments
+    key_pairs = pairs[in_key]
+    del in_key
+
+    char_mask = (1 << char_bits) - 1
+    letters = [chr(code) for code in alphabet.tolist()]
+    id_dtype = np.dtype(_ID_TYPE)
+    tables = []
+    for selected in (pairs, key_pairs):
+        selected.sort()
+        selected = selected[np.concatenate(([True], selected[1:] != selected[:-1]))]
+        terms = selected >> np.uint64(doc_bits)
+        ids = (selected & np.uint64((1 << doc_bits) - 1)).astype(id_dtype)
+        starts = np.flatnonzero(np.concatenate(([True], terms[1:] != terms[:-1])))
+        ends = np.append(starts[1:], len(terms))
+        table = {}
+        for term, start, end in zip(terms[starts].tolist(), starts.tolist(), ends.tolist()):
+            gram = (letters[term >> 2 * char_bits] + letters[(term >> char_bits) & char_mask]
+                    + letters[term & char_mask])
+            postings = table[gram] = array(_ID_TYPE)
+            postings.frombytes(ids[start:end].tobytes())
+        tables.append(table)
+    return tuple(tables)
+
+
+def copy_on_write(table, key, owned, copy):
+    """`table[key]` pronto para ser alterado no lugar.
+
+    Um índice e suas cópias (`copy()`) compartilham os valores das tabelas;
+    `owned` guarda os (tabela, chave) que este lado já duplicou (com
+    `copy`) desde então. None: o índice nunca foi copiado e tudo é dele.
+    """
+    value = table[key]
+    if owned is not None:
+        mark = (id(table), key)
+        if mark not in owned:
+            value = table[key] = copy(value)
+            owned.add(mark)
+    return value
+
+
+class SearchIndex:
+    """Índice invertido (tokens + trigramas) sobre as respostas rápidas.
+
+    Cada resposta é normalizada uma única vez, na indexação, e ganha um id
+    inteiro; cada termo aponta para um array dos ids que o contêm, em ordem
+    crescente (4 bytes por ocorrência, e o pickle do cache é uma cópia de
+    bytes, não um conjunto de strings por termo). A busca por substring
+    usa a interseção das listas de trigramas para reduzir os candidatos e
+    só então confirma o casamento no texto normalizado.
+
+    Ids não são reaproveitados: uma resposta reindexada ganha um id novo no
+    fim das listas por id, e o antigo fica como lixo até haver mais lixo
+    que respostas, quando o índice é renumerado.
+    """
+
+    def __init__(self, responses=None):
+        self._ids = {}            # key -> id
+        self._names = []          # id -> key
+        self._norm_keys = []      # id -> chave normalizada
+        self._norm_messages = []  # id -> mensagem normalizada
+        self._docs = 0            # ids usados por este índice (as listas podem ter mais, de uma cópia)
+        self._trigrams = {}       # trigrama -> array(ids), chave + mensagem
+        self._key_trigrams = {}   # trigrama -> array(ids), só a chave
+        self._tokens = {}         # token -> array(ids)
+        self._owned = None        # postings já duplicados desde o último `copy` (ver copy_on_write)
+        if responses:
+            self._build(list(responses), [data["message"] for data in responses.values()])
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, key):
+        return key in self._ids
+
+    def _tables(self):
+        return self._trigrams, self._key_trigrams, self._tokens
+
+    def _build(self, keys, messages):
+        """Indexa tudo de uma vez (bem mais rápido que `add` resposta a resposta)"""
+        norm_keys, norm_messages, joined = _normalize_all(keys, messages)
+        self._ids = {key: doc for doc, key in enumerate(keys)}
+        self._names = keys
+        self._docs = len(keys)
+        # Mesma string quando a chave já está normalizada: metade da memória (e do pickle)
+        self._norm_keys = [key if norm == key else norm for key, norm in zip(keys, norm_keys)]
+        self._norm_messages = norm_messages
+
+        tables = None
+        if joined is not None and len(keys) >= BULK_BUILD_MIN:
+            tables = _bulk_trigram_postings(joined, len(keys))
+        if tables is None:
+            key_grams = [trigrams(norm_key) for norm_key in norm_keys]
+            tables = (
+                _group(grams | trigrams(norm_message) for grams, norm_message in zip(key_grams, norm_messages)),
+                _group(key_grams),
+            )
+        self._trigrams, self._key_trigrams = tables
+        self._tokens = _group(
+            set(_TOKEN_RE.findall(norm_key + " " + norm_message))
+            for norm_key, norm_message in zip(norm_keys, norm_messages)
+        )
+
+    def copy(self):
+        """Cópia independente (alterar uma não afeta a outra).
+
+        As tabelas viram OverlayDicts e a cópia só duplica as mudanças
+        ainda não compactadas; os postings e as listas por id ficam
+        compartilhados (as listas só crescem, e um posting é duplicado por
+        quem o altera primeiro), então o custo acompanha o tamanho das
+        mudanças, não o do acervo.
+        """
+        clone = SearchIndex()
+        self._ids, self._trigrams, self._key_trigrams, self._tokens = (
+            layered(table) for table in (self._ids,) + self._tables()
+        )
+        clone._ids, clone._trigrams, clone._key_trigrams, clone._tokens = (
+            table.copy() for table in (self._ids,) + self._tables()
+        )
+        clone._names = self._names
+        clone._norm_keys = self._norm_keys
+        clone._norm_messages = self._norm_messages
+        clone._docs = self._docs
+        self._owned = set()
+        clone._owned = set()
+        return clone
+
+    def add(self, key, message):
+        """Indexa (ou reindexa) uma resposta"""
+        previous = self._ids.get(key)
+        if previous is not None:
+            self._unindex(previous)
+
+        norm_key = normalize_text(key)
+        if norm_key == key:
+            norm_key = key
+        norm_message = normalize_text(message)
+        if len(self._names) != self._docs:
+            # Outra cópia já acrescentou ids nas listas compartilhadas
+            self._names = self._names[:self._docs]
+            self._norm_keys = self._norm_keys[:self._docs]
+            self._norm_messages = self._norm_messages[:self._docs]
+        doc = self._docs
+        self._names.append(key)
+        self._norm_keys.append(norm_key)
+        self._norm_messages.append(norm_message)
+        self._docs += 1
+        self._ids[key] = doc
+
+        for table, terms in zip(self._tables(), index_terms(norm_key, norm_message)):
+            for term in terms:
+                if term in table:
+                    # Id novo é o maior: vai para o fim
+                    copy_on_write(table, term, self._owned, array.__copy__).append(doc)
+                else:
+                    table[term] = array(_ID_TYPE, (doc,))
+        if previous is not None:
+            self._collect()
+
+    def remove(self, key):
+        """Remove uma resposta do índice"""
+        doc = self._ids.pop(key, None)
+        if doc is None:
+            return
+        self._unindex(doc)
+        self._collect()
+
+    def _collect(self):
+        """Renumera os ids quando os de respostas removidas passam dos vivos"""
+        live = len(self._ids)
+        if self._docs - live <= max(live, MIN_GARBAGE):
+            return
+        docs = sorted(self._ids.values())
+        self._build([self._names[doc] for doc in docs], [self._norm_messages[doc] for doc in docs])
+        # Tabelas novas, não compartilhadas com ninguém
+        self._owned = None
+
+    def _unindex(self, doc):
+        """Tira o id `doc` dos postings (as listas por id ficam como estão)"""
+        terms = index_terms(self._norm_keys[doc], self._norm_messages[doc])
+        for table, table_terms in zip(self._tables(), terms):
+            for term in table_terms:
+                postings = table.get(term)
+                if postings is None:
+                    continue
+                position = bisect.bisect_left(postings, doc)
+                if position < len(postings) and postings[position] == doc:
+                    if len(postings) == 1:
+                        del table[term]
+                    else:
+                        del copy_on_write(table, term, self._owned, array.__copy__)[position]
+
+    def _candidates(self, query, table):
+        """Ids que podem conter a consulta como substring (None: todos)"""
+        grams = trigrams(query)
+        if not grams:
+            # Consultas com menos de 3 caracteres não têm trigramas
+            return None
+
+        postings = [table.get(gram) for gram in grams]
+        if not all(postings):
+            return set()
+        postings.sort(key=len)
+        found = set(postings[0])
+        for ids in postings[1:]:
+            found.intersection_update(ids)
+            if not found:
+                break
+        return found
+
+    def search(self, keyword, limit=None, candidates=None):
+        """Retorna as chaves que casam com a consulta, ordenadas por relevância.
+
+        `candidates` restringe a busca a essas chaves (ex.: o resultado
+        completo de um prefixo da consulta, já em cache).
+        """
+        query = normalize_text(keyword.strip())
+        if not query:
+            return []
+
+        names = self._names
+        norm_keys = self._norm_keys
+        norm_messages = self._norm_messages
+        whole_word = self._tokens.get(query) or ()
+
+        if candidates is not None:
+            ids = self._ids
+            candidates = [ids[key] for key in candidates if key in ids]
+        elif limit is not None:
+            # Quem casa na chave ou como palavra inteira sempre pontua mais
+            # que um casamento só por substring na mensagem; se esses já
+            # bastam para o top-k, o resto dos candidatos nem é pontuado.
+            strong = self._candidates(query, self._key_trigrams)
+            if strong is None:
+                strong = {doc for doc in self._ids.values() if query in norm_keys[doc]}
+            else:
+                # Conjunto novo, só desta busca: filtrado no lugar em vez de copiado
+                strong.difference_update([doc for doc in strong if query not in norm_keys[doc]])
+            strong.update(whole_word)
+            if len(strong) >= limit:
+                candidates = strong
+        if candidates is None:
+            candidates = self._candidates(query, self._trigrams)
+            if candidates is None:
+                candidates = self._ids.values()
+        # Conjunto só depois dos candidatos, para não somar ao pico da interseção
+        whole_word = set(whole_word)
+
+        def scored():
+            # Gerador: com `limit`, o top-k guarda só os melhores, não um par por candidato
+            for doc in candidates:
+                score = match_score(norm_keys[doc], norm_messages[doc], query, doc in whole_word)
+                if score:
+                    yield -score, names[doc]
+        return best_keys(scored(), limit)
@@ -0,0 +1,535 @@
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from array import array
+from collections.abc import ItemsView, Mapping, ValuesView
+
+from core import metrics
+from core.file_lock import locked
+from core.file_watcher import FileWatcher, file_signature
+from core.key_index import KeyIndex
+from core.repository import ResponseRepository
+from core.response_model import CategoryIndex, QuickResponse
+from core.response_store import ResponseStore, apply_op
+from core.search_index import best_keys, match_score, normalize_text
+
+MAGIC = b"VCSNAP\x00\x02"
+# magic, versão publicada, quantidade de respostas, quantidade de categorias
+HEADER = struct.Struct("<8sQII")
+# Seções na ordem do arquivo; cada uma é (início, tamanho) na tabela após o cabeçalho
+SECTIONS = (
+    "meta", "key_offsets", "message_offsets", "norm_offsets", "category_ids",
+    "sorted", "page_order", "category_offsets", "keys", "messages", "norm", "category_names",
+)
+SECTION = struct.Struct("<QQ")
+# Separadores do texto de busca: chave\x1fmensagem\x00 (a consulta normalizada não os contém)
+FIELD_SEP = b"\x1f"
+ENTRY_END = b"\x00"
+
+CURRENT_NAME = "respostas.snap"
+SNAPSHOT_PATTERN = re.compile(r"respostas\.(\d+)\.snap$")
+
+
+def write_snapshot(path, responses, version, meta):
+    """Grava o snapshot binário de `responses` em `path` (arquivo novo).
+
+    Layout: cabeçalho, tabela de seções e, em seções alinhadas a 8 bytes,
+    os offsets (uint32) de chaves, mensagens e texto normalizado, a
+    categoria de cada resposta, as permutações das chaves em ordem binária
+    (busca por chave) e alfabética (paginação, a mesma do KeyIndex) e os
+    blobs UTF-8. Nada precisa ser desserializado para ler: quem mapeia
+    o arquivo acessa cada resposta pelos offsets.
+    """
+    categories = {}
+    key_blob, message_blob, norm_blob = bytearray(), bytearray(), bytearray()
+    key_offsets, message_offsets, norm_offsets = [0], [0], [0]
+    category_ids, encoded_keys, page_keys = [], [], []
+    for key, data in responses.items():
+        encoded = key.encode("utf-8")
+        encoded_keys.append(encoded)
+        key_blob += encoded
+        key_offsets.append(len(key_blob))
+        message_blob += data["message"].encode("utf-8")
+        message_offsets.append(len(message_blob))
+        norm_key = normalize_text(key)
+        page_keys.append((norm_key, key))
+        norm_blob += norm_key.encode("utf-8") + FIELD_SEP
+        norm_blob += normalize_text(data["message"]).encode("utf-8") + ENTRY_END
+        norm_offsets.append(len(norm_blob))
+        category_ids.append(categories.setdefault(data["category"], len(categories)))
+
+    category_blob = bytearray()
+    category_offsets = [0]
+    for name in categories:
+        category_blob += name.encode("utf-8")
+        category_offsets.append(len(category_blob))
+    if max(len(key_blob), len(message_blob), len(norm_blob)) >= 2 ** 32:
+        raise ValueError("Snapshot compartilhado limitado a 4 GB por seção")
+
+    order = sorted(range(len(encoded_keys)), key=encoded_keys.__getitem__)
+    page_order = sorted(range(len(page_keys)), key=page_keys.__getitem__)
+    meta = dict(meta, byteorder=sys.byteorder)
+    payloads = {
+        "meta": json.dumps(meta).encode("utf-8"),
+        "key_offsets": array("I", key_offsets).tobytes(),
+        "message_offsets": array("I", message_offsets).tobytes(),
+        "norm_offsets": array("I", norm_offsets).tobytes(),
+        "category_ids": array("I", category_ids).tobytes(),
+        "sorted": array("I", order).tobytes(),
+        "page_order": array("I", page_order).tobytes(),
+        "category_offsets": array("I", category_offsets).tobytes(),
+        "keys": key_blob,
+        "messages": message_blob,
+        "norm": norm_blob,
+        "category_names": category_blob,
+    }
+
+    position = HEADER.size + SECTION.size * len(SECTIONS)
+    table = []
+    for name in SECTIONS:
+        position += -position % 8
+        table.append((position, len(payloads[name])))
+        position += len(payloads[name])
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, version, len(encoded_keys), len(categories)))
+        for start, size in table:
+            f.write(SECTION.pack(start, size))
+        for name, (start, _) in zip(SECTIONS, table):
+            f.write(b"\x00" * (start - f.tell()))
+            f.write(payloads[name])
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class MappedSnapshot:
+    """Snapshot binário mapeado em memória (somente leitura).
+
+    As páginas do arquivo ficam no page cache do sistema e são as mesmas
+    para todos os processos que o mapeiam: N workers custam uma cópia.
+    Os offsets são lidos direto do mapa via memoryview, sem cópia; só a
+    lista de categorias (poucas) é decodificada.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.version, self.count, category_count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: não é um snapshot compartilhado")
+        self._sections = {}
+        for i, name in enumerate(SECTIONS):
+            self._sections[name] = SECTION.unpack_from(self._mmap, HEADER.size + i * SECTION.size)
+
+        self.meta = json.loads(self._bytes("meta"))
+        if self.meta.get("byteorder") != sys.byteorder:
+            raise ValueError(f"{path}: gravado em outra ordem de bytes")
+        view = memoryview(self._mmap)
+        self._key_offsets = self._array(view, "key_offsets")
+        self._message_offsets = self._array(view, "message_offsets")
+        self.norm_offsets = self._array(view, "norm_offsets")
+        self._category_ids = self._array(view, "category_ids")
+        self._sorted = self._array(view, "sorted")
+        self._page_order = self._array(view, "page_order")
+        self._keys_start = self._sections["keys"][0]
+        self._messages_start = self._sections["messages"][0]
+        self.norm_start, self.norm_size = self._sections["norm"]
+
+        names = self._bytes("category_names")
+        offsets = self._array(view, "category_offsets")
+        self.categories = [
+            sys.intern(names[offsets[i]:offsets[i + 1]].decode("utf-8")) for i in range(category_count)
+        ]
+
+    def _bytes(self, name):
+        start, size = self._sections[name]
+        return self._mmap[start:start + size]
+
+    def _array(self, view, name):
+        start, size = self._sections[name]
+        return view[start:start + size].cast("I")
+
+    def key_bytes_at(self, index):
+        start = self._keys_start
+        return self._mmap[start + self._key_offsets[index]:start + self._key_offsets[index + 1]]
+
+    def key_at(self, index):
+        return self.key_bytes_at(index).decode("utf-8")
+
+    def message_at(self, index):
+        start = self._messages_start
+        offsets = self._message_offsets
+        return self._mmap[start + offsets[index]:start + offsets[index + 1]].decode("utf-8")
+
+    def category_at(self, index):
+        return self.categories[self._category_ids[index]]
+
+    def entry_at(self, index):
+        return QuickResponse(self.message_at(index), self.category_at(index))
+
+    def norm_at(self, index):
+        """(chave normalizada, mensagem normalizada) da resposta, em UTF-8"""
+        start = self.norm_start
+        text = self._mmap[start + self.norm_offsets[index]:start + self.norm_offsets[index + 1] - 1]
+        norm_key, _, norm_message = text.partition(FIELD_SEP)
+        return norm_key, norm_message
+
+    def index_of(self, key):
+        """Posição da resposta `key` (busca binária nas chaves ordenadas), ou None"""
+        target = key.encode("utf-8")
+        mm, start, offsets, order = self._mmap, self._keys_start, self._key_offsets, self._sorted
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            index = order[middle]
+            current = mm[start + offsets[index]:start + offsets[index + 1]]
+            if current < target:
+                low = middle + 1
+            elif current > target:
+                high = middle
+            else:
+                return index
+        return None
+
+    def page(self, after=None, limit=100):
+        """Até `limit` chaves depois do cursor `after`, na ordem de KeyIndex.page"""
+        order = self._page_order
+        start = 0
+        if after is not None:
+            # Em UTF-8 a ordem dos bytes é a dos code points: comparar
+            # (normalizada, chave) em bytes dá a mesma ordem das strings
+            target = (normalize_text(after).encode("utf-8"), after.encode("utf-8"))
+            low, high = 0, self.count
+            while low < high:
+                middle = (low + high) // 2
+                index = order[middle]
+                if target < (self.norm_at(index)[0], self.key_bytes_at(index)):
+                    high = middle
+                else:
+                    low = middle + 1
+            start = low
+        return [self.key_at(index) for index in order[start:start + limit]]
+
+    def find(self, needle, position):
+        """Próxima ocorrência de `needle` no texto de busca a partir de `position`; -1 se não há"""
+        hit = self._mmap.find(needle, self.norm_start + position, self.norm_start + self.norm_size)
+        return hit - self.norm_start if hit >= 0 else -1
+
+
+class _Items(ItemsView):
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class _Values(ValuesView):
+    def __iter__(self):
+        for _, data in self._mapping.iter_items():
+            yield data
+
+
+class SharedResponseMapping(Mapping):
+    """Visão somente-leitura de um MappedSnapshot, com a mesma cara do dict"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+
+    def __getitem__(self, key):
+        index = self.snapshot.index_of(key)
+        if index is None:
+            raise KeyError(key)
+        return self.snapshot.entry_at(index)
+
+    def __contains__(self, key):
+        return self.snapshot.index_of(key) is not None
+
+    def __iter__(self):
+        key_at = self.snapshot.key_at
+        for index in range(self.snapshot.count):
+            yield key_at(index)
+
+    def __len__(self):
+        return self.snapshot.count
+
+    def iter_items(self):
+        snapshot = self.snapshot
+        for index in range(snapshot.count):
+            yield snapshot.key_at(index), snapshot.entry_at(index)
+
+    def items(self):
+        return _Items(self)
+
+    def values(self):
+        return _Values(self)
+
+
+class SharedResponseRepository(ResponseRepository):
+    """Respostas num snapshot binário mapeado por todos os workers web.
+
+    A fonte continua sendo `respostas_rapidas.json` + WAL (ResponseStore);
+    o snapshot `respostas.<versão>.snap` é derivado dela e publicado de
+    forma atômica: o arquivo novo é gravado inteiro e só então o ponteiro
+    `respostas.snap` passa a apontar para ele (rename). Cada processo mapeia
+    a versão atual e, em `poll` (a cada requisição), troca para a mais nova
+    se o ponteiro mudou; quem ainda lê a versão antiga segue com o mapa
+    dela até soltar a referência.
+
+    Nenhum processo guarda as respostas nem um índice em memória: busca é
+    uma varredura (`mmap.find`, em C) do texto normalizado compartilhado.
+    Quem grava (`put`) ou percebe que a fonte mudou (edição manual, CLI no
+    backend json) republica o snapshot, sob um flock.
+    """
+
+    name = "shared"
+
+    def __init__(self, data_dir, defaults=dict):
+        self.data_dir = data_dir
+        self.store = ResponseStore(data_dir)
+        self.defaults = defaults
+        self.current_path = os.path.join(data_dir, CURRENT_NAME)
+        self.lock_path = os.path.join(data_dir, "respostas.snap.lock")
+        self._load_lock = threading.Lock()
+        self._snapshot = None
+        self._responses = None
+        self._key_index = None
+        self._category_index = None
+        self._current_watcher = FileWatcher(self.current_path)
+        self._source_watchers = (FileWatcher(self.store.snapshot_path), FileWatcher(self.store.wal_path))
+
+    def _locked(self):
+        return locked(self.lock_path)
+
+    # ----------------------------------------------------------- leitura
+
+    def _ensure_loaded(self):
+        if self._responses is None:
+            with self._load_lock:
+                if self._responses is None:
+                    self.load()
+
+    def preload(self):
+        self._ensure_loaded()
+
+    @property
+    def responses(self):
+        self._ensure_loaded()
+        return self._responses
+
+    @property
+    def snapshot(self):
+        self._ensure_loaded()
+        return self._snapshot
+
+    @property
+    def key_index(self):
+        # Só o prompt da CLI paga pelas chaves em memória; a paginação da
+        # web (`page_keys`) lê a ordem gravada no snapshot
+        if self._key_index is None:
+            self._key_index = KeyIndex(self.responses)
+        return self._key_index
+
+    @property
+    def category_index(self):
+        # Montado a partir da coluna de categorias, sem decodificar mensagens
+        index = self._category_index
+        if index is None:
+            snapshot = self.snapshot
+            index = CategoryIndex()
+            for position in range(snapshot.count):
+                index.add(snapshot.key_at(position), snapshot.category_at(position))
+            self._category_index = index
+        return index
+
+    def _source_state(self):
+        """Assinatura da fonte (JSON + WAL) que um snapshot publicado deve refletir"""
+        json_signature = file_signature(self.store.snapshot_path)
+        wal_signature = file_signature(self.store.wal_path)
+        return [
+            list(json_signature) if json_signature else None,
+            wal_signature[1] if wal_signature else 0,
+        ]
+
+    def _open_current(self):
+        """Snapshot para o qual o ponteiro aponta, ou None se não há/inválido"""
+        try:
+            with open(self.current_path, "r", encoding="utf-8") as f:
+                name = f.read().strip()
+            return MappedSnapshot(os.path.join(self.data_dir, name))
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def _switch(self, snapshot):
+        # Índices primeiro: quem vê `_responses` novo não pega os da versão velha
+        self._key_index = None
+        self._category_index = None
+        self._snapshot = snapshot
+        self._responses = SharedResponseMapping(snapshot)
+
+    @metrics.timed("load_responses")
+    def load(self):
+        snapshot = self._open_current()
+        if snapshot is None or snapshot.meta.get("source") != self._source_state():
+            snapshot = self.publish()
+        else:
+            self._current_watcher.mark_seen()
+            for watcher in self._source_watchers:
+                watcher.mark_seen()
+        self._switch(snapshot)
+        return self._responses
+
+    def poll(self):
+        """Troca para a versão publicada por outro processo, ou republica se a fonte mudou"""
+        if self._responses is None:
+            return False
+        source_changed = any([watcher.changed() for watcher in self._source_watchers])
+        if self._current_watcher.changed():
+            snapshot = self._open_current()
+            if snapshot is None:
+                # Versão apagada entre ler o ponteiro e abrir: tenta de novo
+                self._current_watcher.reset()
+            elif snapshot.version != self._snapshot.version:
+                self._switch(snapshot)
+                self._report_unknown()
+                return True
+        if source_changed and self._snapshot.meta.get("source") != self._source_state():
+            self._switch(self.publish())
+            self._report_unknown()
+            return True
+        return False
+
+    # ----------------------------------------------------------- escrita
+
+    @metrics.timed("publish_snapshot")
+    def publish(self):
+        """Grava e publica um snapshot com o estado atual da fonte; retorna o mapa novo"""
+        with self._locked():
+            latest = self._open_current()
+            if latest is not None and latest.meta.get("source") == self._source_state():
+                # Outro processo publicou enquanto esperávamos o lock
+                self._current_watcher.mark_seen()
+                return latest
+
+            state = {}
+
+            def read_base():
+                # Sob o lock do ResponseStore: fonte e assinatura consistentes.
+                # Com o mesmo JSON, a versão anterior + o WAL inteiro (operações
+                # idempotentes) dá o mesmo resultado que reparsear o JSON.
+                state["source"] = self._source_state()
+                base = latest.meta["source"][0] if latest is not None else None
+                if base is not None and base == state["source"][0]:
+                    return dict(SharedResponseMapping(latest).items())
+                return self.store.read_snapshot()
+
+            if self.store.exists():
+                responses, ops = self.store.read(read_base)
+                for op in ops:
+                    apply_op(responses, op)
+            else:
+                responses = self.defaults()
+                state["source"] = self._source_state()
+
+            version = (latest.version if latest is not None else 0) + 1
+            name = f"respostas.{version}.snap"
+            path = os.path.join(self.data_dir, name)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            write_snapshot(tmp_path, responses, version, {"source": state["source"]})
+            os.replace(tmp_path, path)
+            pointer_tmp = f"{self.current_path}.{os.getpid()}.tmp"
+            with open(pointer_tmp, "w", encoding="utf-8") as f:
+                f.write(name)
+            os.replace(pointer_tmp, self.current_path)
+            self._current_watcher.mark_seen()
+            for watcher in self._source_watchers:
+                watcher.mark_seen()
+            self._remove_old(version)
+            return MappedSnapshot(path)
+
+    def _remove_old(self, version):
+        """Apaga versões antigas (leitores que ainda as mapeiam não são afetados no POSIX)"""
+        for name in os.listdir(self.data_dir):
+            match = SNAPSHOT_PATTERN.match(name)
+            if match and int(match.group(1)) < version:
+                try:
+                    os.remove(os.path.join(self.data_dir, name))
+                except OSError:
+                    # Windows não apaga arquivo mapeado: fica para a próxima publicação
+                    pass
+
+    def save(self):
+        self._ensure_loaded()
+        self.store.write_snapshot(dict(self._responses.items()))
+        self._switch(self.publish())
+
+    def put(self, key, message, category):
+        return self.put_many([(key, message, category)]) > 0
+
+    def put_many(self, rows):
+        """Um append no WAL e uma publicação para o lote inteiro"""
+        ops = [
+            {"op": "put", "key": key, "message": message, "category": category}
+            for key, message, category in rows
+        ]
+        if not ops:
+            return 0
+        self._ensure_loaded()
+        if not self.store.exists():
+            # Primeira gravação: materializa as respostas padrão no JSON
+            self.store.write_snapshot(dict(self._responses.items()))
+        before = self._present(dict.fromkeys(op["key"] for op in ops))
+        self.store.append(ops)
+        self._switch(self.publish())
+        self._report(before)
+        return len(ops)
+
+    # ----------------------------------------------------------- consultas
+
+    def search(self, keyword, limit=None, candidates=None):
+        query = normalize_text(keyword.strip())
+        if not query:
+            return []
+        snapshot = self.snapshot
+        needle = query.encode("utf-8")
+        word = re.compile(r"(?<!\w)" + re.escape(query) + r"(?!\w)")
+        # Em texto ASCII (o caso comum depois da normalização) \w é [0-9A-Za-z_]
+        ascii_word = re.compile(rb"(?<![0-9A-Za-z_])" + re.escape(needle) + rb"(?![0-9A-Za-z_])")
+
+        if candidates is not None:
+            indexes = (snapshot.index_of(key) for key in candidates)
+            indexes = [index for index in indexes if index is not None]
+        else:
+            # Cada ocorrência no texto compartilhado aponta uma resposta;
+            # depois dela, pula para a próxima resposta
+            indexes = []
+            offsets = snapshot.norm_offsets
+            position = snapshot.find(needle, 0)
+            while position >= 0:
+                index = bisect.bisect_right(offsets, position) - 1
+                indexes.append(index)
+                position = snapshot.find(needle, offsets[index + 1])
+
+        # Pontua direto nos bytes do mapa: em UTF-8, igualdade, prefixo,
+        # substring e ordem das chaves são as mesmas do texto decodificado,
+        # e em texto ASCII a posição em bytes é a posição em caracteres.
+        # Só mensagens com outros caracteres são decodificadas.
+        scored = []
+        for index in indexes:
+            norm_key, norm_message = snapshot.norm_at(index)
+            if norm_message.isascii():
+                score = match_score(norm_key, norm_message, needle, ascii_word.search(norm_message) is not None)
+            else:
+                norm_key, norm_message = norm_key.decode("utf-8"), norm_message.decode("utf-8")
+                score = match_score(norm_key, norm_message, query, word.search(norm_message) is not None)
+            if score:
+                scored.append((-score, snapshot.key_bytes_at(index)))
+        return [key.decode("utf-8") for key in best_keys(scored, limit)]
+
+    def page_keys(self, after=None, limit=100):
+        return self.snapshot.page(after, limit)
+
+    def categories(self):
+        return sorted(self.snapshot.categories)
@@ -0,0 +1,80 @@
+import gc
+import os
+import pickle
+
+from core.file_watcher import file_signature
+
+# Mude ao alterar o formato do que é guardado (ex.: estrutura do SearchIndex)
+CACHE_FORMAT = 6
+# ASSISTENTE_SNAPSHOT_CACHE=0 desliga o cache
+ENABLED = os.environ.get("ASSISTENTE_SNAPSHOT_CACHE", "1") != "0"
+
+
+class SnapshotCache:
+    """Versão pré-processada (pickle) de um arquivo-fonte.
+
+    Guarda o resultado de `build()` junto com a assinatura (inode, tamanho,
+    mtime) da fonte; enquanto ela não muda, `load` só desserializa o pickle,
+    sem parsear JSON nem reconstruir índices. Um cache ausente, antigo ou
+    ilegível é simplesmente refeito. O arquivo fica na pasta de dados e só
+    deve ser gravável pelo próprio usuário, como os demais.
+    """
+
+    def __init__(self, source_path, cache_path=None, enabled=ENABLED):
+        self.source_path = source_path
+        self.cache_path = cache_path or source_path + ".cache"
+        self.enabled = enabled
+
+    def load(self, build):
+        """Valor em cache se a fonte não mudou; senão `build()` (e grava o cache)"""
+        if not self.enabled:
+            return build()
+        # Assinatura lida antes da fonte: se ela mudar durante o build, o
+        # cache fica com a assinatura velha e é refeito na próxima carga
+        signature = file_signature(self.source_path)
+        value = self._read(signature)
+        if value is not None:
+            return value
+        value = build()
+        if signature is not None:
+            self._write(signature, value)
+        return value
+
+    def _read(self, signature):
+        # Desserializar cria milhões de containers (conjuntos do índice); sem
+        # pausar o GC, as coletas disparadas no meio quase dobram o tempo
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(self.cache_path, 'rb') as f:
+                fmt, cached_signature, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Truncado, de outra versão do código, etc.
+            return None
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if fmt != CACHE_FORMAT or tuple(cached_signature) != signature:
+            return None
+        return value
+
+    def _write(self, signature, value):
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((CACHE_FORMAT, signature, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # Cache é opcional: pasta somente-leitura, disco cheio...
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def clear(self):
+        try:
+            os.remove(self.cache_path)
+        except FileNotFoundError:
+            pass
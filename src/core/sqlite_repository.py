@@ -0,0 +1,294 @@
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import ItemsView, Mapping, ValuesView
+
+from core import metrics
+from core.key_index import KeyIndex
+from core.repository import ResponseRepository
+from core.response_model import CategoryIndex, QuickResponse
+from core.response_store import ResponseStore
+from core.search_index import best_keys, match_score, normalize_text
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    message TEXT NOT NULL,
+    category TEXT NOT NULL,
+    key_norm TEXT NOT NULL,
+    message_norm TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_category ON responses(category);
+
+-- Texto normalizado (sem acentos) com tokenizer trigram: MATCH vira busca por substring
+CREATE VIRTUAL TABLE IF NOT EXISTS responses_fts USING fts5(
+    key_norm, message_norm, content='responses', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS responses_ai AFTER INSERT ON responses BEGIN
+    INSERT INTO responses_fts(rowid, key_norm, message_norm)
+    VALUES (new.rowid, new.key_norm, new.message_norm);
+END;
+CREATE TRIGGER IF NOT EXISTS responses_ad AFTER DELETE ON responses BEGIN
+    INSERT INTO responses_fts(responses_fts, rowid, key_norm, message_norm)
+    VALUES ('delete', old.rowid, old.key_norm, old.message_norm);
+END;
+CREATE TRIGGER IF NOT EXISTS responses_au AFTER UPDATE ON responses BEGIN
+    INSERT INTO responses_fts(responses_fts, rowid, key_norm, message_norm)
+    VALUES ('delete', old.rowid, old.key_norm, old.message_norm);
+    INSERT INTO responses_fts(rowid, key_norm, message_norm)
+    VALUES (new.rowid, new.key_norm, new.message_norm);
+END;
+
+-- Versão incrementada a cada escrita, para outros processos detectarem mudanças
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta(name, value) VALUES ('version', 0);
+"""
+
+UPSERT = """
+INSERT INTO responses(key, message, category, key_norm, message_norm) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(key) DO UPDATE SET
+    message = excluded.message, category = excluded.category,
+    key_norm = excluded.key_norm, message_norm = excluded.message_norm
+"""
+
+POLL_INTERVAL = 1.0
+
+
+def _row(key, message, category):
+    return (key, message, category, normalize_text(key), normalize_text(message))
+
+
+class _Items(ItemsView):
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class _Values(ValuesView):
+    def __iter__(self):
+        for _, data in self._mapping.iter_items():
+            yield data
+
+
+class SqliteResponseMapping(Mapping):
+    """Visão somente-leitura das respostas no banco, com a mesma cara do dict"""
+
+    def __init__(self, repository):
+        self._repository = repository
+
+    def __getitem__(self, key):
+        row = self._repository.connection().execute(
+            "SELECT message, category FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return QuickResponse(row[0], row[1])
+
+    def __contains__(self, key):
+        return self._repository.connection().execute(
+            "SELECT 1 FROM responses WHERE key = ?", (key,)
+        ).fetchone() is not None
+
+    def __iter__(self):
+        for (key,) in self._repository.connection().execute("SELECT key FROM responses ORDER BY rowid"):
+            yield key
+
+    def __len__(self):
+        return self._repository.connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def iter_items(self):
+        cursor = self._repository.connection().execute(
+            "SELECT key, message, category FROM responses ORDER BY rowid"
+        )
+        for key, message, category in cursor:
+            yield key, QuickResponse(message, category)
+
+    def items(self):
+        return _Items(self)
+
+    def values(self):
+        return _Values(self)
+
+
+class SqliteResponseRepository(ResponseRepository):
+    """Respostas num banco SQLite compartilhável entre CLI e processos web.
+
+    Modo WAL (leitores não bloqueiam o escritor), busca via FTS5 com
+    tokenizer trigram sobre o texto normalizado e índice por categoria.
+    Nada é carregado inteiro em memória: `responses` consulta o banco.
+    Cada thread usa a própria conexão.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path, defaults=dict):
+        self.path = path
+        self._local = threading.local()
+        self._responses = SqliteResponseMapping(self)
+        self._version = None
+        self._next_poll = 0.0
+        self._key_index = None
+        self._category_index = None
+
+        conn = self.connection()
+        with conn:
+            conn.executescript(SCHEMA)
+        if not conn.execute("SELECT 1 FROM responses LIMIT 1").fetchone():
+            self.put_many(
+                (key, data["message"], data["category"]) for key, data in defaults().items()
+            )
+        self._version = self._read_version()
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _read_version(self):
+        return self.connection().execute("SELECT value FROM meta WHERE name = 'version'").fetchone()[0]
+
+    @property
+    def responses(self):
+        return self._responses
+
+    @property
+    def key_index(self):
+        # Só as chaves ficam em memória, montadas no primeiro uso
+        if self._key_index is None:
+            rows = self.connection().execute("SELECT key FROM responses")
+            self._key_index = KeyIndex(key for (key,) in rows)
+        return self._key_index
+
+    @property
+    def category_index(self):
+        if self._category_index is None:
+            rows = self.connection().execute("SELECT key, category FROM responses ORDER BY rowid")
+            index = CategoryIndex()
+            for key, category in rows:
+                index.add(key, category)
+            self._category_index = index
+        return self._category_index
+
+    @metrics.timed("load_responses")
+    def load(self):
+        self._version = self._read_version()
+        self._key_index = None
+        self._category_index = None
+        return self._responses
+
+    def save(self):
+        # Cada escrita já é uma transação confirmada
+        pass
+
+    def put(self, key, message, category):
+        return self.put_many([(key, message, category)]) > 0
+
+    def put_many(self, rows):
+        """Inclui/substitui várias respostas numa única transação"""
+        rows = [_row(*row) for row in rows]
+        before = self._present(dict.fromkeys(row[0] for row in rows))
+        conn = self.connection()
+        with conn:
+            cursor = conn.executemany(UPSERT, rows)
+            count = cursor.rowcount
+            conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'version'")
+            version = self._read_version()
+        if self._version is not None and version == self._version + 1:
+            for row in rows:
+                if self._key_index is not None:
+                    self._key_index.add(row[0])
+                if self._category_index is not None:
+                    self._category_index.add(row[0], row[2])
+        else:
+            # Outro processo também gravou: remonta no próximo uso
+            self._key_index = None
+            self._category_index = None
+        self._version = version
+        self._report(before)
+        return count
+
+    def poll(self):
+        now = time.monotonic()
+        if now < self._next_poll:
+            return False
+        self._next_poll = now + POLL_INTERVAL
+        version = self._read_version()
+        if version == self._version:
+            return False
+        self._version = version
+        self._key_index = None
+        self._category_index = None
+        self._report_unknown()
+        return True
+
+    def search(self, keyword, limit=None, candidates=None):
+        query = normalize_text(keyword.strip())
+        if not query:
+            return []
+
+        conn = self.connection()
+        if candidates is not None:
+            rows = self._rows_for_keys(list(candidates))
+        elif len(query) >= 3:
+            phrase = '"' + query.replace('"', '""') + '"'
+            rows = conn.execute(
+                "SELECT r.key, r.key_norm, r.message_norm FROM responses_fts "
+                "JOIN responses r ON r.rowid = responses_fts.rowid "
+                "WHERE responses_fts MATCH ?",
+                (phrase,),
+            )
+        else:
+            # Trigramas não cobrem consultas de 1-2 caracteres
+            rows = conn.execute(
+                "SELECT key, key_norm, message_norm FROM responses "
+                "WHERE instr(key_norm, ?) > 0 OR instr(message_norm, ?) > 0",
+                (query, query),
+            )
+
+        word = re.compile(r"(?<!\w)" + re.escape(query) + r"(?!\w)")
+        scored = []
+        for key, norm_key, norm_message in rows:
+            score = match_score(norm_key, norm_message, query, word.search(norm_message) is not None)
+            if score:
+                scored.append((-score, key))
+        return best_keys(scored, limit)
+
+    def _rows_for_keys(self, keys):
+        conn = self.connection()
+        # Em blocos, abaixo do limite de parâmetros do SQLite
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            yield from conn.execute(
+                f"SELECT key, key_norm, message_norm FROM responses WHERE key IN ({placeholders})",
+                chunk,
+            )
+
+    def categories(self):
+        rows = self.connection().execute("SELECT DISTINCT category FROM responses ORDER BY category")
+        return [category for (category,) in rows]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def migrate_json_to_sqlite(data_dir, db_path):
+    """Copia respostas_rapidas.json (+ WAL) para o banco SQLite; retorna quantas"""
+    store = ResponseStore(data_dir)
+    if not store.exists():
+        return 0
+    responses = store.load()
+    repository = SqliteResponseRepository(db_path)
+    try:
+        return repository.put_many(
+            (key, data["message"], data["category"]) for key, data in responses.items()
+        )
+    finally:
+        repository.close()
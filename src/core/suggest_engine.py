@@ -0,0 +1,215 @@
+import re
+
+import numpy as np
+
+from core.search_index import normalize_text
+
+# Parâmetros usuais do BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Peso de cada campo na frequência do termo (chave e categoria descrevem o assunto)
+FIELD_WEIGHTS = {"message": 1.0, "key": 2.0, "category": 1.5}
+
+# Só respostas com ao menos esta fração do melhor score disputam o top-k
+TOP_K_RATIO = 0.5
+
+# Células (mensagens x respostas) por lote: a matriz densa cabe no cache
+MAX_BATCH_CELLS = 200_000
+# Pares (resposta, termo) abaixo de 1/SPARSE_FACTOR das células: soma esparsa
+SPARSE_FACTOR = 8
+
+STEM_CACHE_SIZE = 100_000
+
+# Sem "_", para "problema_rede" virar "problema" e "rede"
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Palavras sem conteúdo, já sem acento (a normalização remove os acentos antes)
+STOPWORDS = frozenset("""
+a ao aos aquela aquelas aquele aqueles aquilo as ate com como da das de dela delas dele deles
+depois do dos e ela elas ele eles em entre era eram essa essas esse esses esta estas este estes
+eu foi fomos for foram ha isso isto ja la lhe lhes mais mas me mesmo meu meus minha minhas muito
+na nao nas nem no nos nossa nossas nosso nossos num numa o os ou para pela pelas pelo pelos por
+qual quando que quem se sem seu seus so sua suas tambem te tem tenho ter teu tua tu um uma uns
+umas voce voces vos esta estou estamos sao ser sou pois entao aqui ai
+""".split())
+
+# Plural -> singular (o mais longo primeiro): "conexoes" -> "conexao", "senhas" -> "senha"
+_PLURAL_SUFFIXES = (
+    ("coes", "cao"), ("soes", "sao"), ("oes", "ao"), ("aes", "ao"), ("ais", "al"),
+    ("eis", "el"), ("ois", "ol"), ("ns", "m"), ("res", "r"), ("zes", "z"),
+)
+
+
+def stem(word):
+    """Redução leve para português: só plural -> singular"""
+    if len(word) <= 3:
+        return word
+    for suffix, replacement in _PLURAL_SUFFIXES:
+        if word.endswith(suffix):
+            return word[:-len(suffix)] + replacement
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+class Analyzer:
+    """Texto -> termos: minúsculas, sem acento, sem stopwords, singular"""
+
+    def __init__(self):
+        self._stems = {}
+
+    def terms(self, text):
+        result = []
+        stems = self._stems
+        for word in _WORD_RE.findall(normalize_text(text)):
+            if word in STOPWORDS:
+                continue
+            term = stems.get(word)
+            if term is None:
+                if len(stems) > STEM_CACHE_SIZE:
+                    stems.clear()
+                term = stems[word] = stem(word)
+            result.append(term)
+        return result
+
+
+class SuggestEngine:
+    """Sugere respostas rápidas para a mensagem de um cliente (BM25).
+
+    A matriz termo x resposta é montada uma vez, já com o peso BM25 de
+    cada par, e guardada como colunas comprimidas (CSC) em arrays NumPy:
+    para o termo t, `_docs[_indptr[t]:_indptr[t + 1]]` são as respostas
+    que o contêm e `_weights` os pesos. Pontuar uma mensagem é juntar as
+    fatias dos seus termos e somar com um único `np.bincount`; um lote de
+    mensagens vira uma matriz de scores calculada do mesmo jeito.
+
+    O índice é imutável: quando as respostas mudam, monta-se outro.
+    """
+
+    def __init__(self, responses, analyzer=None):
+        self.analyzer = analyzer or Analyzer()
+        self.keys = []
+        vocabulary = {}
+        doc_ids, term_ids, frequencies = [], [], []
+        lengths = []
+
+        for doc, (key, data) in enumerate(responses.items()):
+            self.keys.append(key)
+            weighted = {}
+            for field, text in (("message", data["message"]), ("key", key), ("category", data["category"])):
+                weight = FIELD_WEIGHTS[field]
+                for term in self.analyzer.terms(text):
+                    weighted[term] = weighted.get(term, 0.0) + weight
+            lengths.append(sum(weighted.values()))
+            for term, frequency in weighted.items():
+                term_id = vocabulary.get(term)
+                if term_id is None:
+                    term_id = vocabulary[term] = len(vocabulary)
+                doc_ids.append(doc)
+                term_ids.append(term_id)
+                frequencies.append(frequency)
+
+        self.vocabulary = vocabulary
+        n_docs = len(self.keys)
+        docs = np.array(doc_ids, dtype=np.int32)
+        terms = np.array(term_ids, dtype=np.int32)
+        tf = np.array(frequencies, dtype=np.float32)
+        doc_length = np.array(lengths, dtype=np.float32)
+
+        df = np.bincount(terms, minlength=len(vocabulary)).astype(np.float32)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        average = float(doc_length.mean()) if n_docs else 1.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_length[docs] / max(average, 1e-9))
+        weights = idf[terms] * tf * (BM25_K1 + 1) / (tf + norm)
+
+        # Ordena por termo para cada coluna virar uma fatia contígua
+        order = np.argsort(terms, kind="stable")
+        self._docs = docs[order]
+        self._weights = weights[order].astype(np.float32)
+        self._indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(df.astype(np.int64), out=self._indptr[1:])
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _postings(self, text):
+        """(docs, pesos) de todos os termos conhecidos da mensagem, concatenados"""
+        counts = {}
+        for term in self.analyzer.terms(text):
+            term_id = self.vocabulary.get(term)
+            if term_id is not None:
+                counts[term_id] = counts.get(term_id, 0) + 1
+        if not counts:
+            return None, None
+        ranges = [(self._indptr[t], self._indptr[t + 1], c) for t, c in counts.items()]
+        index = np.concatenate([np.arange(start, end) for start, end, _ in ranges])
+        repeat = np.repeat(
+            np.array([c for _, _, c in ranges], dtype=np.float32),
+            [end - start for start, end, _ in ranges],
+        )
+        return self._docs[index], self._weights[index] * repeat
+
+    def _rank(self, flat_docs, weights, n_rows, limit):
+        """Top-k por linha a partir de pares (linha * n + resposta, peso).
+
+        Com poucos pares (termos raros) soma só as respostas tocadas, via
+        np.unique; com muitos, monta a matriz densa de scores com
+        np.bincount e descarta de cara quem fica abaixo de TOP_K_RATIO do
+        melhor da linha. O corte é exato quando sobram ao menos `limit`
+        candidatos na linha (ninguém abaixo dele entraria no top-k); senão
+        a linha usa todos os positivos.
+        """
+        n_docs = len(self.keys)
+        if len(flat_docs) * SPARSE_FACTOR < n_rows * n_docs:
+            ids, inverse = np.unique(flat_docs, return_inverse=True)
+            values = np.bincount(inverse, weights=weights)
+        else:
+            scores = np.bincount(flat_docs, weights=weights, minlength=n_rows * n_docs)
+            matrix = scores.reshape(n_rows, n_docs)
+            mask = matrix >= matrix.max(axis=1, keepdims=True) * TOP_K_RATIO
+            short = np.count_nonzero(mask, axis=1) < limit
+            if short.any():
+                mask[short] = matrix[short] > 0
+            ids = np.flatnonzero(mask)
+            values = scores[ids]
+            positive = values > 0
+            ids, values = ids[positive], values[positive]
+
+        rows, docs = np.divmod(ids, n_docs)
+        # Linha crescente, score decrescente, resposta crescente (desempate estável)
+        order = np.lexsort((docs, -values, rows))
+        rows, docs, values = rows[order], docs[order], values[order]
+        starts = np.searchsorted(rows, np.arange(n_rows))
+        keep = np.arange(len(rows)) - starts[rows] < limit
+
+        results = [[] for _ in range(n_rows)]
+        keys = self.keys
+        for row, doc, value in zip(rows[keep].tolist(), docs[keep].tolist(), values[keep].tolist()):
+            results[row].append((keys[doc], value))
+        return results
+
+    def suggest(self, message, limit=5):
+        """[(key, score)] das respostas mais relevantes para a mensagem"""
+        return self.suggest_many([message], limit=limit)[0]
+
+    def suggest_many(self, messages, limit=5):
+        """Uma lista de sugestões por mensagem, pontuando o lote de uma vez"""
+        results = []
+        n_docs = max(len(self.keys), 1)
+        chunk = max(1, MAX_BATCH_CELLS // n_docs)
+        for start in range(0, len(messages), chunk):
+            batch = messages[start:start + chunk]
+            flat_docs, flat_weights = [], []
+            for row, message in enumerate(batch):
+                docs, weights = self._postings(message)
+                if docs is not None:
+                    flat_docs.append(docs.astype(np.int64) + row * n_docs)
+                    flat_weights.append(weights)
+            if not flat_docs:
+                results.extend([] for _ in batch)
+                continue
+            results.extend(self._rank(
+                np.concatenate(flat_docs), np.concatenate(flat_weights), len(batch), limit
+            ))
+        return results
@@ -1,8 +1,96 @@
-import pyperclip
+import json
+import os
+import threading
+from operator import itemgetter
+from string import Formatter
+
+from core import clipboard, metrics
+from core.file_watcher import FileWatcher
+
+
+class CompiledTemplate:
+    """Template já analisado: trechos literais + lista de campos.
+
+    Templates só com campos simples ({nome}) viram uma string no formato
+    "%s" e são preenchidos com um único `%`, sem reanalisar o texto a cada
+    uso. Templates com especificação de formato, conversão ou acesso a
+    atributo/índice ({valor:.2f}, {!r}, {a.b}) usam `str.format_map`.
+    """
+
+    __slots__ = ("source", "fields", "_pattern", "_getter", "_single")
+
+    def __init__(self, source):
+        self.source = source
+        fields = []
+        occurrences = []
+        pieces = []
+        simple = True
+        for literal, field, spec, conversion in Formatter().parse(source):
+            pieces.append(literal.replace("%", "%%"))
+            if field is None:
+                continue
+            if spec or conversion or not field.isidentifier():
+                simple = False
+                # Nome base do campo: "a.b" -> "a", "a[0]" -> "a"
+                field = field.split(".", 1)[0].split("[", 1)[0]
+            if field not in fields:
+                fields.append(field)
+            occurrences.append(field)
+            pieces.append("%s")
+
+        self.fields = tuple(fields)
+        self._pattern = "".join(pieces) if simple else None
+        self._getter = itemgetter(*occurrences) if simple and occurrences else None
+        self._single = len(occurrences) == 1
+
+    def render(self, values):
+        """Preenche com um dict de valores (KeyError se faltar campo)"""
+        if self._pattern is None:
+            return self.source.format_map(values)
+        if self._getter is None:
+            return self._pattern % ()
+        if self._single:
+            return self._pattern % (self._getter(values),)
+        return self._pattern % self._getter(values)
+
+    def render_many(self, rows):
+        """Preenche o mesmo template para vários conjuntos de valores"""
+        pattern, getter = self._pattern, self._getter
+        if pattern is None:
+            source = self.source
+            return [source.format_map(values) for values in rows]
+        if getter is None:
+            text = self.render({})
+            return [text for _ in rows]
+        if self._single:
+            return [pattern % (getter(values),) for values in rows]
+        return [pattern % getter(values) for values in rows]
+
 
 class TemplateEngine:
-    def __init__(self):
-        self.templates = {
+    def __init__(self, data_dir=None):
+        self.templates_path = os.path.join(data_dir, "templates.json") if data_dir else None
+        self._watcher = FileWatcher(self.templates_path) if self.templates_path else None
+        self._reload_lock = threading.Lock()
+        self._compiled = {}
+        # Incrementado a cada recarga com alterações (invalida caches derivados)
+        self.generation = 0
+        self.templates = self.load_templates()
+    
+    @metrics.timed("load_templates")
+    def load_templates(self):
+        """Carrega templates de data/templates.json, ou os padrões se não existir"""
+        if self.templates_path:
+            try:
+                with open(self.templates_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                pass
+        return self.get_default_templates()
+    
+    def get_default_templates(self):
+        """Retorna templates padrão"""
+        return {
             "encaminhamento": "Estou encaminhando seu caso para o setor {setor}. O protocolo é {protocolo}.",
             "resolucao": "Confirmo que o problema {problema} foi resolvido. Precisa de mais alguma coisa?",
             "atualizacao": "Atualização do caso {caso}: {status}. Previsão: {previsao}.",
@@ -11,17 +99,76 @@ class TemplateEngine:
             "contato_futuro": "Vou entrar em contato novamente {periodo} para verificar se está tudo funcionando."
         }
     
+    def reload_if_changed(self):
+        """Recarrega os templates se o arquivo mudou, trocando o dicionário de uma vez.
+
+        Templates alterados são recompilados sob demanda (o cache compara o
+        texto-fonte); os que não mudaram mantêm a versão compilada.
+        """
+        if self._watcher is None or not self._watcher.changed():
+            return False
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            try:
+                templates = self.load_templates()
+            except ValueError:
+                self._watcher.reset()
+                return False
+            if templates == self.templates:
+                return False
+            for key in [key for key in self._compiled if key not in templates]:
+                self._compiled.pop(key, None)
+            self.templates = templates
+            self.generation += 1
+            return True
+        finally:
+            self._reload_lock.release()
+    
+    def compile(self, template_key):
+        """Retorna o template compilado (cacheado), ou None se não existir"""
+        source = self.templates.get(template_key)
+        if source is None:
+            return None
+        compiled = self._compiled.get(template_key)
+        if compiled is None or compiled.source != source:
+            compiled = CompiledTemplate(source)
+            self._compiled[template_key] = compiled
+        return compiled
+    
+    def get_template_fields(self, template_key):
+        """Campos que precisam ser preenchidos, na ordem em que aparecem"""
+        compiled = self.compile(template_key)
+        return list(compiled.fields) if compiled else None
+    
+    def render(self, template_key, **kwargs):
+        """Preenche template sem copiar para a área de transferência.
+
+        Retorna None se o template não existir; KeyError se faltar variável.
+        """
+        compiled = self.compile(template_key)
+        if compiled is None:
+            return None
+        return compiled.render(kwargs)
+    
+    def render_many(self, template_key, rows):
+        """Preenche um template para vários conjuntos de variáveis (sem copiar)"""
+        compiled = self.compile(template_key)
+        if compiled is None:
+            return None
+        return compiled.render_many(rows)
+
+    @metrics.timed("fill_template")
     def fill_template(self, template_key, **kwargs):
         """Preenche template com variáveis"""
-        if template_key in self.templates:
-            template = self.templates[template_key]
-            try:
-                filled_template = template.format(**kwargs)
-                pyperclip.copy(filled_template)
-                return filled_template
-            except KeyError as e:
-                return f"Erro: Variável {e} não fornecida"
-        return "Template não encontrado."
+        try:
+            filled_template = self.render(template_key, **kwargs)
+        except KeyError as e:
+            return f"Erro: Variável {e} não fornecida"
+        if filled_template is None:
+            return "Template não encontrado."
+        clipboard.copy(filled_template)
+        return filled_template
     
     def list_templates(self):
         """Lista todos os templates disponíveis"""
@@ -31,4 +178,4 @@ class TemplateEngine:
         """Mostra preview do template com placeholders"""
         if template_key in self.templates:
             return self.templates[template_key]
-        return None
\ No newline at end of file
+        return None
@@ -4,17 +4,43 @@ import sys
 # Adiciona o path para importar dos módulos core
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from core import metrics
 from core.chat_assistant import ChatAssistant
+from core.history_store import format_timestamp
 from core.template_engine import TemplateEngine
+from interface.menu import CategoryMenu
+
+# Máximo de códigos listados ao completar ou sugerir
+KEY_OPTIONS_LIMIT = 9
+
+# Cursor para o topo + apaga a tela (sem abrir um shell para rodar `clear`)
+CLEAR_SCREEN = "\033[H\033[2J"
+
+# Rótulos amigáveis para campos conhecidos; os demais usam o próprio nome
+FIELD_PROMPTS = {
+    "setor": "📂 Setor para encaminhamento",
+    "protocolo": "📄 Número do protocolo",
+    "problema": "🔧 Problema resolvido",
+    "caso": "📁 Número do caso",
+    "status": "📊 Status atual",
+    "previsao": "⏰ Previsão",
+    "tempo": "⏱️  Tempo para retorno (minutos)",
+    "periodo": "📅 Período (ex: 'amanhã', 'na segunda-feira')",
+}
 
 class ChatCLI:
-    def __init__(self):
-        self.assistant = ChatAssistant()
-        self.template_engine = TemplateEngine()
+    def __init__(self, data_dir="../data"):
+        self.assistant = ChatAssistant(data_dir)
+        self.template_engine = TemplateEngine(self.assistant.data_dir)
+        self.menu = CategoryMenu(self.assistant)
+        if os.name == 'nt':
+            # Chamada vazia liga o processamento de sequências ANSI no console do Windows
+            os.system('')
     
     def clear_screen(self):
         """Limpa a tela do terminal"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        if sys.stdout.isatty():
+            sys.stdout.write(CLEAR_SCREEN)
     
     def show_header(self):
         """Mostra cabeçalho"""
@@ -24,34 +50,31 @@ class ChatCLI:
         print("=" * 70)
     
     def show_categories_menu(self):
-        """Mostra menu organizado por categorias"""
-        categories = {}
-        for key, data in self.assistant.quick_responses.items():
-            cat = data["category"]
-            if cat not in categories:
-                categories[cat] = []
-            categories[cat].append((key, data["message"]))
-        
-        print("\n" + "📁 CATEGORIAS DE RESPOSTAS:")
-        print("-" * 50)
-        
-        for category, responses in categories.items():
-            print(f"\n🎯 {category.upper()}:")
-            for key, message in responses:
-                preview = message[:65] + "..." if len(message) > 65 else message
-                print(f"   [{key:.<20}] {preview}")
+        """Mostra menu organizado por categorias (página atual)"""
+        print(self.menu.render())
     
     def show_commands_help(self):
         """Mostra os comandos disponíveis"""
         print("\n" + "💡 COMANDOS DISPONÍVEIS:")
         print("-" * 40)
         print(" [buscar <termo>]  ... Buscar respostas por palavra-chave")
+        print(" [>] / [<] ......... Próxima / anterior página do menu")
+        print(" [cat <categoria>] . Mostrar só uma categoria ([cat] = todas)")
+        print(" [sugerir] ......... Sugerir resposta para a mensagem do cliente")
         print(" [add] ............. Adicionar nova resposta rápida")
         print(" [template] ........ Usar templates dinâmicos")
         print(" [hist] ............ Ver histórico de uso")
+        print(" [hist <código>] ... Ver últimos usos de uma resposta")
+        print(" [stats] ........... Ver tempos das operações desta sessão")
         print(" [sair] ............. Fechar o programa")
         print("-" * 40)
     
+    def show_clipboard_error(self):
+        """Avisa se a última cópia (feita em segundo plano) falhou"""
+        error = self.assistant.clipboard.take_error()
+        if error:
+            print(f"\n⚠️  A última cópia não chegou à área de transferência: {str(error).strip()}")
+    
     def handle_quick_response(self, key):
         """Lida com seleção de resposta rápida"""
         response = self.assistant.get_response(key)
@@ -63,6 +86,44 @@ class ChatCLI:
             print(f"\n❌ Resposta '{key}' não encontrada.")
         input("\n⏎ Pressione Enter para continuar...")
     
+    def handle_unknown_key(self, text):
+        """Código não exato: completa prefixo único ou sugere parecidos"""
+        key = self.assistant.unique_key_completion(text) if text else None
+        if key:
+            print(f"\n➡️  '{text}' completado para '{key}'")
+            self.handle_quick_response(key)
+            return
+        
+        options = self.assistant.complete_key(text, limit=KEY_OPTIONS_LIMIT) if text else []
+        if options:
+            total = self.assistant.count_key_prefix(text)
+            title = f"🔤 {total} códigos começam com '{text}'"
+        else:
+            options = self.assistant.suggest_keys(text, limit=KEY_OPTIONS_LIMIT) if text else []
+            title = "🤔 Você quis dizer"
+        
+        if not options:
+            print(f"❌ Comando ou código '{text}' não reconhecido.")
+            print("💡 Use um dos códigos listados ou comandos disponíveis.")
+            input("\n⏎ Pressione Enter para continuar...")
+            return
+        
+        key = self.choose_key(title, options)
+        if key:
+            self.handle_quick_response(key)
+    
+    def choose_key(self, title, options):
+        """Lista códigos numerados e retorna o escolhido (None = cancelar)"""
+        print(f"\n{title}:")
+        for i, key in enumerate(options, 1):
+            print(f"   {i:2d}. {key}")
+        choice = input("\n🎯 Número ou código (Enter para voltar): ").strip()
+        if choice.isdigit() and 1 <= int(choice) <= len(options):
+            return options[int(choice) - 1]
+        if choice in self.assistant.quick_responses:
+            return choice
+        return None
+    
     def handle_search(self, search_term):
         """Lida com busca de respostas"""
         print(f"\n🔍 Buscando por: '{search_term}'")
@@ -78,6 +139,39 @@ class ChatCLI:
             print("\n❌ Nenhuma resposta encontrada para esta busca.")
         input("\n⏎ Pressione Enter para continuar...")
     
+    def handle_category_filter(self, name):
+        """Filtra o menu por categoria"""
+        if not self.menu.select_category(name):
+            print(f"\n❌ Categoria '{name}' não encontrada.")
+            print(f"📂 Disponíveis: {', '.join(self.menu.categories)}")
+            input("\n⏎ Pressione Enter para continuar...")
+    
+    def handle_suggest(self, message=""):
+        """Sugere respostas para a mensagem colada do cliente"""
+        if not message:
+            message = input("\n💬 Cole a mensagem do cliente: ").strip()
+        if not message:
+            return
+        
+        suggestions = self.assistant.suggest_responses(message, limit=KEY_OPTIONS_LIMIT)
+        if not suggestions:
+            print("\n❌ Nenhuma resposta parecida com esta mensagem.")
+            print("💡 Tente 'buscar <termo>' com uma palavra-chave.")
+            input("\n⏎ Pressione Enter para continuar...")
+            return
+        
+        responses = self.assistant.quick_responses
+        print("\n🧠 Respostas sugeridas:")
+        print("-" * 60)
+        for i, (key, score) in enumerate(suggestions, 1):
+            message = responses[key]["message"]
+            preview = message[:55] + "..." if len(message) > 55 else message
+            print(f"   {i}. [{key}] {preview}  ({score:.1f})")
+        
+        choice = input("\n🎯 Número para copiar (Enter para voltar): ").strip()
+        if choice.isdigit() and 1 <= int(choice) <= len(suggestions):
+            self.handle_quick_response(suggestions[int(choice) - 1][0])
+    
     def handle_templates(self):
         """Lida com sistema de templates"""
         print("\n" + "📝" * 5 + " TEMPLATES DINÂMICOS " + "📝" * 5)
@@ -112,41 +206,11 @@ class ChatCLI:
         print("💬 Preencha os campos abaixo:")
         
         try:
-            if template_name == "encaminhamento":
-                setor = input("   📂 Setor para encaminhamento: ")
-                protocolo = input("   📄 Número do protocolo: ")
-                mensagem = self.template_engine.fill_template(
-                    "encaminhamento", 
-                    setor=setor, 
-                    protocolo=protocolo
-                )
-            
-            elif template_name == "resolucao":
-                problema = input("   🔧 Problema resolvido: ")
-                mensagem = self.template_engine.fill_template("resolucao", problema=problema)
-            
-            elif template_name == "atualizacao":
-                caso = input("   📁 Número do caso: ")
-                status = input("   📊 Status atual: ")
-                previsao = input("   ⏰ Previsão: ")
-                mensagem = self.template_engine.fill_template(
-                    "atualizacao", 
-                    caso=caso, 
-                    status=status, 
-                    previsao=previsao
-                )
-            
-            elif template_name == "verificacao":
-                tempo = input("   ⏱️  Tempo para retorno (minutos): ")
-                mensagem = self.template_engine.fill_template("verificacao", tempo=tempo)
-            
-            elif template_name == "contato_futuro":
-                periodo = input("   📅 Período (ex: 'amanhã', 'na segunda-feira'): ")
-                mensagem = self.template_engine.fill_template("contato_futuro", periodo=periodo)
-            
-            else:
-                # Template sem campos específicos
-                mensagem = self.template_engine.fill_template(template_name)
+            valores = {}
+            for field in self.template_engine.get_template_fields(template_name) or []:
+                prompt = FIELD_PROMPTS.get(field, f"✏️  {field.replace('_', ' ').capitalize()}")
+                valores[field] = input(f"   {prompt}: ")
+            mensagem = self.template_engine.fill_template(template_name, **valores)
             
             if mensagem.startswith("Erro:"):
                 print(f"\n❌ {mensagem}")
@@ -184,36 +248,118 @@ class ChatCLI:
             input("\n⏎ Pressione Enter para continuar...")
             return
         
-        self.assistant.add_quick_response(key, message, category)
+        similar = self.assistant.find_similar_responses(message)
+        if similar:
+            print("\n⚠️  Já existem respostas quase iguais:")
+            for other, similarity in similar:
+                print(f"   {other} ({similarity:.0%}): {self.assistant.quick_responses[other]['message'][:60]}")
+            if input("\n❓ Adicionar mesmo assim? (s/N): ").strip().lower() != "s":
+                print("❌ Resposta não adicionada.")
+                input("\n⏎ Pressione Enter para continuar...")
+                return
+        
+        self.assistant.add_quick_response(key, message, category, check_duplicates=False)
         input("\n⏎ Pressione Enter para continuar...")
     
-    def show_history(self):
-        """Mostra histórico recente"""
+    def show_history(self, key=None):
+        """Mostra histórico recente (inclusive de sessões anteriores)"""
         print("\n" + "📊" * 5 + " HISTÓRICO RECENTE " + "📊" * 5)
         
-        if not self.assistant.conversation_history:
+        if key:
+            history = self.assistant.key_history(key, limit=5)
+        else:
+            history = self.assistant.recent_history(5)
+        if not history:
             print("\n📝 Nenhum registro no histórico ainda.")
             print("   As respostas usadas aparecerão aqui.")
         else:
-            print(f"\n📈 Últimas {min(5, len(self.assistant.conversation_history))} respostas:")
+            alvo = f" de '{key}'" if key else ""
+            print(f"\n📈 Últimos {len(history)} usos{alvo}:")
             print("-" * 70)
             
-            for i, entry in enumerate(reversed(self.assistant.conversation_history[-5:]), 1):
-                print(f"\n{i}. ⏰ {entry['timestamp']}")
+            for i, entry in enumerate(history, 1):
+                print(f"\n{i}. ⏰ {format_timestamp(entry)}")
                 print(f"   📝 {entry['context']}")
                 response_preview = entry['response'][:70] + "..." if len(entry['response']) > 70 else entry['response']
                 print(f"   💬 {response_preview}")
         
+        if not key:
+            self.show_usage_stats()
+        
+        input("\n⏎ Pressione Enter para continuar...")
+    
+    def show_usage_stats(self):
+        """Mostra resumo de uso acumulado (todas as sessões)"""
+        report = self.assistant.usage_report(top=5)
+        if not report["total"]:
+            return
+        
+        print("\n" + "📈 ESTATÍSTICAS DE USO:")
+        print("-" * 70)
+        print(f"   Total de usos: {report['total']}")
+        
+        print("\n   🏆 Mais usadas:")
+        for item in report["top_responses"]:
+            print(f"      {item['key']:.<25} {item['count']}")
+        
+        print("\n   📂 Por categoria:")
+        for category, count in report["by_category"].items():
+            print(f"      {category:.<25} {count}")
+        
+        peak = max(report["by_hour"])
+        if peak:
+            print("\n   ⏰ Por hora do dia:")
+            for hour, count in enumerate(report["by_hour"]):
+                if count:
+                    print(f"      {hour:02d}h {'█' * max(1, round(count / peak * 30))} {count}")
+        
+        never_used = report["never_used"]
+        if never_used:
+            shown = ", ".join(never_used[:10]) + (" ..." if len(never_used) > 10 else "")
+            print(f"\n   💤 Nunca usadas ({len(never_used)}): {shown}")
+    
+    def show_metrics(self):
+        """Mostra contagem e latência das operações instrumentadas"""
+        print("\n" + "⏱️" * 5 + " DESEMPENHO DA SESSÃO " + "⏱️" * 5)
+        
+        rows = metrics.OPERATIONS.summary()
+        if not metrics.ENABLED:
+            print("\n⚠️  Instrumentação desligada (ASSISTENTE_METRICS=0).")
+        elif not rows:
+            print("\n📝 Nenhuma operação medida ainda.")
+        else:
+            errors = metrics.ERRORS.snapshot()
+            print(f"\n   {'operação':<24}{'chamadas':>9}{'média':>10}{'p50':>10}{'p95':>10}{'máx':>10}{'erros':>7}")
+            print("   " + "-" * 80)
+            for operation, calls, mean, p50, p95, peak in rows:
+                print(
+                    f"   {operation:<24}{calls:>9}{mean * 1000:>8.2f}ms{p50 * 1000:>8.2f}ms"
+                    f"{p95 * 1000:>8.2f}ms{peak * 1000:>8.2f}ms{errors.get(operation, 0):>7}"
+                )
+            print("   (p50/p95 aproximados pelo limite do bucket do histograma)")
+        
+        cache = self.assistant.search_cache.stats()
+        print(f"\n   🔍 Cache de busca: {cache['hits']} acertos / {cache['misses']} faltas "
+              f"({cache['hit_rate']:.0%}), {cache['extensions']} refiltragens de prefixo")
+        copies = self.assistant.clipboard.stats()
+        print(f"   📋 Área de transferência ({copies['backend']}): {copies['requests']} cópias, "
+              f"{copies['coalesced']} fundidas, gravação média {copies['avg_write_ms']:.1f} ms")
+        
         input("\n⏎ Pressione Enter para continuar...")
     
     def run(self):
         """Loop principal da aplicação"""
         try:
             while True:
+                # Pega edições feitas no arquivo por outra pessoa/processo
+                self.assistant.reload_if_changed()
+                self.template_engine.reload_if_changed()
+                
                 self.clear_screen()
                 self.show_header()
                 self.show_categories_menu()
                 self.show_commands_help()
+                self.show_clipboard_error()
                 
                 user_input = input("\n🎯 Digite o código da resposta ou comando: ").strip()
                 
@@ -229,25 +375,43 @@ class ChatCLI:
                         print("❌ Por favor, digite um termo para buscar.")
                         input("\n⏎ Pressione Enter para continuar...")
                 
+                elif user_input in ('>', '<'):
+                    if user_input == '>':
+                        self.menu.next_page()
+                    else:
+                        self.menu.previous_page()
+                
+                elif user_input.lower() == 'cat' or user_input.lower().startswith('cat '):
+                    self.handle_category_filter(user_input[4:].strip())
+                
+                elif user_input.lower() == 'sugerir' or user_input.lower().startswith('sugerir '):
+                    self.handle_suggest(user_input[8:].strip())
+                
                 elif user_input.lower() == 'add':
                     self.add_new_response()
                 
                 elif user_input.lower() == 'template':
                     self.handle_templates()
                 
+                elif user_input.lower() == 'stats':
+                    self.show_metrics()
+                
                 elif user_input.lower() == 'hist':
                     self.show_history()
                 
+                elif user_input.lower().startswith('hist '):
+                    self.show_history(user_input[5:].strip())
+                
                 elif user_input in self.assistant.quick_responses:
                     self.handle_quick_response(user_input)
                 
                 else:
-                    print(f"❌ Comando ou código '{user_input}' não reconhecido.")
-                    print("💡 Use um dos códigos listados ou comandos disponíveis.")
-                    input("\n⏎ Pressione Enter para continuar...")
+                    self.handle_unknown_key(user_input)
         
         except KeyboardInterrupt:
             print("\n\n👋 Programa encerrado. Até logo! 👋")
         except Exception as e:
             print(f"\n❌ Erro inesperado: {e}")
-            input("Pressione Enter para sair...")
\ No newline at end of file
+            input("Pressione Enter para sair...")
+        finally:
+            self.assistant.close()
\ No newline at end of file
@@ -0,0 +1,122 @@
+import shutil
+
+# Linhas ocupadas por cabeçalho, ajuda de comandos e prompt
+SCREEN_OVERHEAD = 26
+MIN_PAGE_ROWS = 10
+PREVIEW_WIDTH = 65
+
+
+def page_rows():
+    """Quantas respostas cabem numa página do terminal atual"""
+    lines = shutil.get_terminal_size((80, 40)).lines
+    return max(MIN_PAGE_ROWS, lines - SCREEN_OVERHEAD)
+
+
+class CategoryMenu:
+    """Menu de respostas agrupado por categoria, paginado.
+
+    O agrupamento (categoria -> chaves) vem do CategoryIndex do repositório
+    e é reaproveitado até `assistant.generation` mudar. Cada tela formata só as linhas da
+    página visível, então o custo de desenhar o menu não cresce com o
+    tamanho da biblioteca.
+    """
+
+    def __init__(self, assistant):
+        self.assistant = assistant
+        self.page = 0
+        self.category = None   # None = todas as categorias
+        self._generation = None
+        self._groups = {}      # categoria -> [keys], na ordem das respostas
+        self._rows = []        # [(categoria, key)] na ordem de exibição
+        self._pages = {}       # (categoria, page, tamanho) -> texto já formatado
+
+    def _refresh(self):
+        if self._generation == self.assistant.generation:
+            return
+        generation = self.assistant.generation
+        groups = self.assistant.get_category_groups()
+        self._groups = groups
+        self._generation = generation
+        self._pages.clear()
+        if self.category not in groups:
+            self.category = None
+        self._rows = self._visible_rows()
+
+    def _visible_rows(self):
+        if self.category is not None:
+            return [(self.category, key) for key in self._groups[self.category]]
+        return [(category, key) for category, keys in self._groups.items() for key in keys]
+
+    @property
+    def categories(self):
+        self._refresh()
+        return list(self._groups)
+
+    def page_count(self, size):
+        return max(1, -(-len(self._rows) // size))
+
+    def next_page(self):
+        self.page += 1
+
+    def previous_page(self):
+        self.page = max(0, self.page - 1)
+
+    def select_category(self, name=None):
+        """Mostra só uma categoria (ou todas, sem nome); retorna False se não existe"""
+        self._refresh()
+        if name:
+            matches = [category for category in self._groups if category.lower() == name.lower()]
+            if not matches:
+                return False
+            self.category = matches[0]
+        else:
+            self.category = None
+        self.page = 0
+        self._rows = self._visible_rows()
+        return True
+
+    def render(self, size=None):
+        """Texto da página atual do menu"""
+        self._refresh()
+        size = size or page_rows()
+        pages = self.page_count(size)
+        self.page = min(self.page, pages - 1)
+        cache_key = (self.category, self.page, size)
+        text = self._pages.get(cache_key)
+        if text is None:
+            text = self._format_page(size, pages)
+            self._pages[cache_key] = text
+        return text
+
+    def _format_page(self, size, pages):
+        responses = self.assistant.quick_responses
+        start = self.page * size
+        rows = self._rows[start:start + size]
+
+        title = "📁 CATEGORIAS DE RESPOSTAS"
+        if self.category is not None:
+            title += f" — {self.category.upper()}"
+        lines = ["", title + ":", "-" * 50]
+
+        current = None
+        for category, key in rows:
+            if category != current:
+                # Página começando no meio de uma categoria repete o título
+                continued = current is None and start and self._rows[start - 1][0] == category
+                lines.append("")
+                lines.append(f"🎯 {category.upper()}{' (continuação)' if continued else ''}:")
+                current = category
+            data = responses.get(key)
+            if data is None:
+                continue
+            message = data["message"]
+            preview = message[:PREVIEW_WIDTH] + "..." if len(message) > PREVIEW_WIDTH else message
+            lines.append(f"   [{key:.<20}] {preview}")
+
+        if pages > 1:
+            lines.append("")
+            lines.append(
+                f"📄 Página {self.page + 1}/{pages} ({len(self._rows)} respostas)"
+                "  —  [>] próxima  [<] anterior  [cat <nome>] filtrar categoria"
+            )
+        return "\n".join(lines)
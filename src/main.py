@@ -3,14 +3,242 @@
 Assistente VocalCom - Ferramenta para Otimizar Atendimento via Chat
 """
 
+import argparse
 import os
 import sys
+import threading
 
 # Adiciona o diretório pai ao path do Python para permitir importação de 'core'
 sys.path.append(os.path.dirname(__file__))
 
-def main():
+DEFAULT_DATA_DIR = "../data"
+
+def parse_args(argv=None):
+    """Interpreta a linha de comando (sem subcomando: abre o menu interativo)"""
+    parser = argparse.ArgumentParser(description="Assistente VocalCom")
+    subcommands = parser.add_subparsers(dest="command")
+    
+    migrate = subcommands.add_parser(
+        "migrate", help="Copia respostas_rapidas.json para o banco SQLite (respostas.db)"
+    )
+    migrate.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    
+    catalog_import = subcommands.add_parser(
+        "import", help="Importa respostas de um CSV/JSONL (key, message, category) em lotes"
+    )
+    catalog_import.add_argument("path", help="arquivo de entrada ('-' para stdin)")
+    catalog_import.add_argument("--format", choices=("csv", "jsonl"))
+    catalog_import.add_argument("--batch-size", type=int, default=1000)
+    catalog_import.add_argument(
+        "--replace", action="store_true", help="substitui códigos que já existem (padrão: pula)"
+    )
+    
+    catalog_export = subcommands.add_parser(
+        "export", help="Exporta as respostas para CSV/JSONL"
+    )
+    catalog_export.add_argument("path", help="arquivo de saída ('-' para stdout)")
+    catalog_export.add_argument("--format", choices=("csv", "jsonl"))
+    catalog_export.add_argument("--category", help="exporta só esta categoria")
+    
+    dedup = subcommands.add_parser(
+        "dedup", help="Lista grupos de respostas quase iguais (MinHash/LSH)"
+    )
+    dedup.add_argument(
+        "--threshold", type=float, default=0.8, help="similaridade mínima, de 0 a 1 (padrão 0.8)"
+    )
+    dedup.add_argument("--limit", type=int, default=20, help="grupos mostrados (0 = todos)")
+    
+    merge_history = subcommands.add_parser(
+        "merge-history",
+        help="Junta os chat_history.json de vários atendentes num fluxo em ordem de tempo",
+    )
+    merge_history.add_argument(
+        "inputs", nargs="+", help="arquivos ou pastas (procura chat_history.json, seus segmentos em history/ e *.jsonl)"
+    )
+    merge_history.add_argument(
+        "--output", required=True,
+        help="arquivo JSONL ('-' para stdout), pasta das partes colunares ou pasta de dados (store)",
+    )
+    merge_history.add_argument("--format", choices=("jsonl", "columnar", "store"), default="jsonl")
+    merge_history.add_argument(
+        "--state", help="offsets já lidos de cada arquivo (padrão: <output>.offsets.json); 'none' relê tudo"
+    )
+    merge_history.add_argument("--workers", type=int, help="processos (padrão: um por CPU)")
+    
+    for command in (catalog_import, catalog_export, dedup):
+        command.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+        command.add_argument("--backend", choices=("json", "sqlite", "shared"))
+    
+    return parser.parse_args(argv)
+
+def run_migrate(args):
+    """Migra as respostas do JSON para o backend SQLite"""
+    from core.sqlite_repository import migrate_json_to_sqlite
+    
+    db_path = os.path.join(args.data_dir, "respostas.db")
+    print(f"📦 Migrando respostas de '{args.data_dir}' para '{db_path}'...")
+    count = migrate_json_to_sqlite(args.data_dir, db_path)
+    if count:
+        print(f"✅ {count} respostas migradas.")
+        print("💡 Use ASSISTENTE_BACKEND=sqlite para usar o novo backend.")
+    else:
+        print("❌ Nenhuma resposta encontrada para migrar.")
+
+def run_import(args):
+    """Importa um catálogo CSV/JSONL sem carregar o arquivo inteiro"""
+    from core.catalog_io import detect_format, import_catalog, open_input
+    from core.chat_assistant import ChatAssistant
+    
+    try:
+        fmt = detect_format(args.path, args.format)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    assistant = ChatAssistant(args.data_dir, args.backend)
+    
+    def progress(report):
+        print(f"   ⏳ {report.read} linhas lidas, {report.imported} importadas...", file=sys.stderr)
+    
+    print(f"📥 Importando '{args.path}' ({fmt}) em lotes de {args.batch_size}...", file=sys.stderr)
+    try:
+        with open_input(args.path) as stream:
+            report = import_catalog(
+                assistant, stream, fmt, args.batch_size, args.replace, progress
+            )
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        assistant.close()
+    
+    print(f"✅ {report.imported} respostas importadas em {report.batches} lotes "
+          f"({report.elapsed:.2f}s, {report.rows_per_second:,.0f} linhas/s)")
+    if report.skipped:
+        print(f"⏭️  {report.skipped} já existiam (use --replace para substituir)")
+    if report.rejected:
+        print(f"⚠️  {report.rejected} linhas rejeitadas:")
+        for line, reason in report.errors:
+            print(f"   linha {line}: {reason}")
+        if report.rejected > len(report.errors):
+            print(f"   ... e mais {report.rejected - len(report.errors)}")
+    return 0
+
+def run_export(args):
+    """Exporta as respostas para CSV/JSONL, uma linha por vez"""
+    import time
+    from core.catalog_io import detect_format, export_catalog, open_output
+    from core.chat_assistant import ChatAssistant
+    
+    try:
+        fmt = detect_format(args.path, args.format)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    assistant = ChatAssistant(args.data_dir, args.backend)
+    start = time.perf_counter()
+    try:
+        with open_output(args.path) as stream:
+            count = export_catalog(assistant.quick_responses, stream, fmt, args.category)
+    except OSError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        assistant.close()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0
+    print(f"✅ {count} respostas exportadas para '{args.path}' "
+          f"({elapsed:.2f}s, {rate:,.0f} linhas/s)", file=sys.stderr)
+    return 0
+
+def run_dedup(args):
+    """Procura respostas quase iguais no acervo inteiro"""
+    import time
+    from core.chat_assistant import ChatAssistant
+    
+    assistant = ChatAssistant(args.data_dir, args.backend)
+    try:
+        start = time.perf_counter()
+        total = len(assistant.quick_responses)
+        print(f"🔎 Analisando {total} respostas (similaridade >= {args.threshold:.0%})...")
+        groups = assistant.find_duplicates(args.threshold)
+        elapsed = time.perf_counter() - start
+        responses = assistant.quick_responses
+        shown = groups[:args.limit] if args.limit else groups
+        for number, group in enumerate(shown, 1):
+            print(f"\n📎 Grupo {number} ({len(group)} respostas):")
+            for key, similarity in group:
+                print(f"   {key:30} {similarity:4.0%}  {responses[key]['message'][:60]}")
+        if len(shown) < len(groups):
+            print(f"\n   ... e mais {len(groups) - len(shown)} grupos (use --limit 0 para ver todos)")
+    finally:
+        assistant.close()
+    
+    redundant = sum(len(group) - 1 for group in groups)
+    if groups:
+        print(f"\n⚠️  {len(groups)} grupos, {redundant} respostas redundantes ({elapsed:.2f}s)")
+    else:
+        print(f"✅ Nenhuma resposta quase igual ({elapsed:.2f}s)")
+    return 0
+
+def run_merge_history(args):
+    """Junta históricos de várias máquinas, lendo só o que chegou desde a última vez"""
+    from core.history_merge import merge_histories, write_columnar, write_jsonl, write_store
+    
+    state = args.state
+    if state is None:
+        state = (args.output.rstrip("/\\") + ".offsets.json") if args.output != "-" else None
+    elif state == "none":
+        state = None
+    
+    if args.format == "jsonl":
+        def write(records):
+            if args.output == "-":
+                return write_jsonl(records, sys.stdout)
+            # Cada execução acrescenta os registros novos, em ordem entre si
+            with open(args.output, "a", encoding="utf-8") as stream:
+                return write_jsonl(records, stream)
+    elif args.format == "columnar":
+        def write(records):
+            return write_columnar(records, args.output)
+    else:
+        def write(records):
+            return write_store(records, args.output)
+    
+    try:
+        report = merge_histories(args.inputs, write, state, args.workers)
+    except OSError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    
+    print(f"✅ {report.records} registros de {report.files_with_data}/{report.files} arquivos "
+          f"({report.bytes / 1e6:.1f} MB novos em {report.chunks} pedaços)", file=sys.stderr)
+    print(f"   ⏱️  {report.elapsed:.2f}s ({report.parse_seconds:.2f}s lendo): "
+          f"{report.megabytes_per_second:.1f} MB/s, {report.records_per_second:,.0f} registros/s",
+          file=sys.stderr)
+    if report.rejected:
+        print(f"⚠️  {report.rejected} linhas ilegíveis ignoradas:", file=sys.stderr)
+        for path, reason in report.errors:
+            print(f"   {path}: {reason}", file=sys.stderr)
+    return 0
+
+def main(argv=None):
     """Função principal que inicia o assistente"""
+    args = parse_args(argv)
+    if args.command == "migrate":
+        return run_migrate(args)
+    if args.command == "import":
+        return run_import(args)
+    if args.command == "export":
+        return run_export(args)
+    if args.command == "dedup":
+        return run_dedup(args)
+    if args.command == "merge-history":
+        return run_merge_history(args)
+    
+    from core import metrics
+    # ASSISTENTE_PROFILE=cprofile|sample grava um perfil ao sair
+    metrics.start_profiler()
+    
     print("🚀 Iniciando Assistente VocalCom...")
     print("📂 Carregando configurações...")
     
@@ -19,6 +247,8 @@ def main():
         from interface.cli import ChatCLI
         
         assistant = ChatCLI()
+        # Respostas carregam em segundo plano enquanto a tela inicial espera o Enter
+        threading.Thread(target=assistant.assistant.preload, daemon=True).start()
         print("✅ Sistema carregado com sucesso!")
         input("\n⏎ Pressione Enter para abrir o menu principal...")
         assistant.run()
@@ -54,4 +284,4 @@ def main():
         input("Pressione Enter para sair...")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
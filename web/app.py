@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Assistente VocalCom - API Web
+
+Desenvolvimento:  python web/app.py
+Produção:         gunicorn -w 4 --threads 8 --chdir web app:app
+Vários workers:   ASSISTENTE_BACKEND=shared (um snapshot mapeado para todos)
+Push (WebSocket): python web/asgi.py (mesmas rotas, via ASGI)
+"""
+
+import gzip
+import os
+import sys
+import time
+import zlib
+
+from flask import Flask, Response, g, jsonify, render_template, request, send_from_directory
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Adiciona o path para importar dos módulos core
+sys.path.append(os.path.join(BASE_DIR, '..', 'src'))
+
+from core import metrics
+from core.chat_assistant import ChatAssistant
+from core.template_engine import TemplateEngine
+from payloads import GZIP_MIN_SIZE, PayloadCache, encode_json
+
+DATA_DIR = os.environ.get('ASSISTENTE_DATA_DIR', os.path.join(BASE_DIR, '..', 'data'))
+SCRIPT_DIR = os.path.join(BASE_DIR, 'static', 'css', 'js')
+MAX_SEARCH_RESULTS = 200
+MAX_SUGGESTIONS = 50
+MAX_SUGGEST_BATCH = 1000
+# /api/responses paginado: tamanho padrão/máximo da página, respostas por
+# bloco no modo NDJSON e tamanho do campo "preview"
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK = 500
+PREVIEW_LENGTH = 100
+RESPONSE_FIELDS = ("key", "message", "category", "preview")
+
+app = Flask(
+    __name__,
+    template_folder=os.path.join(BASE_DIR, 'frontend', 'templates'),
+    static_folder=os.path.join(BASE_DIR, 'frontend', 'static'),
+)
+
+# ASSISTENTE_PROFILE=cprofile|sample grava um perfil ao encerrar o processo
+metrics.start_profiler()
+
+REQUESTS = metrics.REGISTRY.histogram(
+    'assistente_http_request_seconds', 'Duração das requisições HTTP por endpoint', 'endpoint'
+)
+
+assistant = ChatAssistant(DATA_DIR)
+template_engine = TemplateEngine(DATA_DIR)
+payloads = PayloadCache()
+
+
+def accepts_gzip():
+    return 'gzip' in request.headers.get('Accept-Encoding', '')
+
+
+def payload_response(payload):
+    """Responde com um payload pré-codificado, com suporte a ETag/304 e gzip"""
+    if request.if_none_match.contains(payload.etag):
+        response = Response(status=304)
+    elif payload.gzipped is not None and accepts_gzip():
+        response = Response(payload.gzipped, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(payload.body, mimetype='application/json')
+
+    response.set_etag(payload.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def json_response(data, status=200):
+    """Resposta JSON dinâmica (busca, cópia), comprimida quando vale a pena"""
+    body = encode_json(data)
+    response = Response(body, status=status, mimetype='application/json')
+    if len(body) >= GZIP_MIN_SIZE and accepts_gzip():
+        response.set_data(gzip.compress(body, 6))
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.teardown_request
+def record_request_time(error=None):
+    start = g.pop('request_start', None)
+    if start is not None and metrics.ENABLED:
+        REQUESTS.observe(request.endpoint or 'not_found', time.perf_counter() - start)
+
+
+@app.before_request
+def reload_changed_files():
+    # Polling barato (no máximo um stat por segundo); quem não pega o
+    # lock de recarga segue servindo o snapshot atual sem esperar.
+    assistant.reload_if_changed()
+    template_engine.reload_if_changed()
+
+
+@app.route('/')
+def index():
+    return render_template('index.html')
+
+
+@app.route('/static/js/<path:filename>')
+def script_files(filename):
+    return send_from_directory(SCRIPT_DIR, filename)
+
+
+@app.route('/api/health')
+def health():
+    return jsonify({
+        "status": "healthy",
+        "core_available": True,
+        "responses": len(assistant.quick_responses),
+        "search_cache": assistant.search_cache.stats(),
+    })
+
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Contadores e latências no formato texto do Prometheus"""
+    return Response(
+        metrics.render(assistant.metric_samples()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+def preview(message):
+    if len(message) > PREVIEW_LENGTH:
+        return message[:PREVIEW_LENGTH] + '...'
+    return message
+
+
+def project(key, data, fields):
+    """Item da listagem só com os campos pedidos"""
+    item = {}
+    for field in fields:
+        if field == 'key':
+            item['key'] = key
+        elif field == 'preview':
+            item['preview'] = preview(data['message'])
+        else:
+            item[field] = data[field]
+    return item
+
+
+def page_items(keys, fields):
+    responses = assistant.quick_responses
+    return [project(key, responses[key], fields) for key in keys if key in responses]
+
+
+def stream_items(category, after, fields):
+    """NDJSON: um item por linha, lido do índice em blocos de STREAM_CHUNK"""
+    while True:
+        keys, after = assistant.list_keys(category, after, STREAM_CHUNK)
+        items = page_items(keys, fields)
+        if items:
+            yield b'\n'.join(encode_json(item) for item in items) + b'\n'
+        if after is None:
+            return
+
+
+def gzip_stream(chunks):
+    """Comprime um corpo em fluxo; cada bloco sai inteiro (sync flush) para o cliente já usar"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+@app.route('/api/responses')
+def list_responses():
+    """Todas as respostas ({key: {message, category}}) ou, com parâmetros, uma listagem paginada.
+
+    - `limit` e `cursor` (o `next_cursor` da página anterior): páginas em ordem alfabética
+    - `category`: só as respostas da categoria (via índice de categorias)
+    - `fields`: campos de cada item, entre key, message, category e preview
+    - `format=ndjson` (ou Accept: application/x-ndjson): todas, a partir do cursor, em fluxo
+    """
+    if not request.args and 'application/x-ndjson' not in request.headers.get('Accept', ''):
+        payload = payloads.get(
+            'responses', assistant.generation, lambda: dict(assistant.quick_responses.items())
+        )
+        return payload_response(payload)
+
+    fields = tuple(f for f in request.args.get('fields', 'key,message,category').split(',') if f)
+    unknown = [f for f in fields if f not in RESPONSE_FIELDS]
+    if unknown or not fields:
+        return json_response(
+            {"error": f"Parâmetro 'fields' inválido (use {', '.join(RESPONSE_FIELDS)})"}, 400
+        )
+    category = request.args.get('category')
+    cursor = request.args.get('cursor') or None
+
+    ndjson = request.args.get('format') == 'ndjson' or (
+        'format' not in request.args
+        and 'application/x-ndjson' in request.headers.get('Accept', '')
+    )
+    if ndjson:
+        body = stream_items(category, cursor, fields)
+        if accepts_gzip():
+            response = Response(gzip_stream(body), mimetype='application/x-ndjson')
+            response.headers['Content-Encoding'] = 'gzip'
+            response.headers['Vary'] = 'Accept-Encoding'
+        else:
+            response = Response(body, mimetype='application/x-ndjson')
+        response.headers['X-Total-Count'] = str(assistant.count_keys(category))
+        return response
+
+    try:
+        limit = min(max(int(request.args.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return json_response({"error": "Parâmetro 'limit' inválido"}, 400)
+    keys, next_cursor = assistant.list_keys(category, cursor, limit)
+    return json_response({
+        "items": page_items(keys, fields),
+        "next_cursor": next_cursor,
+        "total": assistant.count_keys(category),
+    })
+
+
+@app.route('/api/responses/<path:key>')
+def get_response_item(key):
+    """Uma resposta completa (a listagem em fluxo do front end traz só a prévia)"""
+    data = assistant.quick_responses.get(key)
+    if data is None:
+        return json_response({"error": f"Resposta '{key}' não encontrada"}, 404)
+    return json_response({"key": key, "message": data["message"], "category": data["category"]})
+
+
+@app.route('/api/templates')
+def list_templates():
+    payload = payloads.get(
+        'templates', template_engine.generation, lambda: dict(template_engine.templates)
+    )
+    return payload_response(payload)
+
+
+@app.route('/api/templates/fields')
+def list_template_fields():
+    payload = payloads.get('template_fields', template_engine.generation, lambda: {
+        name: template_engine.get_template_fields(name)
+        for name in template_engine.list_templates()
+    })
+    return payload_response(payload)
+
+
+@app.route('/api/search')
+def search():
+    # A leitura do índice não usa lock global: cada requisição só consulta
+    # estruturas que as escritas substituem ou atualizam de forma atômica.
+    query = request.args.get('q', '').strip()
+    if not query:
+        return json_response({})
+    try:
+        limit = min(max(int(request.args.get('limit', MAX_SEARCH_RESULTS)), 1), MAX_SEARCH_RESULTS)
+    except ValueError:
+        return json_response({"error": "Parâmetro 'limit' inválido"}, 400)
+    return json_response(assistant.search_responses(query, limit=limit))
+
+
+@app.route('/api/suggest', methods=['POST'])
+def suggest():
+    """Sugere respostas para a mensagem do cliente ("message") ou um lote ("messages")"""
+    data = request.get_json(silent=True) or {}
+    try:
+        limit = min(max(int(data.get('limit', 5)), 1), MAX_SUGGESTIONS)
+    except (TypeError, ValueError):
+        return json_response({"error": "Parâmetro 'limit' inválido"}, 400)
+
+    def as_items(suggestions):
+        responses = assistant.quick_responses
+        return [
+            {"key": key, "score": round(score, 4), **responses[key]}
+            for key, score in suggestions if key in responses
+        ]
+
+    messages = data.get('messages')
+    if messages is not None:
+        if not isinstance(messages, list) or not all(isinstance(m, str) for m in messages):
+            return json_response({"error": "'messages' deve ser uma lista de textos"}, 400)
+        if len(messages) > MAX_SUGGEST_BATCH:
+            return json_response({"error": f"No máximo {MAX_SUGGEST_BATCH} mensagens por lote"}, 400)
+        results = assistant.suggest_responses_many(messages, limit=limit)
+        return json_response({"results": [as_items(r) for r in results]})
+
+    message = data.get('message')
+    if not isinstance(message, str) or not message.strip():
+        return json_response({"error": "Mensagem não informada"}, 400)
+    return json_response({"results": as_items(assistant.suggest_responses(message, limit=limit))})
+
+
+@app.route('/api/analytics')
+def analytics():
+    try:
+        top = min(int(request.args.get('top', 10)), 100)
+    except ValueError:
+        return json_response({"error": "Parâmetro 'top' inválido"}, 400)
+    return json_response(assistant.usage_report(top=top))
+
+
+@app.route('/api/copy', methods=['POST'])
+def copy_response():
+    data = request.get_json(silent=True)
+    key = data.get('key') if isinstance(data, dict) else None
+    if not isinstance(key, str) or not key:
+        return json_response({"success": False, "error": "Código não informado"}, 400)
+
+    # No servidor não há área de transferência: quem copia é o navegador
+    text = assistant.get_response(key, copy_to_clipboard=False)
+    if text is None:
+        return json_response({"success": False, "error": f"Resposta '{key}' não encontrada"}, 404)
+    return json_response({"success": True, "text": text})
+
+
+@app.route('/api/template/generate', methods=['POST'])
+def generate_template():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    name = data.get('template_name')
+    fields = data.get('fields') or {}
+    if not isinstance(name, str) or not name or not isinstance(fields, dict):
+        return json_response({"success": False, "error": "Requisição inválida"}, 400)
+
+    try:
+        if data.get('is_response'):
+            response = assistant.quick_responses.get(name)
+            text = response["message"].format(**fields) if response else None
+        else:
+            text = template_engine.render(name, **fields)
+    except KeyError as e:
+        return json_response({"success": False, "error": f"Variável {e} não fornecida"}, 400)
+    except (ValueError, IndexError) as e:
+        return json_response({"success": False, "error": f"Template inválido: {e}"}, 400)
+
+    if text is None:
+        return json_response({"success": False, "error": "Template não encontrado."}, 404)
+    return json_response({"success": True, "text": text})
+
+
+if __name__ == '__main__':
+    app.run(
+        host=os.environ.get('HOST', '127.0.0.1'),
+        port=int(os.environ.get('PORT', 5000)),
+        threaded=True,
+    )
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Assistente VocalCom - modo ASGI (asyncio) com WebSocket
+
+As rotas /api/* são as do app Flask (mesmo ChatAssistant e TemplateEngine),
+executadas numa thread do pool por requisição. Além delas, /ws mantém uma
+conexão por navegador e empurra as alterações das respostas (chaves
+incluídas, alteradas e removidas) assim que acontecem, em vez de cada
+agente recarregar o acervo para ver o que mudou.
+
+Servidor:  python web/asgi.py                   (precisa de uvicorn[standard])
+           uvicorn --app-dir web asgi:app
+"""
+
+import asyncio
+import io
+import os
+import sys
+
+from app import app as flask_app, assistant, template_engine
+from payloads import encode_json
+
+# Intervalo (s) entre verificações de alterações em disco sem tráfego HTTP
+WATCH_INTERVAL = 1.0
+# Mensagens pendentes por conexão; um cliente mais atrasado que isso recebe "reset"
+CLIENT_QUEUE_SIZE = 64
+
+RESET = encode_json({"type": "reset"}).decode("utf-8")
+
+
+class Broadcaster:
+    """Leva as alterações do ChatAssistant (avisadas em qualquer thread) para as conexões.
+
+    Cada mensagem é serializada uma vez e entregue, já no laço de eventos,
+    à fila de cada conexão; quem envia para o socket é a tarefa da própria
+    conexão, então um cliente lento não atrasa os outros.
+    """
+
+    def __init__(self, queue_size=CLIENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.clients = set()
+        self.loop = None
+        self.delivered = 0
+        self.resets = 0
+
+    def attach(self, loop):
+        self.loop = loop
+
+    def connect(self):
+        queue = asyncio.Queue(self.queue_size)
+        self.clients.add(queue)
+        return queue
+
+    def disconnect(self, queue):
+        self.clients.discard(queue)
+
+    def publish(self, message):
+        """Envia `message` (dict) a todas as conexões; pode ser chamado de qualquer thread"""
+        loop = self.loop
+        if loop is None or not self.clients:
+            return
+        text = encode_json(message).decode("utf-8")
+        try:
+            loop.call_soon_threadsafe(self._fanout, text)
+        except RuntimeError:
+            # Laço de eventos já encerrado
+            pass
+
+    def _fanout(self, text):
+        for queue in list(self.clients):
+            try:
+                queue.put_nowait(text)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                # Cliente lento: descarta o atraso e pede que recarregue tudo
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESET)
+                self.resets += 1
+
+
+broadcaster = Broadcaster()
+_started = False
+_watch_task = None
+
+
+async def _watch_changes():
+    """Aplica alterações em disco (outros processos, edição manual) mesmo sem requisições"""
+    loop = asyncio.get_running_loop()
+    template_generation = template_engine.generation
+
+    def check():
+        assistant.reload_if_changed()
+        template_engine.reload_if_changed()
+
+    while True:
+        await asyncio.sleep(WATCH_INTERVAL)
+        try:
+            await loop.run_in_executor(None, check)
+        except Exception as e:
+            print(f"⚠️ Falha ao verificar alterações: {e}")
+        # Recargas feitas aqui ou por requisições HTTP
+        if template_engine.generation != template_generation:
+            template_generation = template_engine.generation
+            broadcaster.publish({"type": "templates"})
+
+
+def _start():
+    global _started, _watch_task
+    if _started:
+        return
+    _started = True
+    broadcaster.attach(asyncio.get_running_loop())
+    assistant.subscribe(broadcaster.publish)
+    _watch_task = asyncio.ensure_future(_watch_changes())
+
+
+def _stop():
+    global _started
+    if _watch_task is not None:
+        _watch_task.cancel()
+    assistant.unsubscribe(broadcaster.publish)
+    _started = False
+
+
+def wsgi_environ(scope, body):
+    """Ambiente WSGI equivalente a uma requisição HTTP do ASGI"""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    client = scope.get("client")
+    if client:
+        environ["REMOTE_ADDR"] = client[0]
+    for name, value in scope.get("headers", ()):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[name] = value
+            continue
+        name = "HTTP_" + name
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+async def handle_http(scope, receive, send):
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+
+    loop = asyncio.get_running_loop()
+    environ = wsgi_environ(scope, body)
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = [
+            (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers
+        ]
+
+    def call_app():
+        result = flask_app(environ, start_response)
+        chunks = iter(result)
+        # Primeiro bloco junto: a maioria das respostas tem um só
+        return result, chunks, next(chunks, None)
+
+    result, chunks, chunk = await loop.run_in_executor(None, call_app)
+    try:
+        await send({
+            "type": "http.response.start",
+            "status": started["status"],
+            "headers": started["headers"],
+        })
+        # Respostas em fluxo (NDJSON) seguem bloco a bloco
+        while chunk is not None:
+            if chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    finally:
+        close = getattr(result, "close", None)
+        if close is not None:
+            await loop.run_in_executor(None, close)
+
+
+async def handle_websocket(scope, receive, send):
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+    if scope["path"] != "/ws":
+        await send({"type": "websocket.close", "code": 1008})
+        return
+    _start()
+    await send({"type": "websocket.accept"})
+    queue = broadcaster.connect()
+
+    async def pump():
+        try:
+            while True:
+                text = await queue.get()
+                await send({"type": "websocket.send", "text": text})
+        except Exception:
+            # Conexão caiu (cada servidor usa sua exceção): o receive abaixo recebe o disconnect
+            pass
+
+    sender = asyncio.ensure_future(pump())
+    try:
+        await send({
+            "type": "websocket.send",
+            "text": encode_json({"type": "hello", "total": len(assistant.quick_responses)}).decode("utf-8"),
+        })
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            # O cliente não precisa mandar nada; mensagens (ex.: ping) são ignoradas
+    finally:
+        broadcaster.disconnect(queue)
+        sender.cancel()
+
+
+async def handle_lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            _start()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            _stop()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "http":
+        _start()
+        await handle_http(scope, receive, send)
+    elif scope["type"] == "websocket":
+        await handle_websocket(scope, receive, send)
+    elif scope["type"] == "lifespan":
+        await handle_lifespan(receive, send)
+
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("❌ O modo ASGI precisa do uvicorn: pip install 'uvicorn[standard]'")
+    uvicorn.run(
+        app,
+        host=os.environ.get('HOST', '127.0.0.1'),
+        port=int(os.environ.get('PORT', 8000)),
+    )
@@ -0,0 +1,51 @@
+import gzip
+import hashlib
+import json
+import threading
+
+from core.response_model import json_default
+
+# Abaixo disso o gzip não compensa o custo de CPU
+GZIP_MIN_SIZE = 1024
+
+
+def encode_json(data):
+    """Serializa para JSON compacto em UTF-8"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=json_default).encode("utf-8")
+
+
+class EncodedPayload:
+    """Corpo JSON já serializado, com versão gzip e ETag calculados uma vez"""
+
+    __slots__ = ("body", "gzipped", "etag")
+
+    def __init__(self, data):
+        self.body = encode_json(data)
+        self.etag = hashlib.sha1(self.body).hexdigest()
+        self.gzipped = gzip.compress(self.body, 6) if len(self.body) >= GZIP_MIN_SIZE else None
+
+
+class PayloadCache:
+    """Guarda um EncodedPayload por nome e o reconstrói quando a versão muda.
+
+    A leitura não usa lock: a entrada é uma tupla (versão, payload) trocada
+    de forma atômica. O lock só serializa a reconstrução, para que várias
+    requisições simultâneas não serializem o mesmo payload em paralelo.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, name, version, builder):
+        """Retorna o payload de `name` na versão pedida, construindo se preciso"""
+        entry = self._entries.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry[0] != version:
+                entry = (version, EncodedPayload(builder()))
+                self._entries[name] = entry
+        return entry[1]
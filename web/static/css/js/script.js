@@ -4,6 +4,7 @@ class AppState {
         this.responses = {};
         this.filteredResponses = {};
         this.templates = {};
+        this.templateFields = {};
         this.selectedResponse = null;
         this.searchTerm = '';
     }
@@ -57,12 +58,78 @@ async function initializeApp() {
         
         updateLastUpdate();
         setupEventListeners();
+        connectLiveUpdates();
         
     } catch (error) {
         showError('Erro ao carregar aplicação: ' + error.message);
     }
 }
 
+// Alterações empurradas pelo servidor (modo ASGI, /ws); no Flask a conexão
+// não abre e a página segue só com o botão Atualizar
+function connectLiveUpdates(retryDelay = 1000) {
+    if (!('WebSocket' in window)) return;
+    
+    const protocol = location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const socket = new WebSocket(`${protocol}//${location.host}/ws`);
+    let opened = false;
+    
+    socket.addEventListener('open', () => {
+        opened = true;
+    });
+    
+    socket.addEventListener('message', event => {
+        const change = JSON.parse(event.data);
+        if (change.type === 'delta') {
+            applyDelta(change);
+        } else if (change.type === 'reset') {
+            loadResponses();
+        } else if (change.type === 'templates') {
+            loadTemplates();
+        }
+    });
+    
+    socket.addEventListener('close', () => {
+        // Servidor sem WebSocket: não insiste. Queda depois de conectado: reconecta
+        // com espera crescente e recarrega, porque alterações podem ter passado
+        if (!opened) return;
+        setTimeout(() => {
+            loadResponses();
+            connectLiveUpdates(Math.min(retryDelay * 2, 30000));
+        }, retryDelay);
+    });
+}
+
+// Aplica inclusões, alterações e remoções sem baixar o acervo de novo
+function applyDelta(change) {
+    const upserts = { ...change.added, ...change.changed };
+    
+    Object.entries(upserts).forEach(([key, data]) => {
+        appState.responses[key] = data;
+        if (!appState.searchTerm || key in appState.filteredResponses) {
+            appState.filteredResponses[key] = data;
+        }
+    });
+    change.removed.forEach(key => {
+        delete appState.responses[key];
+        delete appState.filteredResponses[key];
+    });
+    
+    renderResponses();
+    updateResponseCount();
+    updateLastUpdate();
+    
+    // Resposta aberta no preview mudou ou sumiu
+    const selected = appState.selectedResponse;
+    if (selected && selected in upserts) {
+        selectResponse(selected);
+    } else if (selected && change.removed.includes(selected)) {
+        appState.selectedResponse = null;
+        elements.previewActive.style.display = 'none';
+        elements.previewPlaceholder.style.display = 'block';
+    }
+}
+
 // Verifica saúde da API
 async function checkAPIHealth() {
     try {
@@ -101,25 +168,59 @@ function updateStatusIndicator(connected, coreAvailable) {
     }
 }
 
-// Carrega todas as respostas
+// Carrega as respostas em fluxo (NDJSON, só código, categoria e prévia):
+// a lista aparece com o primeiro bloco e a mensagem completa vem ao selecionar
 async function loadResponses() {
     try {
-        const response = await fetch('/api/responses');
+        const response = await fetch('/api/responses?format=ndjson&fields=key,category,preview');
         
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
         
-        const data = await response.json();
+        const responses = {};
+        const addLines = lines => {
+            lines.forEach(line => {
+                if (!line) return;
+                const item = JSON.parse(line);
+                responses[item.key] = { category: item.category, preview: item.preview };
+            });
+        };
+        appState.responses = responses;
         
-        if (data.error) {
-            throw new Error(data.error);
+        if (!response.body) {
+            // Navegadores sem ReadableStream: lê tudo de uma vez
+            addLines((await response.text()).split('\n'));
+        } else {
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let rendered = false;
+            
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                addLines(lines);
+                
+                // Primeira pintura com o primeiro bloco; depois só o contador
+                if (!rendered && !appState.searchTerm) {
+                    appState.filteredResponses = responses;
+                    renderResponses();
+                    rendered = true;
+                }
+                updateResponseCount();
+            }
+            addLines([buffer]);
         }
         
-        appState.responses = data;
-        appState.filteredResponses = { ...data };
-        
-        renderResponses();
+        if (!appState.searchTerm) {
+            appState.filteredResponses = { ...responses };
+            renderResponses();
+        }
         updateResponseCount();
         
     } catch (error) {
@@ -194,9 +295,7 @@ function renderResponses() {
         
         categoryResponses.forEach(response => {
             const isActive = appState.selectedResponse === response.key ? 'active' : '';
-            const messagePreview = response.message.length > 100 
-                ? response.message.substring(0, 100) + '...' 
-                : response.message;
+            const messagePreview = messagePreviewOf(response);
                 
             html += `
                 <div class="response-item ${isActive}" 
@@ -218,6 +317,31 @@ function renderResponses() {
     updateResultsCount();
 }
 
+// Prévia da mensagem (vem pronta do servidor na listagem em fluxo)
+function messagePreviewOf(response) {
+    if (response.message === undefined) {
+        return response.preview || '';
+    }
+    return response.message.length > 100 
+        ? response.message.substring(0, 100) + '...' 
+        : response.message;
+}
+
+// Busca a mensagem completa de uma resposta carregada só com a prévia
+async function loadFullResponse(responseKey) {
+    const response = appState.responses[responseKey];
+    if (!response || response.message !== undefined) return response;
+    
+    const result = await fetch(`/api/responses/${encodeURIComponent(responseKey)}`);
+    if (!result.ok) {
+        throw new Error(`HTTP error! status: ${result.status}`);
+    }
+    const data = await result.json();
+    response.message = data.message;
+    response.category = data.category;
+    return response;
+}
+
 // Atualiza contador de resultados
 function updateResultsCount() {
     const count = Object.keys(appState.filteredResponses).length;
@@ -243,7 +367,7 @@ function updateLastUpdate() {
 }
 
 // Seleciona uma resposta
-function selectResponse(responseKey) {
+async function selectResponse(responseKey) {
     // Remove seleção anterior
     document.querySelectorAll('.response-item.active').forEach(item => {
         item.classList.remove('active');
@@ -255,11 +379,20 @@ function selectResponse(responseKey) {
         selectedItem.classList.add('active');
     }
     
-    const response = appState.responses[responseKey];
+    let response = appState.responses[responseKey];
     if (!response) return;
     
     appState.selectedResponse = responseKey;
     
+    try {
+        response = await loadFullResponse(responseKey);
+    } catch (error) {
+        console.error('Error loading response:', error);
+        showNotification('❌ Erro ao carregar a resposta', 'error');
+        return;
+    }
+    if (appState.selectedResponse !== responseKey) return;
+    
     // Atualiza preview
     elements.previewPlaceholder.style.display = 'none';
     elements.previewActive.style.display = 'block';
@@ -356,8 +489,9 @@ async function searchResponses(query) {
         // Fallback: busca local
         const filtered = {};
         Object.entries(appState.responses).forEach(([key, data]) => {
+            const text = data.message !== undefined ? data.message : (data.preview || '');
             if (key.toLowerCase().includes(query.toLowerCase()) ||
-                data.message.toLowerCase().includes(query.toLowerCase()) ||
+                text.toLowerCase().includes(query.toLowerCase()) ||
                 data.category.toLowerCase().includes(query.toLowerCase())) {
                 filtered[key] = data;
             }
@@ -430,6 +564,16 @@ async function loadTemplates() {
         appState.templates = data;
         renderTemplates();
         
+        // Campos vindos do servidor (já analisados pelo TemplateEngine)
+        try {
+            const fieldsResponse = await fetch('/api/templates/fields');
+            if (fieldsResponse.ok) {
+                appState.templateFields = await fieldsResponse.json();
+            }
+        } catch (fieldsError) {
+            console.warn('Template fields unavailable:', fieldsError);
+        }
+        
     } catch (error) {
         console.error('Error loading templates:', error);
         appState.templates = getFallbackTemplates();
@@ -485,7 +629,7 @@ function openTemplateModal(templateNameOrKey) {
     elements.modalTitle.textContent = `Preencher Template: ${templateName}`;
     
     // Extrai campos do template
-    const fields = extractTemplateFields(templatePreview);
+    const fields = getTemplateFields(templateNameOrKey, isResponseTemplate);
     
     let formHtml = `
         <div class="form-info">
@@ -517,6 +661,18 @@ function openTemplateModal(templateNameOrKey) {
     elements.templateModal.style.display = 'block';
 }
 
+// Campos de um template: do servidor quando disponíveis, senão extraídos localmente
+function getTemplateFields(templateName, isResponse) {
+    if (!isResponse && appState.templateFields[templateName]) {
+        return appState.templateFields[templateName];
+    }
+    return extractTemplateFields(
+        isResponse 
+            ? appState.responses[templateName].message 
+            : appState.templates[templateName]
+    );
+}
+
 // Extrai campos de um template
 function extractTemplateFields(template) {
     const fieldRegex = /{(\w+)}/g;
@@ -540,11 +696,7 @@ function closeModal() {
 
 // Gera template preenchido
 async function generateTemplate(templateName, isResponse = false) {
-    const fields = extractTemplateFields(
-        isResponse 
-            ? appState.responses[templateName].message 
-            : appState.templates[templateName]
-    );
+    const fields = getTemplateFields(templateName, isResponse);
     
     const fieldValues = {};
     let allFilled = true;